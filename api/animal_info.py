@@ -1,21 +1,120 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 import requests
-from typing import Dict, List, Optional, Any
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Any, Tuple, Callable
 
+from api.daemon_executor import DaemonExecutor
+from api.response_cache import ResponseCache, MISS, DEFAULT_CACHE_FILE
 from game.question_node import QuestionNode
 
+# Responses worth another attempt: rate limiting and transient server errors
+RETRY_STATUSES: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+# Shared by every AnimalInfo (one per Streamlit session) for parallel lookups
+_executor: DaemonExecutor = DaemonExecutor(max_workers=8, thread_name_prefix="animal-info")
+
+# Single flight: lookups in progress, joined by identical concurrent lookups
+_in_flight: Dict[Tuple[str, str, str], Future] = {}
+_in_flight_lock: threading.Lock = threading.Lock()
+
 
 class AnimalInfo:
-    def __init__(self, language: str = "en") -> None:
+    """Wikipedia summary and Wikimedia Commons images for an animal.
+
+    Requests go through one pooled keep-alive session. Each request has a
+    connect and a read timeout, failed requests are retried with
+    exponential backoff, and a whole `search` never starts a request or a
+    retry after `budget` seconds. Successful lookups and missing pages are
+    kept in a persistent ResponseCache (`cache_file=None` disables it); if
+    the cache file cannot be used, lookups simply go to Wikipedia.
+    Identical lookups running at the same time share one request, and each
+    instance remembers its complete results.
+    """
+
+    def __init__(
+        self,
+        language: str = "en",
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 5.0,
+        retries: int = 2,
+        backoff: float = 0.25,
+        budget: float = 8.0,
+        cache_file: Optional[str] = DEFAULT_CACHE_FILE,
+    ) -> None:
         self.language: str = language
         self.summary_url: str = (
             f"https://{language}.wikipedia.org/api/rest_v1/page/summary/"
         )
         self.commons_url: str = "https://commons.wikimedia.org/w/api.php"
+        # MediaWiki action API, for multi-title queries (see api.warm_cache)
+        self.api_url: str = f"https://{language}.wikipedia.org/w/api.php"
         self.headers: Dict[str, str] = {
             "User-Agent": "AnimalInfoBot/1.0 (Educational Project)"
         }
+        self.connect_timeout: float = connect_timeout
+        self.read_timeout: float = read_timeout
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.budget: float = budget
+        self._memo: Dict[str, Dict[str, Any]] = {}
+        self.cache: Optional[ResponseCache] = None
+        if cache_file is not None:
+            try:
+                self.cache = ResponseCache.shared(cache_file)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Error: Wikipedia cache '{cache_file}' unavailable, lookups are not cached: {e}")
+
+        self.session: requests.Session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Retries are handled in request so they respect the latency budget
+        adapter: HTTPAdapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def request(
+        self, url: str, deadline: float, params: Optional[Dict[str, str]] = None
+    ) -> Optional[requests.Response]:
+        # None when every attempt failed or the budget ran out
+        response: Optional[requests.Response] = None
+        attempt: int
+        for attempt in range(self.retries + 1):
+            remaining: float = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                response = self.session.get(
+                    url,
+                    params=params,
+                    timeout=(min(self.connect_timeout, remaining), min(self.read_timeout, remaining)),
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                response = None
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+
+            delay: float = self.backoff * 2 ** attempt
+            if attempt == self.retries or time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+        return response
 
-    def search(self, animal_name: str) -> Dict[str, Any]:
+    def search(self, animal_name: str, quiet: bool = False) -> Dict[str, Any]:
+        # quiet: no console messages, for lookups running in the background
+
+        # Reruns of the same screen reuse the answer found for this session
+        memo: Optional[Dict[str, Any]] = self._memo.get(animal_name)
+        if memo is not None:
+            return {**memo, "images": list(memo["images"])}
 
         result: Dict[str, Any] = {
             "name": animal_name,
@@ -24,18 +123,97 @@ class AnimalInfo:
             "images": [],
         }
 
-        summary_response: requests.Response = requests.get(
-            self.summary_url + animal_name, headers=self.headers
+        # The two lookups are independent: images run on the shared pool
+        # while the summary is fetched here, so the wait is the slower one
+        deadline: float = time.monotonic() + self.budget
+        images: Future = _executor.submit(
+            self._lookup, "images", animal_name, self._fetch_images, deadline, quiet
+        )
+        summary, summary_definite = self._lookup(
+            "summary", animal_name, self._fetch_summary, deadline, quiet
+        )
+        image_urls, images_definite = images.result()
+        if summary is not None:
+            result.update(summary)
+        result["images"] = image_urls or []
+
+        # Transient failures are not memoized so the next call retries
+        if summary_definite and images_definite:
+            self._memo[animal_name] = {**result, "images": list(result["images"])}
+        return result
+
+    def _lookup(
+        self,
+        endpoint: str,
+        animal_name: str,
+        fetch: Callable[[str, float, bool], Tuple[Any, bool]],
+        deadline: float,
+        quiet: bool = False,
+    ) -> Tuple[Any, bool]:
+        # (payload, definite): from the cache, from an identical lookup
+        # already in flight, or fetched here and cached if definite
+        if self.cache is not None:
+            try:
+                cached: Any = self.cache.get(self.language, animal_name, endpoint)
+            except sqlite3.Error as e:
+                if not quiet:
+                    print(f"Error: reading the Wikipedia cache failed: {e}")
+                cached = MISS
+            if cached is not MISS:
+                return cached, True
+
+        key: Tuple[str, str, str] = (self.language, endpoint, animal_name)
+        with _in_flight_lock:
+            future: Optional[Future] = _in_flight.get(key)
+            leader: bool = future is None
+            if future is None:
+                future = _in_flight[key] = Future()
+        if not leader:
+            # Wait for the leader, but only as long as our own budget allows
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                return None, False
+
+        try:
+            outcome: Tuple[Any, bool] = fetch(animal_name, deadline, quiet)
+            if outcome[1] and self.cache is not None:
+                try:
+                    self.cache.put(self.language, animal_name, endpoint, outcome[0])
+                except sqlite3.Error as e:
+                    if not quiet:
+                        print(f"Error: writing the Wikipedia cache failed: {e}")
+            future.set_result(outcome)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _in_flight_lock:
+                del _in_flight[key]
+        return outcome
+
+    def _fetch_summary(
+        self, animal_name: str, deadline: float, quiet: bool = False
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        # (fields, cacheable): a 404 is cached as None, other failures are not
+        summary_response: Optional[requests.Response] = self.request(
+            self.summary_url + animal_name, deadline
         )
 
-        if summary_response.status_code == 200:
+        if summary_response is not None and summary_response.status_code == 200:
             data: Dict[str, Any] = summary_response.json()
-            result["summary"] = data.get("extract")
+            fields: Dict[str, Any] = {"summary": data.get("extract")}
             if data.get("thumbnail"):
-                result["thumbnail"] = data["thumbnail"].get("source")
-        else:
+                fields["thumbnail"] = data["thumbnail"].get("source")
+            return fields, True
+        if not quiet:
             print(f"Can't find resume for this animal : {animal_name}")
+        return None, summary_response is not None and summary_response.status_code == 404
 
+    def _fetch_images(
+        self, animal_name: str, deadline: float, quiet: bool = False
+    ) -> Tuple[Optional[List[str]], bool]:
+        images: List[str] = []
         params: Dict[str, str] = {
             "action": "query",
             "generator": "images",
@@ -45,11 +223,11 @@ class AnimalInfo:
             "format": "json",
         }
 
-        images_response: requests.Response = requests.get(
-            self.commons_url, params=params, headers=self.headers
+        images_response: Optional[requests.Response] = self.request(
+            self.commons_url, deadline, params=params
         )
 
-        if images_response.status_code == 200:
+        if images_response is not None and images_response.status_code == 200:
             data: Dict[str, Any] = images_response.json()
             pages: Dict[str, Any] = data.get("query", {}).get("pages", {})
             for _, page in pages.items():
@@ -57,10 +235,11 @@ class AnimalInfo:
                 if imageinfo:
                     url: Optional[str] = imageinfo[0].get("url")
                     if url:
-                        result["images"].append(url)
-        else:
+                        images.append(url)
+            return images, True
+        if not quiet:
             print(f"Can't find pics for this animal : {animal_name}")
-        return result
+        return None, images_response is not None and images_response.status_code == 404
 
     def get_animal_info(self, node: QuestionNode) -> str:
         infos: Dict[str, Any] = self.search(node.value)
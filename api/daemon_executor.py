@@ -0,0 +1,50 @@
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+
+class DaemonExecutor:
+    """Minimal thread pool whose workers never delay interpreter exit.
+
+    ThreadPoolExecutor joins its workers at exit, so a lookup still waiting
+    on the network holds the process for up to its latency budget. Here the
+    workers are daemon threads, started on demand up to `max_workers`;
+    work still running at exit is dropped. `submit` returns a regular
+    Future, which can be cancelled until a worker picks it up.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str) -> None:
+        self.max_workers: int = max_workers
+        self.thread_name_prefix: str = thread_name_prefix
+        self._queue: "queue.SimpleQueue[Tuple[Future, Callable[..., Any], tuple]]" = queue.SimpleQueue()
+        self._lock: threading.Lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        # Released by a worker each time it waits for work
+        self._idle: threading.Semaphore = threading.Semaphore(0)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        future: Future = Future()
+        self._queue.put((future, fn, args))
+        if self._idle.acquire(blocking=False):
+            return future
+        with self._lock:
+            if len(self._threads) < self.max_workers:
+                thread: threading.Thread = threading.Thread(
+                    target=self._work,
+                    name=f"{self.thread_name_prefix}_{len(self._threads)}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+        return future
+
+    def _work(self) -> None:
+        while True:
+            future, fn, args = self._queue.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+            self._idle.release()
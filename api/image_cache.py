@@ -0,0 +1,131 @@
+import hashlib
+import io
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import requests
+from PIL import Image, ImageOps
+
+from api.animal_info import AnimalInfo
+
+DEFAULT_IMAGE_DIRECTORY: str = "data/image_cache"
+
+# Raster formats worth downloading; Commons pages also list .svg, .pdf, .ogg...
+IMAGE_EXTENSIONS: Tuple[str, ...] = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+
+# Downloads and re-encodings running at once in the whole process
+IMAGE_WORKERS: int = 4
+
+_executor: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=IMAGE_WORKERS, thread_name_prefix="image-cache"
+)
+
+
+class ImageCache:
+    """Downscaled copies of remote images, stored on disk by content.
+
+    Each image is downloaded once, shrunk to fit in `size` x `size` pixels
+    and re-encoded as WebP under ``blobs/<sha256 of the original>.webp``,
+    so the same picture behind several URLs is stored once. A small
+    ``urls/`` file per URL points to its blob, or is empty when the URL is
+    not a readable image. Network failures are not recorded and are
+    retried on the next call. Files are written to a temp name and
+    renamed, so concurrent sessions never read a partial file.
+    """
+
+    def __init__(
+        self,
+        info: AnimalInfo,
+        directory: str = DEFAULT_IMAGE_DIRECTORY,
+        size: int = 480,
+        quality: int = 80,
+    ) -> None:
+        self.info: AnimalInfo = info
+        self.directory: str = directory
+        self.size: int = size
+        self.quality: int = quality
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "urls"), exist_ok=True)
+
+    def thumbnail(self, url: str) -> Optional[str]:
+        """Path of the local thumbnail of `url`, or None if there is none."""
+        if not url.lower().endswith(IMAGE_EXTENSIONS):
+            return None
+        ref: str = self._ref_path(url)
+        try:
+            with open(ref, encoding="utf-8") as f:
+                digest: str = f.read()
+        except FileNotFoundError:
+            pass
+        else:
+            if not digest:
+                return None
+            if os.path.exists(self._blob_path(digest)):
+                return self._blob_path(digest)
+
+        response: Optional[requests.Response] = self.info.request(
+            url, time.monotonic() + self.info.budget
+        )
+        if response is None or response.status_code != 200:
+            if response is not None and response.status_code == 404:
+                self._write(ref, b"")
+            return None
+
+        digest = hashlib.sha256(response.content).hexdigest()
+        blob: str = self._blob_path(digest)
+        if not os.path.exists(blob):
+            encoded: Optional[bytes] = self._downscale(response.content)
+            if encoded is None:
+                print(f"Can't read image : {url}")
+                self._write(ref, b"")
+                return None
+            self._write(blob, encoded)
+        self._write(ref, digest.encode("ascii"))
+        return blob
+
+    def thumbnails(self, urls: List[str], limit: int = 9) -> List[str]:
+        """Local thumbnails of the first `limit` usable images, in order."""
+        candidates: List[str] = [url for url in urls if url.lower().endswith(IMAGE_EXTENSIONS)]
+        paths: List[str] = []
+        # Only as many downloads as thumbnails still missing, in parallel
+        while candidates and len(paths) < limit:
+            wave: List[str] = candidates[:limit - len(paths)]
+            candidates = candidates[len(wave):]
+            path: Optional[str]
+            for path in _executor.map(self.thumbnail, wave):
+                if path is not None:
+                    paths.append(path)
+        return paths
+
+    def _downscale(self, content: bytes) -> Optional[bytes]:
+        try:
+            with Image.open(io.BytesIO(content)) as image:
+                # JPEGs are decoded at a reduced scale directly
+                image.draft("RGB", (self.size, self.size))
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((self.size, self.size), Image.Resampling.LANCZOS)
+                if image.mode not in ("RGB", "RGBA"):
+                    has_alpha: bool = image.mode in ("LA", "PA") or "transparency" in image.info
+                    image = image.convert("RGBA" if has_alpha else "RGB")
+                output: io.BytesIO = io.BytesIO()
+                image.save(output, format="WEBP", quality=self.quality)
+                return output.getvalue()
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return None
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", f"{digest}.webp")
+
+    def _ref_path(self, url: str) -> str:
+        return os.path.join(self.directory, "urls", hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    def _write(self, path: str, data: bytes) -> None:
+        temp_path: str = os.path.join(
+            os.path.dirname(path), f".{os.path.basename(path)}.{uuid.uuid4().hex[:8]}.tmp"
+        )
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
@@ -0,0 +1,80 @@
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Set
+
+from api.animal_info import AnimalInfo
+from api.daemon_executor import DaemonExecutor
+from game.question_node import QuestionNode
+
+# Prefetches running at once in the whole process
+PREFETCH_WORKERS: int = 4
+
+# Daemon workers: a prefetch still running never delays exit
+_executor: DaemonExecutor = DaemonExecutor(
+    max_workers=PREFETCH_WORKERS, thread_name_prefix="animal-prefetch"
+)
+
+
+def subtree_leaves(node: Optional[QuestionNode], limit: int) -> Optional[List[str]]:
+    """Animals at the leaves under `node`, or None if there are more than `limit`."""
+    leaves: List[str] = []
+    stack: List[QuestionNode] = [node] if node is not None else []
+    # Internal nodes visited are bounded too, so a huge subtree costs little
+    budget: int = 4 * limit + 1
+    while stack:
+        budget -= 1
+        if budget < 0:
+            return None
+        current: QuestionNode = stack.pop()
+        if current.yes is None and current.no is None:
+            leaves.append(current.value)
+            if len(leaves) > limit:
+                return None
+            continue
+        if current.no is not None:
+            stack.append(current.no)
+        if current.yes is not None:
+            stack.append(current.yes)
+    return leaves
+
+
+class Prefetcher:
+    """Fetches animal info for the leaves the player can still reach.
+
+    Call `update` with the current node after every answer. Once at most
+    `threshold` animals remain below it, their `AnimalInfo.search` results
+    are fetched in the background, so they are in the instance's memo when
+    the game ends. Fetches for animals no longer reachable are cancelled if
+    they have not started yet. Prefetches print nothing, so they do not
+    interrupt a console prompt.
+    """
+
+    def __init__(self, info: AnimalInfo, threshold: int = 8) -> None:
+        self.info: AnimalInfo = info
+        self.threshold: int = threshold
+        self._pending: Dict[str, Future] = {}
+
+    def update(self, node: Optional[QuestionNode]) -> None:
+        leaves: Optional[List[str]] = subtree_leaves(node, self.threshold)
+        if leaves is None:
+            return
+        wanted: Set[str] = set(leaves)
+
+        animal: str
+        for animal in [animal for animal in self._pending if animal not in wanted]:
+            self._pending.pop(animal).cancel()
+        for animal in leaves:
+            if animal not in self._pending:
+                self._pending[animal] = _executor.submit(self._fetch, animal)
+
+    def cancel(self) -> None:
+        # The game is over or restarted: drop fetches that have not started
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+
+    def _fetch(self, animal: str) -> None:
+        try:
+            self.info.search(animal, quiet=True)
+        except Exception:
+            # The end screen searches again and reports the failure
+            pass
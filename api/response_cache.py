@@ -0,0 +1,182 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# data/wiki_cache.db of the project, wherever the program is started from
+DEFAULT_CACHE_FILE: str = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "wiki_cache.db"
+)
+
+# Returned by ResponseCache.get when nothing usable is cached
+MISS: Any = object()
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS responses (
+    language TEXT NOT NULL,
+    title TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    payload TEXT,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (language, title, endpoint)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at);
+"""
+
+Key = Tuple[str, str, str]
+
+
+class ResponseCache:
+    """Persistent cache of Wikipedia lookups keyed by (language, title, endpoint).
+
+    Entries live in SQLite and expire after `ttl` seconds. A payload of None
+    records that the page does not exist (a 404) and expires after
+    `negative_ttl`. Past `max_entries`, the least recently used entries are
+    deleted. The most recent `memory_entries` lookups are also kept decoded
+    in memory, so repeat hits do not touch the database; their access
+    times are written back in bulk when the cache next stores something.
+    """
+
+    _shared: Dict[str, "ResponseCache"] = {}
+    _shared_lock: threading.Lock = threading.Lock()
+
+    def __init__(
+        self,
+        filename: str = DEFAULT_CACHE_FILE,
+        ttl: float = 7 * 24 * 3600,
+        negative_ttl: float = 3600,
+        max_entries: int = 10000,
+        memory_entries: int = 512,
+    ) -> None:
+        self.filename: str = filename
+        self.ttl: float = ttl
+        self.negative_ttl: float = negative_ttl
+        self.max_entries: int = max_entries
+        self.memory_entries: int = memory_entries
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._lock: threading.Lock = threading.Lock()
+        # key -> (payload, stored_at)
+        self._memory: "OrderedDict[Key, Tuple[Any, float]]" = OrderedDict()
+        self._touched: Dict[Key, float] = {}
+        directory: str = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            filename, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    @classmethod
+    def shared(cls, filename: str = DEFAULT_CACHE_FILE) -> "ResponseCache":
+        """One cache per file for the whole process."""
+        with cls._shared_lock:
+            cache: Optional[ResponseCache] = cls._shared.get(filename)
+            if cache is None:
+                cache = cls._shared[filename] = cls(filename)
+            return cache
+
+    def get(self, language: str, title: str, endpoint: str) -> Any:
+        key: Key = (language, title, endpoint)
+        now: float = time.time()
+        with self._lock:
+            entry: Optional[Tuple[Any, float]] = self._memory.get(key)
+            if entry is None:
+                row: Optional[Tuple[Optional[str], float]] = self._connection.execute(
+                    "SELECT payload, stored_at FROM responses "
+                    "WHERE language = ? AND title = ? AND endpoint = ?",
+                    key,
+                ).fetchone()
+                if row is not None:
+                    entry = (None if row[0] is None else json.loads(row[0]), row[1])
+
+            if entry is None or self._expired(entry, now):
+                self._memory.pop(key, None)
+                self.misses += 1
+                return MISS
+
+            self._remember(key, entry)
+            self._touched[key] = now
+            self.hits += 1
+            return entry[0]
+
+    def put(self, language: str, title: str, endpoint: str, payload: Any) -> None:
+        """Store a payload, or None for a page that does not exist."""
+        key: Key = (language, title, endpoint)
+        now: float = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(language, title, endpoint, payload, stored_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, None if payload is None else json.dumps(payload), now, now),
+                )
+                self._write_access_times()
+                self._evict()
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+            self._touched.pop(key, None)
+            self._remember(key, (payload, now))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._memory.clear()
+            self._touched.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._write_access_times()
+            self._connection.close()
+
+    def _expired(self, entry: Tuple[Any, float], now: float) -> bool:
+        payload, stored_at = entry
+        return now - stored_at > (self.negative_ttl if payload is None else self.ttl)
+
+    def _remember(self, key: Key, entry: Tuple[Any, float]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _write_access_times(self) -> None:
+        if not self._touched:
+            return
+        self._connection.executemany(
+            "UPDATE responses SET accessed_at = ? "
+            "WHERE language = ? AND title = ? AND endpoint = ?",
+            [(accessed_at, *key) for key, accessed_at in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _evict(self) -> None:
+        # Drop the least recently used entries beyond max_entries
+        excess: int = self._connection.execute(
+            "SELECT COUNT(*) FROM responses"
+        ).fetchone()[0] - self.max_entries
+        if excess <= 0:
+            return
+        evicted: List[Key] = self._connection.execute(
+            "SELECT language, title, endpoint FROM responses ORDER BY accessed_at LIMIT ?",
+            (excess,),
+        ).fetchall()
+        self._connection.executemany(
+            "DELETE FROM responses WHERE language = ? AND title = ? AND endpoint = ?",
+            evicted,
+        )
+        for key in evicted:
+            self._memory.pop(tuple(key), None)
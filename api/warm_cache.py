@@ -0,0 +1,294 @@
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from api.animal_info import AnimalInfo
+from api.prefetcher import subtree_leaves
+from api.response_cache import MISS
+from game.question_node import QuestionNode
+
+# extracts returns at most 20 intro extracts per query
+SUMMARY_BATCH: int = 20
+# Titles per query accepted by the API for anonymous clients
+TITLE_BATCH: int = 50
+
+
+def _first_paragraph(extract: Optional[str]) -> Optional[str]:
+    # The REST summary only has the first paragraph of the intro
+    if extract is None:
+        return None
+    paragraph: str
+    for paragraph in extract.split("\n"):
+        if paragraph.strip():
+            return paragraph.strip()
+    return extract
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, in bursts of `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate: float = rate
+        self.capacity: float = capacity if capacity is not None else max(1.0, rate)
+        self._tokens: float = self.capacity
+        self._updated: float = time.monotonic()
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now: float = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait: float = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class WarmupReport:
+    def __init__(self, total: int) -> None:
+        self.total: int = total
+        self.already_cached: int = 0
+        self.fetched: int = 0
+        self.missing: List[str] = []
+        self.failed: List[str] = []
+
+    @property
+    def coverage(self) -> float:
+        # Share of animals whose lookups are all in the cache now
+        if not self.total:
+            return 1.0
+        return (self.total - len(self.failed)) / self.total
+
+
+class CacheWarmer:
+    """Fills the ResponseCache of an AnimalInfo for many animals at once.
+
+    Summaries come from multi-title MediaWiki `extracts|pageimages` queries
+    and images from multi-title Commons `images` + `imageinfo` queries,
+    instead of two requests per animal. Batches run on `workers` threads
+    and every HTTP request takes a token from a bucket refilled at
+    `rate` per second. Entries are stored in the same form as
+    `AnimalInfo.search` stores them.
+
+    The REST summary that `AnimalInfo.search` fetches holds the first
+    paragraph of the article and a 320px thumbnail. The warmer asks for
+    the plain text intro and keeps its first paragraph, and for
+    320px thumbnails, so both give the same entry. One small difference
+    remains: pithumbsize limits the longer side of the thumbnail, while
+    the REST API limits its width.
+    """
+
+    def __init__(
+        self, info: AnimalInfo, workers: int = 4, rate: float = 5.0, force: bool = False
+    ) -> None:
+        if info.cache is None:
+            raise ValueError("CacheWarmer needs an AnimalInfo with a cache")
+        self.info: AnimalInfo = info
+        self.workers: int = workers
+        self.bucket: TokenBucket = TokenBucket(rate)
+        self.force: bool = force
+        self.requests: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def warm(self, animals: List[str]) -> WarmupReport:
+        animals = list(dict.fromkeys(animals))
+        report: WarmupReport = WarmupReport(len(animals))
+        todo: Dict[str, List[str]] = {"summary": [], "images": []}
+        done: List[str] = []
+        for animal in animals:
+            needed: List[str] = [
+                endpoint for endpoint in todo
+                if self.force or self.info.cache.get(self.info.language, animal, endpoint) is MISS
+            ]
+            for endpoint in needed:
+                todo[endpoint].append(animal)
+            if not needed:
+                done.append(animal)
+        report.already_cached = len(done)
+
+        batches: List[Tuple[str, List[str]]] = [
+            ("summary", todo["summary"][i:i + SUMMARY_BATCH])
+            for i in range(0, len(todo["summary"]), SUMMARY_BATCH)
+        ] + [
+            ("images", todo["images"][i:i + TITLE_BATCH])
+            for i in range(0, len(todo["images"]), TITLE_BATCH)
+        ]
+        failed: set = set()
+        missing: set = set()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results: List[Tuple[List[str], List[str]]] = list(executor.map(self._run_batch, batches))
+        for batch_missing, batch_failed in results:
+            missing.update(batch_missing)
+            failed.update(batch_failed)
+
+        report.failed = [animal for animal in animals if animal in failed]
+        report.missing = [animal for animal in animals if animal in missing and animal not in failed]
+        report.fetched = len(animals) - report.already_cached - len(report.failed)
+        return report
+
+    def _run_batch(self, batch: Tuple[str, List[str]]) -> Tuple[List[str], List[str]]:
+        # (missing, failed) titles of the batch
+        endpoint, titles = batch
+        try:
+            payloads: Dict[str, Any] = (
+                self._summaries(titles) if endpoint == "summary" else self._images(titles)
+            )
+        except (requests.RequestException, ValueError, KeyError) as e:
+            print(f"Error: {endpoint} batch starting at '{titles[0]}' failed: {e}")
+            return [], titles
+
+        missing: List[str] = []
+        title: str
+        for title in titles:
+            payload: Any = payloads.get(title)
+            if payload is None and endpoint == "summary":
+                missing.append(title)
+            self.info.cache.put(self.info.language, title, endpoint, payload)
+        return missing, []
+
+    def _query(self, url: str, params: Dict[str, str]) -> Dict[str, Any]:
+        # One API query, following `continue` until the result is complete
+        merged: Dict[str, Any] = {}
+        extra: Dict[str, str] = {}
+        while True:
+            self.bucket.acquire()
+            with self._lock:
+                self.requests += 1
+            response: Optional[requests.Response] = self.info.request(
+                url, time.monotonic() + self.info.budget,
+                params={**params, **extra, "action": "query", "format": "json", "formatversion": "2"},
+            )
+            if response is None or response.status_code != 200:
+                status: str = "no response" if response is None else f"HTTP {response.status_code}"
+                raise requests.RequestException(f"{status} from {url}")
+            data: Dict[str, Any] = response.json()
+            query: Dict[str, Any] = data.get("query", {})
+            for key in ("normalized", "redirects", "pages"):
+                merged.setdefault(key, []).extend(query.get(key, []))
+            if "continue" not in data:
+                return merged
+            extra = {key: str(value) for key, value in data["continue"].items()}
+
+    @staticmethod
+    def _resolve(titles: List[str], query: Dict[str, Any]) -> Dict[str, str]:
+        # Requested title -> title of the page the API answered with
+        renamed: Dict[str, str] = {}
+        for key in ("normalized", "redirects"):
+            for item in query.get(key, []):
+                renamed[item["from"]] = item["to"]
+        resolved: Dict[str, str] = {}
+        for title in titles:
+            final: str = title
+            seen: set = {final}
+            while final in renamed and renamed[final] not in seen:
+                final = renamed[final]
+                seen.add(final)
+            resolved[title] = final
+        return resolved
+
+    def _summaries(self, titles: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        query: Dict[str, Any] = self._query(self.info.api_url, {
+            "prop": "extracts|pageimages",
+            "exintro": "1",
+            "explaintext": "1",
+            "exlimit": str(SUMMARY_BATCH),
+            "piprop": "thumbnail",
+            "pithumbsize": "320",
+            "redirects": "1",
+            "titles": "|".join(titles),
+        })
+        pages: Dict[str, Dict[str, Any]] = {}
+        for page in query.get("pages", []):
+            # Continued results repeat a page with the properties still missing
+            pages.setdefault(page["title"], {}).update(page)
+
+        summaries: Dict[str, Optional[Dict[str, Any]]] = {}
+        for title, final in self._resolve(titles, query).items():
+            page: Optional[Dict[str, Any]] = pages.get(final)
+            if page is None or page.get("missing") or page.get("invalid"):
+                summaries[title] = None
+                continue
+            fields: Dict[str, Any] = {"summary": _first_paragraph(page.get("extract"))}
+            if page.get("thumbnail"):
+                fields["thumbnail"] = page["thumbnail"].get("source")
+            summaries[title] = fields
+        return summaries
+
+    def _images(self, titles: List[str]) -> Dict[str, List[str]]:
+        # Files used on each page, then the URLs of all of them
+        query: Dict[str, Any] = self._query(self.info.commons_url, {
+            "prop": "images",
+            "imlimit": "max",
+            "titles": "|".join(titles),
+        })
+        files_by_page: Dict[str, List[str]] = {}
+        for page in query.get("pages", []):
+            files_by_page.setdefault(page["title"], []).extend(
+                image["title"] for image in page.get("images", [])
+            )
+
+        files: List[str] = list(dict.fromkeys(
+            file for page_files in files_by_page.values() for file in page_files
+        ))
+        urls: Dict[str, str] = {}
+        for start in range(0, len(files), TITLE_BATCH):
+            info: Dict[str, Any] = self._query(self.info.commons_url, {
+                "prop": "imageinfo",
+                "iiprop": "url",
+                "titles": "|".join(files[start:start + TITLE_BATCH]),
+            })
+            for page in info.get("pages", []):
+                imageinfo: List[Dict[str, Any]] = page.get("imageinfo", [])
+                if imageinfo and imageinfo[0].get("url"):
+                    urls[page["title"]] = imageinfo[0]["url"]
+
+        return {
+            title: [urls[file] for file in files_by_page.get(final, []) if file in urls]
+            for title, final in self._resolve(titles, query).items()
+        }
+
+
+def main(argv: List[str]) -> int:
+    from game.question_tree import QuestionTree
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="python -m api.warm_cache",
+        description="Fetch the Wikipedia info of every animal of a tree into the local cache.",
+    )
+    parser.add_argument("tree", help="tree file, e.g. data/animals_tree.json")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--workers", type=int, default=4, help="batches run in parallel")
+    parser.add_argument("--rate", type=float, default=5.0, help="requests per second")
+    parser.add_argument("--force", action="store_true", help="refetch animals already cached")
+    args: argparse.Namespace = parser.parse_args(argv[1:])
+
+    root: Optional[QuestionNode] = QuestionTree(args.tree).root
+    if root is None:
+        return 1
+    info: AnimalInfo = AnimalInfo(args.language)
+    warmer: CacheWarmer = CacheWarmer(info, workers=args.workers, rate=args.rate, force=args.force)
+
+    start: float = time.monotonic()
+    report: WarmupReport = warmer.warm(subtree_leaves(root, sys.maxsize) or [])
+    elapsed: float = time.monotonic() - start
+
+    print(f"{report.total} animals: {report.already_cached} already cached, "
+          f"{report.fetched} fetched in {warmer.requests} requests ({elapsed:.1f}s)")
+    if report.missing:
+        print(f"No Wikipedia page for: {', '.join(report.missing)}")
+    if report.failed:
+        print(f"Failed, run again to retry: {', '.join(report.failed)}")
+    print(f"Coverage: {report.coverage:.0%}")
+    return 0 if not report.failed else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,94 @@
+"""Compare the tree loaders: three-pass, fused single-pass and sidecar cache.
+
+Usage: python benchmarks/bench_load_json_tree.py [depth] [repeat]
+
+Builds a balanced tree of 2**(depth+1) - 1 nodes, saves it with
+Parsing.save_json_tree and times both loaders on the same file, reporting
+the best wall time and the peak traced memory of each.
+"""
+import sys
+import os
+import json
+import time
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Optional, Tuple
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data.parsing import Parsing
+from game.question_node import QuestionNode
+
+
+def build_balanced(depth: int) -> QuestionNode:
+    root: QuestionNode = QuestionNode("q0")
+    level = [root]
+    counter = 1
+    for d in range(depth):
+        next_level = []
+        for node in level:
+            prefix = "q" if d < depth - 1 else "animal"
+            node.yes = QuestionNode(f"{prefix}{counter}")
+            node.no = QuestionNode(f"{prefix}{counter + 1}")
+            counter += 2
+            next_level.extend((node.yes, node.no))
+        level = next_level
+    return root
+
+
+def three_pass(parsing: Parsing) -> Optional[QuestionNode]:
+    # The loader as it was before the fused object_hook path
+    with open(parsing.filename, "r", encoding="utf-8") as f:
+        data: Any = json.load(f)
+    valid, _ = parsing._validate_node_dict(data)
+    if not valid:
+        return None
+    return parsing.from_dict(data)
+
+
+def fused(parsing: Parsing) -> Optional[QuestionNode]:
+    return parsing.load_json_tree(default=None, verbose=False)
+
+
+def cached(parsing: Parsing) -> Optional[QuestionNode]:
+    return parsing.load_json_tree(default=None, verbose=False, use_cache=True)
+
+
+def measure(loader: Callable[[Parsing], Any], parsing: Parsing, repeat: int) -> Tuple[float, int]:
+    best: float = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        root = loader(parsing)
+        best = min(best, time.perf_counter() - start)
+        assert root is not None
+        del root
+
+    tracemalloc.start()
+    root = loader(parsing)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del root
+    return best, peak
+
+
+def main() -> None:
+    depth: int = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    repeat: int = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        parsing = Parsing(path)
+        parsing.save_json_tree(build_balanced(depth))
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"Balanced tree, depth {depth} ({2 ** (depth + 1) - 1} nodes, {size_mb:.1f} MB)")
+
+        for name, loader in (("three-pass", three_pass), ("fused", fused), ("cached", cached)):
+            seconds, peak = measure(loader, parsing, repeat)
+            print(f"{name:>10}: {seconds * 1000:8.1f} ms   peak {peak / 1e6:7.1f} MB")
+    finally:
+        os.remove(path)
+        parsing.cache.clear()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Optional, Any, Dict, List, Tuple
+
+from game.question_node import QuestionNode
+from game.compact_tree import CompactTree, NO_CHILD
+
+# File layout (little endian):
+#   header   magic, version, node count, string heap size
+#   records  one fixed-size record per node, root first, in pre-order:
+#            value offset and length in the heap, yes and no record index
+#            (-1 when the branch is empty)
+#   heap     UTF-8 encoded node values, each distinct value stored once
+MAGIC: bytes = b"ORCLTREE"
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct("<8sIII")
+RECORD: struct.Struct = struct.Struct("<IIii")
+
+_UNLOADED: Any = object()
+
+
+def is_binary_tree(filename: str) -> bool:
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_binary_tree(root: Optional[QuestionNode], filename: str) -> None:
+    tree: CompactTree = _preorder(root)
+
+    heap: bytearray = bytearray()
+    offsets: List[int] = []
+    lengths: List[int] = []
+    value: str
+    for value in tree.strings:
+        encoded: bytes = value.encode("utf-8")
+        offsets.append(len(heap))
+        lengths.append(len(encoded))
+        heap += encoded
+
+    directory: str = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tree-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(tree), len(heap)))
+            index: int
+            for index in range(len(tree)):
+                string_id: int = tree.values[index]
+                f.write(
+                    RECORD.pack(
+                        offsets[string_id],
+                        lengths[string_id],
+                        tree.yes_index[index],
+                        tree.no_index[index],
+                    )
+                )
+            f.write(heap)
+        try:
+            mode: int = os.stat(filename).st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _preorder(root: Optional[QuestionNode]) -> CompactTree:
+    # Like CompactTree.graft, but numbers nodes in pre-order so every child
+    # index is greater than its parent's, which the reader relies on to
+    # reject cyclic files.
+    tree: CompactTree = CompactTree()
+    if root is None:
+        return tree
+    stack: List[Any] = [(root, NO_CHILD, "")]
+    while stack:
+        node, parent, branch = stack.pop()
+        index: int = tree.add_node(node.value)
+        if branch == "yes":
+            tree.yes_index[parent] = index
+        elif branch == "no":
+            tree.no_index[parent] = index
+        if node.no is not None:
+            stack.append((node.no, index, "no"))
+        if node.yes is not None:
+            stack.append((node.yes, index, "yes"))
+    return tree
+
+
+def read_compact_tree(filename: str) -> CompactTree:
+    """Load a whole binary tree into a CompactTree, without one object per node."""
+    reader: BinaryTreeReader = BinaryTreeReader(filename)
+    try:
+        tree: CompactTree = CompactTree()
+        # Heap slice -> string id: each distinct value is decoded once
+        string_ids: Dict[Tuple[int, int], int] = {}
+        index: int
+        for index in range(reader.node_count):
+            start, length, yes, no = reader.record(index)
+            string_id: Optional[int] = string_ids.get((start, length))
+            if string_id is None:
+                string_id = string_ids[start, length] = tree.intern(
+                    reader.buffer[start : start + length].decode("utf-8")
+                )
+            tree.values.append(string_id)
+            tree.yes_index.append(yes)
+            tree.no_index.append(no)
+        return tree
+    finally:
+        reader.close()
+
+
+class BinaryTreeReader:
+    def __init__(self, filename: str) -> None:
+        self.filename: str = filename
+        with open(filename, "rb") as f:
+            self.buffer: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic: bytes
+        version: int
+        magic, version, self.node_count, heap_size = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{filename}' is not a version {VERSION} binary tree")
+        self.heap_offset: int = HEADER.size + self.node_count * RECORD.size
+        if len(self.buffer) < self.heap_offset + heap_size:
+            raise ValueError(f"'{filename}' is truncated")
+        self.heap_end: int = self.heap_offset + heap_size
+
+    def root(self) -> Optional["LazyNode"]:
+        if self.node_count == 0:
+            return None
+        return LazyNode(self, 0)
+
+    def record(self, index: int) -> tuple:
+        offset, length, yes, no = RECORD.unpack_from(
+            self.buffer, HEADER.size + index * RECORD.size
+        )
+        start: int = self.heap_offset + offset
+        if start + length > self.heap_end:
+            raise ValueError(f"node {index} points outside the string heap")
+        for child in (yes, no):
+            if child != NO_CHILD and not index < child < self.node_count:
+                raise ValueError(f"node {index} has an invalid child index {child}")
+        return start, length, yes, no
+
+    def close(self) -> None:
+        self.buffer.close()
+
+
+class LazyNode(QuestionNode):
+    """QuestionNode backed by a record of a memory-mapped binary tree.
+
+    The value and children are only read from the mapping the first time
+    they are accessed; assignments (learning) replace them in memory.
+    """
+
+    def __init__(self, reader: BinaryTreeReader, index: int) -> None:
+        self._reader: BinaryTreeReader = reader
+        self._index: int = index
+        self._record: Optional[tuple] = None
+        self._value: Any = _UNLOADED
+        self._yes: Any = _UNLOADED
+        self._no: Any = _UNLOADED
+
+    def _load_record(self) -> tuple:
+        if self._record is None:
+            self._record = self._reader.record(self._index)
+        return self._record
+
+    def _child(self, index: int) -> Optional["LazyNode"]:
+        if index == NO_CHILD:
+            return None
+        return LazyNode(self._reader, index)
+
+    @property
+    def value(self) -> str:
+        if self._value is _UNLOADED:
+            start, length, _, _ = self._load_record()
+            self._value = self._reader.buffer[start : start + length].decode("utf-8")
+        return self._value
+
+    @value.setter
+    def value(self, value: str) -> None:
+        self._value = value
+
+    @property
+    def yes(self) -> Optional[QuestionNode]:
+        if self._yes is _UNLOADED:
+            self._yes = self._child(self._load_record()[2])
+        return self._yes
+
+    @yes.setter
+    def yes(self, node: Optional[QuestionNode]) -> None:
+        self._yes = node
+
+    @property
+    def no(self) -> Optional[QuestionNode]:
+        if self._no is _UNLOADED:
+            self._no = self._child(self._load_record()[3])
+        return self._no
+
+    @no.setter
+    def no(self, node: Optional[QuestionNode]) -> None:
+        self._no = node
+
+
+def main(argv: List[str]) -> int:
+    from data.parsing import Parsing
+
+    if len(argv) != 4 or argv[1] not in ("to-binary", "to-json"):
+        print("Usage: python -m data.binary_tree (to-binary|to-json) <source> <destination>")
+        print("Example: python -m data.binary_tree to-binary data/animals_tree.json data/animals_tree.bin")
+        return 1
+
+    command, source, destination = argv[1:]
+    root: Optional[QuestionNode] = Parsing(source).load_tree(default=None, verbose=True)
+    if root is None:
+        return 1
+    Parsing(destination)._write_snapshot(root, binary=command == "to-binary")
+    print(f"Converted '{source}' to '{destination}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
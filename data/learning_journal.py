@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+from typing import Optional, Any, Dict, List
+
+from game.question_node import QuestionNode
+
+
+class LearningJournal:
+    """Append-only log of learning events, replayed on top of the tree snapshot.
+
+    Each line is a JSON object describing one lesson: the path of the leaf
+    that was guessed wrong (``root.yes.no``...), the wrong guess, the new
+    question, the correct animal and the answer to the question for it.
+    Replaying is idempotent: a lesson only applies if its path still ends on
+    a leaf holding the wrong guess, so lessons already folded into the
+    snapshot are skipped.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename: str = filename
+
+    def append(
+        self, path: str, guess: str, question: str, animal: str, answer: bool
+    ) -> int:
+        record: Dict[str, Any] = {
+            "path": path,
+            "guess": guess,
+            "question": question,
+            "animal": animal,
+            "answer": answer,
+        }
+        with open(self.filename, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.filename)
+        except OSError:
+            return 0
+
+    def replay(self, root: Optional[QuestionNode]) -> int:
+        if root is None:
+            return 0
+        try:
+            with open(self.filename, "r", encoding="utf-8") as f:
+                lines: List[str] = f.readlines()
+        except OSError:
+            return 0
+
+        applied: int = 0
+        line: str
+        for line in lines:
+            try:
+                record: Dict[str, Any] = json.loads(line)
+            except ValueError:
+                # Torn last line after a crash: everything before it is valid
+                break
+            if self._apply(root, record):
+                applied += 1
+        return applied
+
+    def truncate(self, offset: int) -> None:
+        """Drop the first ``offset`` bytes, keeping lessons appended since.
+
+        The rest is written to a temp file, synced and renamed over the
+        journal, so a crash leaves either the old or the new journal.
+        """
+        try:
+            with open(self.filename, "rb") as f:
+                f.seek(offset)
+                rest: bytes = f.read()
+            mode: int = os.stat(self.filename).st_mode & 0o777
+        except FileNotFoundError:
+            return
+
+        directory: str = os.path.dirname(os.path.abspath(self.filename))
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".journal-", suffix=".tmp", dir=directory
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(rest)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, self.filename)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _apply(root: QuestionNode, record: Dict[str, Any]) -> bool:
+        return apply_lesson(
+            root,
+            record["path"],
+            record["guess"],
+            record["question"],
+            record["animal"],
+            record["answer"],
+        )
+
+
+def node_at(root: Optional[QuestionNode], path: str) -> Optional[QuestionNode]:
+    node: Optional[QuestionNode] = root
+    branch: str
+    for branch in path.split(".")[1:]:
+        if node is None:
+            return None
+        node = node.yes if branch == "yes" else node.no
+    return node
+
+
+def apply_lesson(
+    root: QuestionNode, path: str, guess: str, question: str, animal: str, answer: bool
+) -> bool:
+    """Turn the leaf at ``path`` into ``question``; False if it is no longer ``guess``."""
+    node: Optional[QuestionNode] = node_at(root, path)
+    if node is None or node.yes is not None or node.no is not None:
+        return False
+    if node.value != guess:
+        return False
+
+    yes_node: QuestionNode = QuestionNode(animal)
+    no_node: QuestionNode = QuestionNode(node.value)
+    if not answer:
+        yes_node, no_node = no_node, yes_node
+
+    node.value = question
+    node.yes = yes_node
+    node.no = no_node
+    return True
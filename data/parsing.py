@@ -1,75 +1,417 @@
+import hashlib
 import json
-from typing import Optional, Tuple, Any, Dict
+import os
+import tempfile
+import threading
+from typing import Optional, Tuple, Any, Dict, List, Iterator, IO, Union
 from game.question_node import QuestionNode
+from game.compact_tree import CompactTree, CompactNode
+from data.learning_journal import LearningJournal
+from data.binary_tree import BinaryTreeReader, is_binary_tree, write_binary_tree, read_compact_tree
+from data.tree_writer import TreeWriter
+from data.tree_cache import TreeCache
+from data.stream_parser import parse_stream, TreeParseError
+
+MAX_INDENT_DEPTH: int = 64
+JOURNAL_COMPACT_BYTES: int = 64 * 1024
+
+
+class _InvalidNode:
+    # Placeholder returned by the loader's object_hook for a malformed node.
+    # Parents append their branch while the error bubbles up to the root.
+    __slots__ = ("template", "branches")
+
+    def __init__(self, template: str) -> None:
+        self.template: str = template
+        self.branches: List[str] = []
+
+    def describe(self) -> str:
+        path: str = ".".join(["root"] + self.branches[::-1])
+        return self.template.format(path=path)
+
+
+class _CompactRef:
+    # A node already appended to the CompactTree being loaded
+    __slots__ = ("index",)
+
+    def __init__(self, index: int) -> None:
+        self.index: int = index
+
+
+def _json_type_name(value: Any) -> str:
+    if isinstance(value, (QuestionNode, _InvalidNode, _CompactRef)):
+        return "dict"
+    return type(value).__name__
 
 
 class Parsing(QuestionNode):
-    def __init__(self, filename: str) -> None:
+    def __init__(
+        self,
+        filename: str,
+        compact_threshold: int = JOURNAL_COMPACT_BYTES,
+        background_writes: bool = False,
+        write_interval: float = 1.0,
+    ) -> None:
         self.filename: str = filename
+        # Lessons are appended to the journal; the JSON file is only the last
+        # snapshot. Mutations of a shared tree should hold `lock`.
+        self.journal: LearningJournal = LearningJournal(f"{filename}.journal")
+        self.cache: TreeCache = TreeCache(filename)
+        self.compact_threshold: int = compact_threshold
+        self.lock: threading.RLock = threading.RLock()
+        # When set, save_json_tree only queues the snapshot for the writer
+        self.background_writes: bool = background_writes
+        self.write_interval: float = write_interval
+        self.writer: Optional[TreeWriter] = None
+        # Journal positions are logical: bytes already folded into a
+        # snapshot and cut from the journal file are counted in the base.
+        self._write_lock: threading.Lock = threading.Lock()
+        self._journal_base: int = 0
+        self._snapshot_position: int = 0
 
     def save_json_tree(self, root: QuestionNode) -> None:
-        with open(self.filename, "w") as f:
-            json.dump(root.to_dict(), f, indent=2)
+        with self.lock:
+            position: int = self._journal_base + self.journal.size()
+        if self.background_writes:
+            self._get_writer().submit(root, position)
+            return
+        self._save_snapshot(root, position)
         print("Tree saved successfully.")
 
-    def load_json_tree(
-        self, default: Optional[QuestionNode] = None, verbose: bool = True
-    ) -> Optional[QuestionNode]:
+    def save_lesson(
+        self,
+        root: QuestionNode,
+        path: str,
+        guess: str,
+        question: str,
+        animal: str,
+        answer: bool,
+    ) -> None:
+        # O(1) alternative to save_json_tree after a wrong guess: the leaf at
+        # `path` that held `guess` now asks `question`.
+        with self.lock:
+            size: int = self.journal.append(path, guess, question, animal, answer)
+            position: int = self._journal_base + size
+        print("Lesson saved successfully.")
+        if size >= self.compact_threshold:
+            self._get_writer().submit(root, position)
+
+    def compact(self, root: QuestionNode, background: bool = True) -> None:
+        # Fold the journal into a new snapshot
+        with self.lock:
+            position: int = self._journal_base + self.journal.size()
+        if background:
+            self._get_writer().submit(root, position)
+            return
+        if self.writer is not None:
+            self.writer.flush()
+        self._save_snapshot(root, position)
+
+    def _get_writer(self) -> TreeWriter:
+        with self.lock:
+            if self.writer is None:
+                self.writer = TreeWriter(self._save_snapshot, self.write_interval)
+            return self.writer
+
+    def _save_snapshot(self, root: Optional[QuestionNode], position: int) -> None:
+        # `root` must contain every lesson journaled before `position`
+        with self._write_lock:
+            if position < self._snapshot_position:
+                # A newer snapshot is already on disk
+                return
+            with self.lock:
+                snapshot: CompactTree = CompactTree.from_node(root)
+            digest: Optional[str] = self._write_snapshot(snapshot.root)
+            if digest is not None:
+                # Rebuild the startup cache from what was just written
+                self.cache.store(snapshot, digest)
+            with self.lock:
+                if position > self._journal_base:
+                    self.journal.truncate(position - self._journal_base)
+                    self._journal_base = position
+            self._snapshot_position = position
+
+    def _write_snapshot(
+        self, root: Optional[QuestionNode], binary: Optional[bool] = None
+    ) -> Optional[str]:
+        # Keep the format of the existing file unless told otherwise. Returns
+        # the SHA-256 of the JSON written, None for the binary format.
+        if binary is None:
+            binary = is_binary_tree(self.filename)
+        if binary:
+            write_binary_tree(root, self.filename)
+            return None
+
+        # Write next to the target and rename, so readers never see a
+        # half-written tree.
+        directory: str = os.path.dirname(os.path.abspath(self.filename))
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=".tree-", suffix=".tmp", dir=directory
+        )
         try:
-            with open(self.filename, "r", encoding="utf-8") as f:
-                data: Dict[str, Any] = json.load(f)
-        except Exception:
-            if verbose:
-                print(f"Error: unable to load/parse tree from '{self.filename}'")
-            return default
+            digest: Any = hashlib.sha256()
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                chunk: str
+                for chunk in self._iter_json_tree(root):
+                    f.write(chunk)
+                    digest.update(chunk.encode("utf-8"))
+            try:
+                mode: int = os.stat(self.filename).st_mode & 0o777
+            except OSError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, self.filename)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return digest.hexdigest()
 
-        valid: bool
-        valid, _ = self._validate_node_dict(data)
-        if not valid:
-            if verbose:
-                print(f"Error: unable to load/parse tree from '{self.filename}'")
-            return default
+    def load_tree(
+        self, default: Optional[QuestionNode] = None, verbose: bool = True
+    ) -> Optional[QuestionNode]:
+        # Detect the format from the file's magic bytes
+        if is_binary_tree(self.filename):
+            return self.load_binary_tree(default=default, verbose=verbose)
+        return self.load_json_tree(default=default, verbose=verbose, use_cache=True)
 
+    def load_binary_tree(
+        self, default: Optional[QuestionNode] = None, verbose: bool = True
+    ) -> Optional[QuestionNode]:
+        # Nodes are materialized from the memory-mapped file on first access
         try:
-            root: Optional[QuestionNode] = self.from_dict(data)
+            root: Optional[QuestionNode] = BinaryTreeReader(self.filename).root()
+            self.journal.replay(root)
             return root
         except Exception:
             if verbose:
                 print(f"Error: unable to load/parse tree from '{self.filename}'")
             return default
 
-    def _validate_node_dict(
-        self, data: Any, path: str = "root"
-    ) -> Tuple[bool, Optional[str]]:
-        if data is None:
-            return True, None
+    def load_json_tree(
+        self,
+        default: Optional[QuestionNode] = None,
+        verbose: bool = True,
+        use_cache: bool = False,
+        stream: bool = False,
+    ) -> Optional[QuestionNode]:
+        # With use_cache, a fresh sidecar cache skips JSON parsing entirely.
+        # With stream, the file is parsed incrementally instead of json.load.
+        cached: Optional[CompactTree] = self.cache.load() if use_cache else None
+        root: Optional[QuestionNode]
+        if cached is not None:
+            root = cached.to_node()
+        else:
+            reason: Optional[str]
+            try:
+                try:
+                    if stream:
+                        root, reason = self._stream_nodes()
+                    else:
+                        with open(self.filename, "r", encoding="utf-8") as f:
+                            root, reason = self._load_nodes(f)
+                except RecursionError:
+                    # Nested deeper than json.load can decode
+                    root, reason = self._stream_nodes()
+            except Exception:
+                if verbose:
+                    print(f"Error: unable to load/parse tree from '{self.filename}'")
+                return default
 
-        if isinstance(data, str):
-            return True, None
+            if reason is not None:
+                if verbose:
+                    print(f"Error: unable to load/parse tree from '{self.filename}': {reason}")
+                return default
+            if use_cache:
+                self.cache.store(CompactTree.from_node(root))
+        self.journal.replay(root)
+        return root
 
-        if not isinstance(data, dict):
-            return (
-                False,
-                f"expected dict or None or str at {path}, got {type(data).__name__}",
-            )
+    def _stream_nodes(self) -> Tuple[Optional[QuestionNode], Optional[str]]:
+        try:
+            with open(self.filename, "rb") as f:
+                return parse_stream(f), None
+        except TreeParseError as e:
+            return None, str(e)
+
+    def _load_nodes(self, f: IO[str]) -> Tuple[Optional[QuestionNode], Optional[str]]:
+        # Single pass: the decoder hands every object to _build_node as soon
+        # as it is parsed (children first), so nodes are validated and built
+        # without keeping the intermediate dict tree around.
+        data: Any = json.load(f, object_hook=self._build_node)
+        if data is None or isinstance(data, QuestionNode):
+            return data, None
+        if isinstance(data, _InvalidNode):
+            return None, data.describe()
+        return None, f"expected dict or None at root, got {type(data).__name__}"
 
-        if "value" not in data:
-            return False, f"missing 'value' key at {path}"
-        if not isinstance(data["value"], str):
-            return (
-                False,
-                f"'value' must be a string at {path}, got {type(data['value']).__name__}",
+    def _build_node(self, obj: Dict[str, Any]) -> Union[QuestionNode, "_InvalidNode"]:
+        invalid: Optional[_InvalidNode] = self._check_node(obj, QuestionNode)
+        if invalid is not None:
+            return invalid
+        node: QuestionNode = QuestionNode(obj["value"])
+        node.yes = obj["yes"]
+        node.no = obj["no"]
+        return node
+
+    @staticmethod
+    def _check_node(obj: Dict[str, Any], node_type: type) -> Optional["_InvalidNode"]:
+        # None if `obj` is a valid node whose branches are None or `node_type`
+        if "value" not in obj:
+            return _InvalidNode("missing 'value' key at {path}")
+        value: Any = obj["value"]
+        if not isinstance(value, str):
+            return _InvalidNode(
+                f"'value' must be a string at {{path}}, got {_json_type_name(value)}"
             )
 
         branch: str
         for branch in ("yes", "no"):
-            if branch in data:
-                ok: bool
-                reason: Optional[str]
-                ok, reason = self._validate_node_dict(
-                    data[branch], path=f"{path}.{branch}"
+            if branch not in obj:
+                return _InvalidNode(f"missing '{branch}' key at {{path}}")
+            child: Any = obj[branch]
+            if child is None or isinstance(child, node_type):
+                continue
+            if isinstance(child, _InvalidNode):
+                child.branches.append(branch)
+                return child
+            invalid: _InvalidNode = _InvalidNode(
+                f"expected dict or None at {{path}}, got {_json_type_name(child)}"
+            )
+            invalid.branches.append(branch)
+            return invalid
+        return None
+
+    def load_compact_tree(
+        self, default: Optional[CompactNode] = None, verbose: bool = True
+    ) -> Optional[CompactNode]:
+        # Same format detection as load_tree, but nodes go straight into the
+        # CompactTree arrays instead of one object (or dict) per node
+        binary: bool = is_binary_tree(self.filename)
+        tree: Optional[CompactTree] = None if binary else self.cache.load()
+        if tree is None:
+            reason: Optional[str] = None
+            try:
+                if binary:
+                    tree = read_compact_tree(self.filename)
+                else:
+                    try:
+                        with open(self.filename, "r", encoding="utf-8") as f:
+                            tree, reason = self._load_compact(f)
+                    except RecursionError:
+                        # Nested deeper than json.load can decode
+                        root: Optional[QuestionNode]
+                        root, reason = self._stream_nodes()
+                        tree = CompactTree.from_node(root)
+            except Exception:
+                if verbose:
+                    print(f"Error: unable to load/parse tree from '{self.filename}'")
+                return default
+
+            if reason is not None:
+                if verbose:
+                    print(f"Error: unable to load/parse tree from '{self.filename}': {reason}")
+                return default
+            if not binary:
+                self.cache.store(tree)
+
+        compact_root: Optional[CompactNode] = tree.root
+        self.journal.replay(compact_root)
+        return compact_root
+
+    def _load_compact(self, f: IO[str]) -> Tuple[CompactTree, Optional[str]]:
+        # Like _load_nodes, but each object the decoder finishes is appended
+        # to the arrays at once; only a small reference per pending node is
+        # alive. Children finish first, so the root ends up last.
+        tree: CompactTree = CompactTree()
+
+        def build(obj: Dict[str, Any]) -> Union[_CompactRef, _InvalidNode]:
+            invalid: Optional[_InvalidNode] = self._check_node(obj, _CompactRef)
+            if invalid is not None:
+                return invalid
+            index: int = tree.add_node(obj["value"])
+            if obj["yes"] is not None:
+                tree.yes_index[index] = obj["yes"].index
+            if obj["no"] is not None:
+                tree.no_index[index] = obj["no"].index
+            return _CompactRef(index)
+
+        data: Any = json.load(f, object_hook=build)
+        if data is None:
+            return CompactTree(), None
+        if isinstance(data, _InvalidNode):
+            return tree, data.describe()
+        if not isinstance(data, _CompactRef):
+            return tree, f"expected dict or None at root, got {type(data).__name__}"
+        # The root must be node 0
+        tree.reverse()
+        return tree, None
+
+    def _validate_node_dict(
+        self, data: Any, path: str = "root"
+    ) -> Tuple[bool, Optional[str]]:
+        # Pre-order walk with an explicit stack: same first error as the
+        # recursive version, without the recursion limit on deep trees.
+        # Paths are kept as (parent, branch) links and only joined on error.
+        stack: List[Tuple[Any, Tuple[Any, str]]] = [(data, (None, path))]
+        while stack:
+            data, link = stack.pop()
+            if data is None or isinstance(data, str):
+                continue
+
+            if not isinstance(data, dict):
+                return (
+                    False,
+                    f"expected dict or None or str at {self._join_path(link)}, got {type(data).__name__}",
                 )
-                if not ok:
-                    return False, reason
+
+            if "value" not in data:
+                return False, f"missing 'value' key at {self._join_path(link)}"
+            if not isinstance(data["value"], str):
+                return (
+                    False,
+                    f"'value' must be a string at {self._join_path(link)}, got {type(data['value']).__name__}",
+                )
+
+            branch: str
+            for branch in ("no", "yes"):
+                if branch in data:
+                    stack.append((data[branch], (link, branch)))
 
         return True, None
+
+    @staticmethod
+    def _join_path(link: Tuple[Any, str]) -> str:
+        parts: List[str] = []
+        while link is not None:
+            link, part = link
+            parts.append(part)
+        return ".".join(reversed(parts))
+
+    def _iter_json_tree(self, root: Optional[QuestionNode]) -> Iterator[str]:
+        # Produces the same text as json.dump(root.to_dict(), f, indent=2)
+        # without building the intermediate dict or recursing. Below
+        # MAX_INDENT_DEPTH nodes are written on one line, otherwise the
+        # indentation alone would make the file quadratic in the tree depth.
+        stack: List[Any] = [(root, 0)]
+        while stack:
+            item: Any = stack.pop()
+            if isinstance(item, str):
+                yield item
+                continue
+
+            node, depth = item
+            if node is None:
+                yield "null"
+                continue
+
+            if depth < MAX_INDENT_DEPTH:
+                opening: str = "{\n" + "  " * (depth + 1)
+                separator: str = ",\n" + "  " * (depth + 1)
+                closing: str = "\n" + "  " * depth + "}"
+            else:
+                opening, separator, closing = "{", ", ", "}"
+            yield f'{opening}"value": {json.dumps(node.value)}{separator}"yes": '
+            stack.append(closing)
+            stack.append((node.no, depth + 1))
+            stack.append(f'{separator}"no": ')
+            stack.append((node.yes, depth + 1))
@@ -0,0 +1,252 @@
+import codecs
+import json
+import re
+from typing import Optional, Any, Dict, List, Union, Iterable, IO
+
+from game.question_node import QuestionNode
+
+CHUNK_SIZE: int = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+_NUMBER_PREFIX = re.compile(r"-?(?:(?:0|[1-9][0-9]*)(?:\.[0-9]*)?(?:[eE][-+]?[0-9]*)?)?")
+_LITERALS: Dict[str, Any] = {"true": True, "false": False, "null": None}
+
+# What the parser expects next
+_VALUE, _KEY_OR_END, _KEY, _COLON, _COMMA_OR_END, _VALUE_OR_END, _DONE = range(7)
+
+
+class TreeParseError(ValueError):
+    pass
+
+
+class _Discarded:
+    # Stand-in for a container that is not a tree node; only its type matters
+    __slots__ = ("type_name",)
+
+    def __init__(self, type_name: str) -> None:
+        self.type_name: str = type_name
+
+
+class _Frame:
+    __slots__ = ("is_array", "is_node", "link", "fields", "key")
+
+    def __init__(self, is_array: bool, is_node: bool, link: Any) -> None:
+        self.is_array: bool = is_array
+        self.is_node: bool = is_node
+        # (parent link, branch) chain, only joined into a path on error
+        self.link: Any = link
+        self.fields: Dict[str, Any] = {}
+        self.key: Optional[str] = None
+
+
+def _join_path(link: Any) -> str:
+    parts: List[str] = []
+    while link is not None:
+        link, part = link
+        parts.append(part)
+    return ".".join(reversed(parts))
+
+
+def _type_name(value: Any) -> str:
+    if isinstance(value, _Discarded):
+        return value.type_name
+    if isinstance(value, QuestionNode):
+        return "dict"
+    return type(value).__name__
+
+
+class StreamingTreeParser:
+    """Incremental JSON tree loader.
+
+    Text is fed in chunks with `feed`; every token is consumed as soon as
+    it is complete and only an unfinished token is kept between chunks.
+    Objects in tree position (the root and the `yes` / `no` branches) become
+    QuestionNodes as soon as they close, other values are checked for
+    syntax and dropped. Nesting is tracked with an explicit stack, so the
+    depth of the tree is not limited by the recursion limit.
+    """
+
+    def __init__(self) -> None:
+        self._buffer: str = ""
+        self._stack: List[_Frame] = []
+        self._expect: int = _VALUE
+        self._root: Any = None
+        self._consumed: int = 0
+        self._decoder: Any = codecs.getincrementaldecoder("utf-8")()
+
+    def feed(self, chunk: Union[str, bytes]) -> None:
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        self._buffer += chunk
+        self._consume(final=False)
+
+    def close(self) -> Optional[QuestionNode]:
+        self._buffer += self._decoder.decode(b"", final=True)
+        self._consume(final=True)
+        if self._expect != _DONE:
+            raise TreeParseError("unexpected end of document")
+        if self._root is None or isinstance(self._root, QuestionNode):
+            return self._root
+        raise TreeParseError(f"expected dict or None at root, got {_type_name(self._root)}")
+
+    def _consume(self, final: bool) -> None:
+        buffer: str = self._buffer
+        end: int = len(buffer)
+        pos: int = 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == end:
+                break
+            char: str = buffer[pos]
+
+            if self._expect == _DONE:
+                raise TreeParseError(f"extra data at offset {self._consumed + pos}")
+
+            if char in "{}[]:,":
+                self._punctuation(char)
+                pos += 1
+                continue
+
+            if char == '"':
+                match = _STRING.match(buffer, pos)
+                if match is None:
+                    if final:
+                        raise TreeParseError("unterminated string")
+                    break
+                try:
+                    text: str = json.decoder.scanstring(buffer, pos + 1)[0]
+                except ValueError as e:
+                    raise TreeParseError(str(e)) from None
+                self._string(text)
+                pos = match.end()
+                continue
+
+            if char == "-" or char.isdigit():
+                if not final and _NUMBER_PREFIX.match(buffer, pos).end() == end:
+                    # The number may continue in the next chunk
+                    break
+                match = _NUMBER.match(buffer, pos)
+                if match is None:
+                    raise TreeParseError(f"invalid number at offset {self._consumed + pos}")
+                number: str = match.group()
+                self._scalar(float(number) if any(c in number for c in ".eE") else int(number))
+                pos = match.end()
+                continue
+
+            literal: Optional[str] = next(
+                (word for word in _LITERALS if buffer.startswith(word, pos)), None
+            )
+            if literal is not None:
+                self._scalar(_LITERALS[literal])
+                pos += len(literal)
+                continue
+            if not final and any(word.startswith(buffer[pos:]) for word in _LITERALS):
+                break
+            raise TreeParseError(
+                f"unexpected character {char!r} at offset {self._consumed + pos}"
+            )
+
+        # Drop everything consumed; only an unfinished token is kept
+        self._buffer = buffer[pos:]
+        self._consumed += pos
+
+    def _punctuation(self, char: str) -> None:
+        expect: int = self._expect
+        if char in "{[":
+            if expect not in (_VALUE, _VALUE_OR_END):
+                raise TreeParseError(f"unexpected {char!r}")
+            self._open(is_array=char == "[")
+        elif char == "}":
+            if expect not in (_KEY_OR_END, _COMMA_OR_END) or self._stack[-1].is_array:
+                raise TreeParseError("unexpected '}'")
+            self._value(self._close_object(self._stack.pop()))
+        elif char == "]":
+            if expect not in (_VALUE_OR_END, _COMMA_OR_END) or not self._stack[-1].is_array:
+                raise TreeParseError("unexpected ']'")
+            self._stack.pop()
+            self._value(_Discarded("list"))
+        elif char == ":":
+            if expect != _COLON:
+                raise TreeParseError("unexpected ':'")
+            self._expect = _VALUE
+        else:
+            if expect != _COMMA_OR_END:
+                raise TreeParseError("unexpected ','")
+            self._expect = _VALUE if self._stack[-1].is_array else _KEY
+
+    def _open(self, is_array: bool) -> None:
+        parent: Optional[_Frame] = self._stack[-1] if self._stack else None
+        if parent is None:
+            is_node, link = True, (None, "root")
+        elif parent.is_node and parent.key in ("yes", "no"):
+            is_node, link = True, (parent.link, parent.key)
+        else:
+            is_node, link = False, None
+        self._stack.append(_Frame(is_array, is_node and not is_array, link))
+        self._expect = _VALUE_OR_END if is_array else _KEY_OR_END
+
+    def _string(self, text: str) -> None:
+        if self._expect in (_KEY_OR_END, _KEY):
+            self._stack[-1].key = text
+            self._expect = _COLON
+        else:
+            self._scalar(text)
+
+    def _scalar(self, value: Any) -> None:
+        if self._expect not in (_VALUE, _VALUE_OR_END):
+            raise TreeParseError(f"unexpected {_type_name(value)} value")
+        self._value(value)
+
+    def _value(self, value: Any) -> None:
+        # A complete value: a scalar, or a container that just closed
+        if not self._stack:
+            self._root = value
+            self._expect = _DONE
+            return
+        frame: _Frame = self._stack[-1]
+        if frame.is_node and frame.key in ("value", "yes", "no"):
+            frame.fields[frame.key] = value
+        self._expect = _COMMA_OR_END
+
+    def _close_object(self, frame: _Frame) -> Union[QuestionNode, _Discarded]:
+        if not frame.is_node:
+            return _Discarded("dict")
+        fields: Dict[str, Any] = frame.fields
+        if "value" not in fields:
+            raise TreeParseError(f"missing 'value' key at {_join_path(frame.link)}")
+        if not isinstance(fields["value"], str):
+            raise TreeParseError(
+                f"'value' must be a string at {_join_path(frame.link)}, got {_type_name(fields['value'])}"
+            )
+        node: QuestionNode = QuestionNode(fields["value"])
+        branch: str
+        for branch in ("yes", "no"):
+            if branch not in fields:
+                raise TreeParseError(f"missing '{branch}' key at {_join_path(frame.link)}")
+            child: Any = fields[branch]
+            if child is not None and not isinstance(child, QuestionNode):
+                raise TreeParseError(
+                    f"expected dict or None at {_join_path((frame.link, branch))}, got {_type_name(child)}"
+                )
+            setattr(node, branch, child)
+        return node
+
+
+def parse_stream(
+    source: Union[IO[Any], Iterable[Union[str, bytes]]], chunk_size: int = CHUNK_SIZE
+) -> Optional[QuestionNode]:
+    """Build a tree from a file object (text or binary) or an iterable of chunks."""
+    parser: StreamingTreeParser = StreamingTreeParser()
+    read: Any = getattr(source, "read", None)
+    if read is not None:
+        while True:
+            chunk: Union[str, bytes] = read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    else:
+        for chunk in source:
+            parser.feed(chunk)
+    return parser.close()
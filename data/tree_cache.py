@@ -0,0 +1,89 @@
+import hashlib
+import marshal
+import os
+import tempfile
+from typing import Optional, Any
+
+from game.compact_tree import CompactTree
+
+CACHE_VERSION: int = 1
+
+
+def file_digest(filename: str) -> str:
+    digest: Any = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TreeCache:
+    """Precompiled copy of a JSON tree stored next to it (``<file>.cache``).
+
+    The cache holds the CompactTree columns in marshal format together with
+    the size, mtime and SHA-256 of the JSON it was built from. It is used
+    when size and mtime still match, or when only the mtime changed but the
+    content hash is the same.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source: str = source
+        self.filename: str = f"{source}.cache"
+
+    def load(self) -> Optional[CompactTree]:
+        try:
+            stat: os.stat_result = os.stat(self.source)
+            with open(self.filename, "rb") as f:
+                # One read: marshal.load on a file object reads in small pieces
+                payload: Any = marshal.loads(f.read())
+            version, size, mtime_ns, digest, strings, values, yes, no = payload
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if version != CACHE_VERSION or size != stat.st_size:
+            return None
+        if mtime_ns != stat.st_mtime_ns:
+            try:
+                if file_digest(self.source) != digest:
+                    return None
+            except OSError:
+                return None
+
+        try:
+            return CompactTree.from_columns(strings, values, yes, no)
+        except (ValueError, TypeError):
+            return None
+
+    def store(self, tree: CompactTree, digest: Optional[str] = None) -> None:
+        # Best effort: a missing cache only costs a slower start
+        try:
+            if digest is None:
+                digest = file_digest(self.source)
+            stat: os.stat_result = os.stat(self.source)
+            payload: tuple = (
+                CACHE_VERSION,
+                stat.st_size,
+                stat.st_mtime_ns,
+                digest,
+                tree.strings,
+                tree.values.tobytes(),
+                tree.yes_index.tobytes(),
+                tree.no_index.tobytes(),
+            )
+            directory: str = os.path.dirname(os.path.abspath(self.filename))
+            fd, tmp_path = tempfile.mkstemp(prefix=".cache-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    marshal.dump(payload, f)
+                os.replace(tmp_path, self.filename)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.filename)
+        except OSError:
+            pass
@@ -0,0 +1,110 @@
+import atexit
+import threading
+import time
+from typing import Optional, Callable, Tuple
+
+from game.question_node import QuestionNode
+
+
+class TreeWriter:
+    """Background thread that writes tree snapshots off the request path.
+
+    Saves submitted while a write is pending are merged: only the most
+    recent (root, journal position) is written, at most once per
+    `interval` seconds. Pending saves are flushed when the process exits.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Optional[QuestionNode], int], None],
+        interval: float = 1.0,
+        name: str = "tree-writer",
+    ) -> None:
+        self.interval: float = interval
+        self._write: Callable[[Optional[QuestionNode], int], None] = write
+        self._condition: threading.Condition = threading.Condition()
+        self._pending: Optional[Tuple[Optional[QuestionNode], int]] = None
+        self._queue_depth: int = 0
+        self._writing: bool = False
+        self._flushing: int = 0
+        self._closed: bool = False
+
+        self.writes: int = 0
+        self.last_flush_latency: Optional[float] = None
+        self.last_error: Optional[Exception] = None
+
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, name=name, daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def queue_depth(self) -> int:
+        # Saves submitted since the last write started, merged into the next one
+        with self._condition:
+            return self._queue_depth
+
+    def submit(self, root: Optional[QuestionNode], position: int) -> None:
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("TreeWriter is closed")
+            self._pending = (root, position)
+            self._queue_depth += 1
+            self._condition.notify_all()
+
+    def flush(self) -> None:
+        # Write what is pending now instead of waiting for the interval
+        with self._condition:
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                while self._pending is not None or self._writing:
+                    self._condition.wait()
+            finally:
+                self._flushing -= 1
+
+    def close(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+
+                # Coalescing window: later submits replace the pending root
+                deadline: float = time.monotonic() + self.interval
+                while not self._closed and not self._flushing:
+                    remaining: float = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                root, position = self._pending
+                self._pending = None
+                self._queue_depth = 0
+                self._writing = True
+
+            start: float = time.perf_counter()
+            try:
+                self._write(root, position)
+                error: Optional[Exception] = None
+            except Exception as e:
+                print(f"Error: background tree write failed: {e}")
+                error = e
+
+            with self._condition:
+                self.last_flush_latency = time.perf_counter() - start
+                self.last_error = error
+                self.writes += 1
+                self._writing = False
+                self._condition.notify_all()
@@ -0,0 +1,229 @@
+from array import array
+from typing import Optional, Dict, Any, List, Union, Tuple
+
+from game.question_node import QuestionNode
+
+NO_CHILD: int = -1
+
+
+class CompactTree:
+    """Question tree stored as flat typed arrays plus a string table.
+
+    Node ``i`` has its text at ``strings[values[i]]`` and its children at
+    ``yes_index[i]`` / ``no_index[i]`` (``NO_CHILD`` for a missing branch).
+    The root is always node 0.
+    """
+
+    __slots__ = ("strings", "_string_ids", "values", "yes_index", "no_index")
+
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self.values: array = array("i")
+        self.yes_index: array = array("i")
+        self.no_index: array = array("i")
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def root(self) -> Optional["CompactNode"]:
+        return self.node(0)
+
+    def node(self, index: int) -> Optional["CompactNode"]:
+        if index == NO_CHILD or index >= len(self.values):
+            return None
+        return CompactNode(self, index)
+
+    def intern(self, value: str) -> int:
+        string_id: Optional[int] = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+    def add_node(self, value: str) -> int:
+        self.values.append(self.intern(value))
+        self.yes_index.append(NO_CHILD)
+        self.no_index.append(NO_CHILD)
+        return len(self.values) - 1
+
+    def graft(self, source: Union["CompactNode", QuestionNode, None]) -> int:
+        """Append a copy of ``source`` and its subtree, returning its index."""
+        if source is None:
+            return NO_CHILD
+        if isinstance(source, CompactNode) and source.tree is self:
+            return source.index
+
+        top: int = self.add_node(source.value)
+        stack: List[Tuple[Any, int]] = [(source, top)]
+        while stack:
+            node, index = stack.pop()
+            if node.yes is not None:
+                child: int = self.add_node(node.yes.value)
+                self.yes_index[index] = child
+                stack.append((node.yes, child))
+            if node.no is not None:
+                child = self.add_node(node.no.value)
+                self.no_index[index] = child
+                stack.append((node.no, child))
+        return top
+
+    @classmethod
+    def from_node(cls, root: Optional[QuestionNode]) -> "CompactTree":
+        tree: CompactTree = cls()
+        tree.graft(root)
+        return tree
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "CompactTree":
+        tree: CompactTree = cls()
+        if data is None:
+            return tree
+
+        tree.add_node(data["value"])
+        stack: List[Tuple[Dict[str, Any], int]] = [(data, 0)]
+        while stack:
+            item, index = stack.pop()
+            yes: Optional[Dict[str, Any]] = item["yes"]
+            no: Optional[Dict[str, Any]] = item["no"]
+            if yes is not None:
+                child: int = tree.add_node(yes["value"])
+                tree.yes_index[index] = child
+                stack.append((yes, child))
+            if no is not None:
+                child = tree.add_node(no["value"])
+                tree.no_index[index] = child
+                stack.append((no, child))
+        return tree
+
+    @classmethod
+    def from_columns(
+        cls, strings: List[str], values: bytes, yes_index: bytes, no_index: bytes
+    ) -> "CompactTree":
+        # Rebuild a tree from the raw column buffers (see TreeCache)
+        tree: CompactTree = cls()
+        tree.strings = strings
+        tree._string_ids = {value: string_id for string_id, value in enumerate(strings)}
+        tree.values.frombytes(values)
+        tree.yes_index.frombytes(yes_index)
+        tree.no_index.frombytes(no_index)
+        if not len(tree.values) == len(tree.yes_index) == len(tree.no_index):
+            raise ValueError("CompactTree columns have different lengths")
+        return tree
+
+    def reverse(self) -> None:
+        """Renumber the nodes last to first, e.g. to make a root built last node 0."""
+        last: int = len(self.values) - 1
+        self.values.reverse()
+        column: array
+        for column in (self.yes_index, self.no_index):
+            column.reverse()
+            position: int
+            child: int
+            for position, child in enumerate(column):
+                if child != NO_CHILD:
+                    column[position] = last - child
+
+    def to_node(self, index: int = 0) -> Optional[QuestionNode]:
+        # Build linked QuestionNodes for the subtree at `index`
+        if index == NO_CHILD or index >= len(self.values):
+            return None
+        if index != 0:
+            return QuestionNode("").from_dict(self.to_dict(index))
+
+        # Whole tree: create every node, then link them by index
+        strings: List[str] = self.strings
+        nodes: List[QuestionNode] = [QuestionNode(strings[value]) for value in self.values]
+        position: int
+        child: int
+        for position, child in enumerate(self.yes_index):
+            if child != NO_CHILD:
+                nodes[position].yes = nodes[child]
+        for position, child in enumerate(self.no_index):
+            if child != NO_CHILD:
+                nodes[position].no = nodes[child]
+        return nodes[0]
+
+    def to_dict(self, index: int = 0) -> Optional[Dict[str, Any]]:
+        if index == NO_CHILD or index >= len(self.values):
+            return None
+
+        result: Dict[str, Any] = self._leaf_dict(index)
+        stack: List[Tuple[int, Dict[str, Any]]] = [(index, result)]
+        while stack:
+            current, out = stack.pop()
+            branch: str
+            children: array
+            for branch, children in (("yes", self.yes_index), ("no", self.no_index)):
+                child: int = children[current]
+                if child != NO_CHILD:
+                    child_dict: Dict[str, Any] = self._leaf_dict(child)
+                    out[branch] = child_dict
+                    stack.append((child, child_dict))
+        return result
+
+    def _leaf_dict(self, index: int) -> Dict[str, Any]:
+        return {"value": self.strings[self.values[index]], "yes": None, "no": None}
+
+    def nbytes(self) -> int:
+        """Size of the node arrays in bytes, excluding the string table."""
+        return sum(
+            len(column) * column.itemsize
+            for column in (self.values, self.yes_index, self.no_index)
+        )
+
+
+class CompactNode:
+    """Lightweight view of one node of a CompactTree.
+
+    Exposes the same ``value`` / ``yes`` / ``no`` attributes as QuestionNode so
+    the game loops can walk either representation.
+    """
+
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree: CompactTree, index: int) -> None:
+        self.tree: CompactTree = tree
+        self.index: int = index
+
+    @property
+    def value(self) -> str:
+        return self.tree.strings[self.tree.values[self.index]]
+
+    @value.setter
+    def value(self, value: str) -> None:
+        self.tree.values[self.index] = self.tree.intern(value)
+
+    @property
+    def yes(self) -> Optional["CompactNode"]:
+        return self.tree.node(self.tree.yes_index[self.index])
+
+    @yes.setter
+    def yes(self, node: Union["CompactNode", QuestionNode, None]) -> None:
+        self.tree.yes_index[self.index] = self.tree.graft(node)
+
+    @property
+    def no(self) -> Optional["CompactNode"]:
+        return self.tree.node(self.tree.no_index[self.index])
+
+    @no.setter
+    def no(self, node: Union["CompactNode", QuestionNode, None]) -> None:
+        self.tree.no_index[self.index] = self.tree.graft(node)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.tree.to_dict(self.index)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, CompactNode)
+            and other.tree is self.tree
+            and other.index == self.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+
+    def __repr__(self) -> str:
+        return f"CompactNode({self.index}, {self.value!r})"
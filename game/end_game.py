@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Optional, Union
 from game.question_node import QuestionNode
 from game.interaction import Interaction
 from data.parsing import Parsing
@@ -18,7 +18,7 @@ class EndGame:
         self.info: AnimalInfo = AnimalInfo()
         self.player: Player = player
 
-    def end_game(self, node: QuestionNode) -> None:
+    def end_game(self, node: QuestionNode, path: Optional[str] = None) -> None:
         final_answer: str = self.interaction.requestInput(
             f"Is it a {node.value}? (true/false)", "bool"
         )
@@ -31,9 +31,9 @@ class EndGame:
                 self.player.score.victory()
                 print(f"\n✅ Victory! You earned {self.player.score.actual_score} points!")
         else:
-            self._improve_game(node)
+            self._improve_game(node, path)
 
-    def _improve_game(self, node: QuestionNode) -> None:
+    def _improve_game(self, node: QuestionNode, path: Optional[str] = None) -> None:
         correct_animal: str = self.interaction.requestInput(
             "Oh no! What was your animal? ", "str"
         )
@@ -46,6 +46,7 @@ class EndGame:
             "bool",
         )
 
+        guess: str = node.value
         new_node: QuestionNode = QuestionNode(new_question)
         yes_node: QuestionNode = QuestionNode(correct_animal)
         no_node: QuestionNode = QuestionNode(node.value)
@@ -62,7 +63,13 @@ class EndGame:
         node.no = new_node.no
 
         print("Got it! I'll remember that for next time.")
-        self.parsing.save_json_tree(self.root)
+        if path is None:
+            self.parsing.save_json_tree(self.root)
+        else:
+            # Only append the lesson; the snapshot is compacted in the background
+            self.parsing.save_lesson(
+                self.root, path, guess, new_question, correct_animal, answer == "true"
+            )
         
         if self.player:
             self.player.score.game_over()
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 
 class QuestionNode:
@@ -13,16 +13,38 @@ class QuestionNode:
         self.no: Optional["QuestionNode"] = no  # Node if answer is "No"
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "value": self.value,
-            "yes": self.yes.to_dict() if self.yes else None,
-            "no": self.no.to_dict() if self.no else None,
-        }
+        # Explicit stack instead of recursion so deep trees don't hit RecursionError
+        result: Dict[str, Any] = {"value": self.value, "yes": None, "no": None}
+        stack: List[Tuple[QuestionNode, Dict[str, Any]]] = [(self, result)]
+        while stack:
+            node, out = stack.pop()
+            if node.yes is not None:
+                yes_dict: Dict[str, Any] = {"value": node.yes.value, "yes": None, "no": None}
+                out["yes"] = yes_dict
+                stack.append((node.yes, yes_dict))
+            if node.no is not None:
+                no_dict: Dict[str, Any] = {"value": node.no.value, "yes": None, "no": None}
+                out["no"] = no_dict
+                stack.append((node.no, no_dict))
+        return result
 
     def from_dict(self, data: Optional[Dict[str, Any]]) -> Optional["QuestionNode"]:
         if data is None:
             return None
-        node: QuestionNode = QuestionNode(data["value"])
-        node.yes = self.from_dict(data["yes"])
-        node.no = self.from_dict(data["no"])
-        return node
+        root: QuestionNode = QuestionNode(data["value"])
+        stack: List[Tuple[QuestionNode, Dict[str, Any]]] = [(root, data)]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            node, item = pop()
+            yes: Optional[Dict[str, Any]] = item["yes"]
+            no: Optional[Dict[str, Any]] = item["no"]
+            if yes is not None:
+                child: QuestionNode = QuestionNode(yes["value"])
+                node.yes = child
+                push((child, yes))
+            if no is not None:
+                child = QuestionNode(no["value"])
+                node.no = child
+                push((child, no))
+        return root
@@ -1,14 +1,20 @@
-from typing import Optional
+from typing import Optional, Union
 from data.parsing import Parsing
 from game.question_node import QuestionNode
+from game.compact_tree import CompactNode
 
 
 class QuestionTree:
-    def __init__(self, filename: str) -> None:
+    def __init__(
+        self, filename: str, compact: bool = False, parsing: Optional[Parsing] = None
+    ) -> None:
         self.filename: str = filename
-        self.parsing: Parsing = Parsing(filename)
+        self.parsing: Parsing = parsing if parsing is not None else Parsing(filename)
         # En mode strict: ne pas utiliser de racine par défaut, lever une erreur
         # si le fichier ne peut pas être chargé.
-        self.root: Optional[QuestionNode] = self.parsing.load_json_tree(
-            default=None, verbose=True
-        )
+        # En mode compact, l'arbre est stocké dans des tableaux (CompactTree).
+        self.root: Optional[Union[QuestionNode, CompactNode]]
+        if compact:
+            self.root = self.parsing.load_compact_tree(default=None, verbose=True)
+        else:
+            self.root = self.parsing.load_tree(default=None, verbose=True)
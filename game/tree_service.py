@@ -0,0 +1,44 @@
+from typing import Optional
+from game.question_tree import QuestionTree
+from game.question_node import QuestionNode
+from game.versioned_tree import VersionedTree, TreeVersion
+from data.parsing import Parsing
+
+
+class TreeService:
+    """One in-memory tree shared by every game session of the process.
+
+    Sessions pin the version they start a game on and read it without
+    locking; lessons go through `learn`, which publishes a new version and
+    journals the lesson.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename: str = filename
+        # Snapshots are written by a background thread, off the request path
+        self.tree: QuestionTree = QuestionTree(
+            filename, parsing=Parsing(filename, background_writes=True)
+        )
+        self.parsing: Parsing = self.tree.parsing
+        self.versions: VersionedTree = VersionedTree(self.tree.root)
+
+    @property
+    def root(self) -> Optional[QuestionNode]:
+        return self.versions.root
+
+    def current_version(self) -> TreeVersion:
+        return self.versions.current
+
+    def learn(
+        self, path: str, guess: str, question: str, animal: str, answer: bool
+    ) -> bool:
+        # False when another session already taught something at this leaf
+        with self.parsing.lock:
+            version: Optional[TreeVersion] = self.versions.learn(
+                path, guess, question, animal, answer
+            )
+            if version is None:
+                return False
+            self.tree.root = version.root
+            self.parsing.save_lesson(version.root, path, guess, question, animal, answer)
+        return True
@@ -0,0 +1,96 @@
+import threading
+import weakref
+from typing import Optional, List, Any
+
+from game.question_node import QuestionNode
+
+
+class FrozenNode(QuestionNode):
+    """QuestionNode that cannot be modified after construction."""
+
+    def __init__(
+        self,
+        value: str,
+        yes: Optional[QuestionNode] = None,
+        no: Optional[QuestionNode] = None,
+    ) -> None:
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "yes", yes)
+        object.__setattr__(self, "no", no)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("FrozenNode is immutable, use VersionedTree.learn")
+
+
+class TreeVersion:
+    """One published root. Sessions keep a reference to the version they play on."""
+
+    def __init__(self, number: int, root: Optional[QuestionNode]) -> None:
+        self.number: int = number
+        self.root: Optional[QuestionNode] = root
+
+
+class VersionedTree:
+    """Copy-on-write tree: every lesson publishes a new version.
+
+    A lesson copies only the nodes on the path from the root to the taught
+    leaf; all other subtrees are shared with the previous version. Nodes
+    reachable from a published version are never modified, so readers need
+    no lock and never see a half-applied lesson. A version is freed by the
+    garbage collector once no session references it any more.
+    """
+
+    def __init__(self, root: Optional[QuestionNode]) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._live: "weakref.WeakSet[TreeVersion]" = weakref.WeakSet()
+        self.current: TreeVersion = self._publish(0, root)
+
+    @property
+    def root(self) -> Optional[QuestionNode]:
+        return self.current.root
+
+    def live_versions(self) -> List[int]:
+        return sorted(version.number for version in list(self._live))
+
+    def learn(
+        self, path: str, guess: str, question: str, animal: str, answer: bool
+    ) -> Optional[TreeVersion]:
+        # None when the leaf at `path` is no longer `guess` in the current version
+        with self._lock:
+            base: TreeVersion = self.current
+            branches: List[str] = path.split(".")[1:]
+
+            nodes: List[QuestionNode] = []
+            node: Optional[QuestionNode] = base.root
+            branch: str
+            for branch in branches:
+                if node is None:
+                    return None
+                nodes.append(node)
+                node = node.yes if branch == "yes" else node.no
+            if node is None or node.yes is not None or node.no is not None:
+                return None
+            if node.value != guess:
+                return None
+
+            yes_node: FrozenNode = FrozenNode(animal)
+            no_node: FrozenNode = FrozenNode(node.value)
+            if not answer:
+                yes_node, no_node = no_node, yes_node
+            copy: QuestionNode = FrozenNode(question, yes_node, no_node)
+
+            # Rebuild the ancestors bottom-up, sharing the untouched branches
+            parent: QuestionNode
+            for parent, branch in zip(reversed(nodes), reversed(branches)):
+                if branch == "yes":
+                    copy = FrozenNode(parent.value, copy, parent.no)
+                else:
+                    copy = FrozenNode(parent.value, parent.yes, copy)
+
+            self.current = self._publish(base.number + 1, copy)
+            return self.current
+
+    def _publish(self, number: int, root: Optional[QuestionNode]) -> TreeVersion:
+        version: TreeVersion = TreeVersion(number, root)
+        self._live.add(version)
+        return version
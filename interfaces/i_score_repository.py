@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Tuple
 
 
 class IScoreRepository(ABC):
@@ -18,4 +19,30 @@ class IScoreRepository(ABC):
 
     @abstractmethod
     def save_score(self, username: str, score: int) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def add_to_score(self, username: str, delta: int) -> int:
+        """Add `delta` to the user's total in one atomic step and return the new total."""
+        pass
+
+    @abstractmethod
+    def all_scores(self) -> Dict[str, int]:
+        """Every user's total, read in one pass (used to build the leaderboard)."""
+        pass
+
+    # Batch operations. These defaults make one call per user; backends
+    # override them to use a single storage pass.
+
+    def get_user_scores(self, usernames: Iterable[str]) -> Dict[str, int]:
+        """Totals of several users; unknown users are created with 0, like get_user_score."""
+        return {username: self.get_user_score(username) for username in usernames}
+
+    def save_scores(self, rows: Iterable[Tuple[str, int]]) -> None:
+        for username, score in rows:
+            self.save_score(username, score)
+
+    def ensure_users(self, usernames: Iterable[str]) -> None:
+        for username in usernames:
+            if not self.user_exists(username):
+                self.create_user(username)
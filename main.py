@@ -4,6 +4,7 @@ from game.interaction import Interaction
 from game.question_tree import QuestionTree
 from game.question_node import QuestionNode
 from game.player import Player
+from api.prefetcher import Prefetcher
 
 class PlayGame:
     def __init__(self, filename: str, username: str) -> None:
@@ -11,19 +12,23 @@ class PlayGame:
         self.interaction: Interaction = Interaction()
         self.player: Player = Player(username)
         self.end_game: EndGame = EndGame(filename, self.question_tree.root, self.player)
+        # Warms the end game's AnimalInfo while the player answers
+        self.prefetcher: Prefetcher = Prefetcher(self.end_game.info)
 
-    def _game_body(self, node: QuestionNode) -> None:
+    def _game_body(self, node: QuestionNode, path: str = "root") -> None:
+        self.prefetcher.update(node)
         if node.yes is None and node.no is None:
-            self.end_game.end_game(node)
+            self.end_game.end_game(node, path)
+            self.prefetcher.cancel()
         else:
             answer: str = self.interaction.requestInput(
                 f"{node.value} (true/false) ", "bool"
             )
             self.player.score.add_point()
             if answer == "true":
-                self._game_body(node.yes)
+                self._game_body(node.yes, f"{path}.yes")
             else:
-                self._game_body(node.no)
+                self._game_body(node.no, f"{path}.no")
 
     def _play(self) -> None:
         print("Welcome to the 20 Questions Game!")
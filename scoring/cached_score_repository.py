@@ -0,0 +1,252 @@
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Optional, Iterable
+from interfaces.i_score_repository import IScoreRepository
+
+
+class CachedScoreRepository(IScoreRepository):
+    """Keeps user totals in memory in front of another repository.
+
+    Reads are served from an LRU of at most `capacity` users. Saved scores
+    update the cache at once and are written to the wrapped repository by a
+    background thread every `flush_interval` seconds, in the order they
+    were made; a `flush_interval` of 0 writes through. Users with unwritten
+    scores are never evicted. One instance can be shared by all sessions.
+
+    Cached totals do not see writes made by other processes. When several
+    processes share the backend, set `ttl` so totals older than `ttl`
+    seconds are read again (totals with unwritten changes are kept).
+    """
+
+    def __init__(
+        self,
+        repository: IScoreRepository,
+        capacity: int = 1024,
+        flush_interval: float = 1.0,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.repository: IScoreRepository = repository
+        self.capacity: int = capacity
+        self.flush_interval: float = flush_interval
+        self.ttl: Optional[float] = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._lock: threading.Lock = threading.Lock()
+        self._flush_lock: threading.Lock = threading.Lock()
+        self._totals: "OrderedDict[str, int]" = OrderedDict()
+        self._stored_at: Dict[str, float] = {}
+        # (username, value, is_delta): a saved total or an increment
+        self._pending: List[Tuple[str, int, bool]] = []
+        self._dirty: Dict[str, int] = {}
+        self._closed: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, name="score-writer", daemon=True
+        )
+        if flush_interval > 0:
+            self._thread.start()
+            atexit.register(self.close)
+
+    def user_exists(self, username: str) -> bool:
+        with self._lock:
+            if self._cached(username) is not None:
+                self._hit(username)
+                return True
+            self.misses += 1
+        return self.repository.user_exists(username)
+
+    def create_user(self, username: str) -> None:
+        # The user may already exist with a total: nothing is cached here,
+        # the next read loads the real value
+        self.repository.create_user(username)
+
+    def get_user_score(self, username: str) -> int:
+        with self._lock:
+            total: Optional[int] = self._cached(username)
+            if total is not None:
+                self._hit(username)
+                return total
+            self.misses += 1
+        total = self.repository.get_user_score(username)
+        with self._lock:
+            # A save made while reading wins over the value read
+            if username in self._totals:
+                return self._totals[username]
+            self._store(username, total)
+        return total
+
+    def save_score(self, username: str, score: int) -> None:
+        with self._lock:
+            self._store(username, score)
+            if self.flush_interval > 0:
+                self._queue(username, score, False)
+                return
+        self.repository.save_score(username, score)
+
+    def add_to_score(self, username: str, delta: int) -> int:
+        if self.flush_interval <= 0:
+            total: int = self.repository.add_to_score(username, delta)
+            with self._lock:
+                self._store(username, total)
+            return total
+
+        # Make sure the base total is cached, then apply the increment in memory
+        self.get_user_score(username)
+        with self._lock:
+            total = self._totals.get(username, 0) + delta
+            self._store(username, total)
+            self._queue(username, delta, True)
+        return total
+
+    def get_user_scores(self, usernames: Iterable[str]) -> Dict[str, int]:
+        wanted: List[str] = list(dict.fromkeys(usernames))
+        result: Dict[str, int] = {}
+        missing: List[str] = []
+        with self._lock:
+            username: str
+            for username in wanted:
+                total: Optional[int] = self._cached(username)
+                if total is not None:
+                    self._hit(username)
+                    result[username] = total
+                else:
+                    self.misses += 1
+                    missing.append(username)
+        if missing:
+            # One backend call for every user not in the cache
+            fetched: Dict[str, int] = self.repository.get_user_scores(missing)
+            with self._lock:
+                for username, total in fetched.items():
+                    if username in self._totals:
+                        result[username] = self._totals[username]
+                    else:
+                        self._store(username, total)
+                        result[username] = total
+        return {username: result[username] for username in wanted}
+
+    def save_scores(self, rows: Iterable[Tuple[str, int]]) -> None:
+        rows = list(rows)
+        with self._lock:
+            username: str
+            score: int
+            for username, score in rows:
+                self._store(username, score)
+                if self.flush_interval > 0:
+                    self._queue(username, score, False)
+            if self.flush_interval > 0:
+                return
+        self.repository.save_scores(rows)
+
+    def ensure_users(self, usernames: Iterable[str]) -> None:
+        with self._lock:
+            missing: List[str] = [
+                username for username in usernames if self._cached(username) is None
+            ]
+        if missing:
+            self.repository.ensure_users(missing)
+
+    def all_scores(self) -> Dict[str, int]:
+        # Unwritten scores must reach the backend before it is listed
+        self.flush()
+        return self.repository.all_scores()
+
+    def flush(self) -> None:
+        # Write every pending score to the wrapped repository now
+        with self._flush_lock:
+            with self._lock:
+                pending: List[Tuple[str, int, bool]] = self._pending
+                self._pending = []
+            written: int = 0
+            try:
+                while written < len(pending):
+                    username, value, is_delta = pending[written]
+                    if is_delta:
+                        # Increments stay atomic against other writers of the backend
+                        self.repository.add_to_score(username, value)
+                        written += 1
+                        continue
+                    # Consecutive saves go out in one batch
+                    end: int = written
+                    while end < len(pending) and not pending[end][2]:
+                        end += 1
+                    self.repository.save_scores(
+                        [(username, value) for username, value, _ in pending[written:end]]
+                    )
+                    written = end
+            finally:
+                with self._lock:
+                    # Scores that failed to write go back to the front of the queue
+                    self._pending[:0] = pending[written:]
+                    for username, value, is_delta in pending[:written]:
+                        self._dirty[username] -= 1
+                        if not self._dirty[username]:
+                            del self._dirty[username]
+                    self._evict()
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._thread.is_alive():
+            self._thread.join()
+            atexit.unregister(self.close)
+        self.flush()
+
+    @property
+    def hit_rate(self) -> float:
+        with self._lock:
+            lookups: int = self.hits + self.misses
+            return self.hits / lookups if lookups else 0.0
+
+    def _hit(self, username: str) -> None:
+        self.hits += 1
+        self._totals.move_to_end(username)
+
+    def _cached(self, username: str) -> Optional[int]:
+        # The cached total, or None if absent or older than ttl
+        total: Optional[int] = self._totals.get(username)
+        if (
+            total is not None
+            and self.ttl is not None
+            and username not in self._dirty
+            and time.monotonic() - self._stored_at[username] > self.ttl
+        ):
+            del self._totals[username]
+            del self._stored_at[username]
+            return None
+        return total
+
+    def _store(self, username: str, total: int) -> None:
+        self._totals[username] = total
+        self._totals.move_to_end(username)
+        self._stored_at[username] = time.monotonic()
+        self._evict()
+
+    def _queue(self, username: str, value: int, is_delta: bool) -> None:
+        self._pending.append((username, value, is_delta))
+        self._dirty[username] = self._dirty.get(username, 0) + 1
+
+    def _evict(self) -> None:
+        # Drop least recently used users, skipping those with unwritten scores
+        excess: int = len(self._totals) - self.capacity
+        if excess <= 0:
+            return
+        evicted: List[str] = []
+        username: str
+        for username in self._totals:
+            if len(evicted) == excess:
+                break
+            if username not in self._dirty:
+                evicted.append(username)
+        for username in evicted:
+            del self._totals[username]
+            del self._stored_at[username]
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error: background score write failed: {e}")
@@ -0,0 +1,213 @@
+import csv
+import io
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple, Iterable
+from interfaces.i_score_repository import IScoreRepository
+from scoring.file_lock import file_lock, atomic_replace, BatchedFileWriter
+
+# (operation, username, value) with operation "create", "save" or "add"
+Change = Tuple[str, str, int]
+
+HEADER: List[str] = ['username', 'last_score', 'score_total']
+
+
+class CSVLogScoreRepository(IScoreRepository):
+    """scoring.csv used as an append-only log, without pandas.
+
+    Same file format as CSVScoreRepository: changes append lines with the
+    `csv` module under a file lock, and changes queued while another thread
+    writes go out in a single append. Totals are kept in an in-memory
+    index built from the file at startup and then extended with only the
+    lines appended since the last read, also by other processes, so lookups
+    do not scan the history. `compact` collapses the history to one row per
+    user.
+    """
+
+    def __init__(self, filename: str = './scoring.csv') -> None:
+
+        self.filename: str = filename
+        self.lock_filename: str = f"{filename}.lock"
+        self._lock: threading.RLock = threading.RLock()
+        self._totals: Dict[str, int] = {}
+        self._offset: int = 0
+        self._inode: Optional[int] = None
+        self._writer: BatchedFileWriter[Change, int] = BatchedFileWriter(
+            self.lock_filename, self._commit
+        )
+        with file_lock(self.lock_filename):
+            self._ensure_file_exists()
+        self._refresh()
+
+    def _ensure_file_exists(self) -> None:
+
+        if not os.path.exists(self.filename):
+            with open(self.filename, 'w', encoding='utf-8', newline='') as f:
+                csv.writer(f, lineterminator='\n').writerow(HEADER)
+
+    def user_exists(self, username: str) -> bool:
+
+        with self._lock:
+            self._refresh()
+            return username in self._totals
+
+    def create_user(self, username: str) -> None:
+
+        with self._lock:
+            self._refresh()
+            if username in self._totals:
+                return
+        self._writer.submit(('create', username, 0))
+
+    def get_user_score(self, username: str) -> int:
+
+        with self._lock:
+            self._refresh()
+            total: Optional[int] = self._totals.get(username)
+        if total is None:
+            self.create_user(username)
+            return 0
+        return total
+
+    def save_score(self, username: str, score: int) -> None:
+
+        self._writer.submit(('save', username, score))
+
+    def add_to_score(self, username: str, delta: int) -> int:
+
+        return self._writer.submit(('add', username, delta))
+
+    def all_scores(self) -> Dict[str, int]:
+
+        with self._lock:
+            self._refresh()
+            return dict(self._totals)
+
+    def get_user_scores(self, usernames: Iterable[str]) -> Dict[str, int]:
+
+        wanted: List[str] = list(dict.fromkeys(usernames))
+        with self._lock:
+            self._refresh()
+            totals: Dict[str, int] = {
+                username: self._totals[username] for username in wanted if username in self._totals
+            }
+        missing: List[str] = [username for username in wanted if username not in totals]
+        if missing:
+            self.ensure_users(missing)
+        return {username: totals.get(username, 0) for username in wanted}
+
+    def save_scores(self, rows: Iterable[Tuple[str, int]]) -> None:
+
+        self._writer.submit_many([('save', username, score) for username, score in rows])
+
+    def ensure_users(self, usernames: Iterable[str]) -> None:
+
+        with self._lock:
+            self._refresh()
+            missing: List[str] = [username for username in usernames if username not in self._totals]
+        self._writer.submit_many([('create', username, 0) for username in missing])
+
+    def compact(self) -> int:
+        """Rewrite the log with only the latest row of each user; returns rows dropped."""
+        # File lock first, as in _commit, so the two cannot deadlock
+        with file_lock(self.lock_filename), self._lock:
+            latest: Dict[str, List[str]] = {}
+            count: int = 0
+            with open(self.filename, 'r', encoding='utf-8', newline='') as f:
+                rows = csv.reader(f)
+                next(rows, None)
+                row: List[str]
+                for row in rows:
+                    if row:
+                        latest[row[0]] = row
+                        count += 1
+
+            with atomic_replace(self.filename) as temp_path:
+                with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                    writer = csv.writer(f, lineterminator='\n')
+                    writer.writerow(HEADER)
+                    writer.writerows(latest.values())
+            self._refresh()
+            return count - len(latest)
+
+    def _commit(self, changes: List[Change]) -> List[int]:
+        # Runs under the file lock: catch up with other writers, then one append
+        with self._lock:
+            self._refresh()
+            line: io.StringIO = io.StringIO()
+            writer = csv.writer(line, lineterminator='\n')
+            results: List[int] = []
+            # Totals as changed by the earlier entries of this batch
+            batch: Dict[str, int] = {}
+
+            operation: str
+            username: str
+            value: int
+            for operation, username, value in changes:
+                total: Optional[int] = batch.get(username, self._totals.get(username))
+                if operation == 'create':
+                    if total is not None:
+                        results.append(total)
+                        continue
+                    last_score, total = 0, 0
+                elif operation == 'save':
+                    last_score, total = value, value
+                else:
+                    last_score, total = value, (total or 0) + value
+                writer.writerow([username, last_score, total])
+                batch[username] = total
+                results.append(total)
+
+            if line.tell():
+                with open(self.filename, 'a', encoding='utf-8', newline='') as f:
+                    f.write(line.getvalue())
+            self._refresh()
+            return results
+
+    def _refresh(self) -> None:
+        # Index the complete lines appended since the last call
+        try:
+            f = open(self.filename, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            stat: os.stat_result = os.fstat(f.fileno())
+            if stat.st_ino != self._inode or stat.st_size < self._offset:
+                # First read, or the file was compacted: rebuild the index
+                self._totals = {}
+                self._offset = 0
+                self._inode = stat.st_ino
+            if stat.st_size == self._offset:
+                return
+            f.seek(self._offset)
+            data: bytes = f.read()
+
+        end: int = data.rfind(b'\n') + 1
+        lines: List[str] = data[:end].decode('utf-8').splitlines()
+        if self._offset == 0:
+            lines = lines[1:]
+        row: List[str]
+        for row in csv.reader(lines):
+            if row:
+                self._totals[row[0]] = int(float(row[2]))
+        self._offset += end
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) not in (2, 3) or argv[1] != 'compact':
+        print("Usage: python -m scoring.csv_log_score_repository compact [scoring.csv]")
+        return 1
+
+    filename: str = argv[2] if len(argv) == 3 else './scoring.csv'
+    try:
+        dropped: int = CSVLogScoreRepository(filename).compact()
+    except (OSError, ValueError, IndexError) as e:
+        print(f"Error: unable to compact '{filename}': {e}")
+        return 1
+    print(f"Compacted '{filename}': {dropped} history rows removed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,12 +1,30 @@
+import os
+from typing import Dict, List, Optional, Tuple, Iterable
 import pandas as pd
 from interfaces.i_score_repository import IScoreRepository
+from scoring.file_lock import file_lock, atomic_replace, BatchedFileWriter
+
+# (operation, username, value) with operation "create", "save" or "add"
+Change = Tuple[str, str, int]
 
 
 class CSVScoreRepository(IScoreRepository):
+    """Scores in scoring.csv, safe to share between processes.
+
+    Every write is a read-modify-write of the whole file under an advisory
+    lock on ``<file>.lock``, and the new file replaces the old one
+    atomically, so readers never see a partial file. Writes that queue up
+    while another thread holds the lock are applied together in one
+    rewrite.
+    """
 
     def __init__(self, filename: str = './scoring.csv') -> None:
 
         self.filename: str = filename
+        self.lock_filename: str = f"{filename}.lock"
+        self._writer: BatchedFileWriter[Change, int] = BatchedFileWriter(
+            self.lock_filename, self._commit
+        )
         self._ensure_file_exists()
 
     def _ensure_file_exists(self) -> None:
@@ -19,8 +37,12 @@ class CSVScoreRepository(IScoreRepository):
 
     def _create_file(self) -> None:
 
-        df = pd.DataFrame(columns=['username', 'last_score', 'score_total'])
-        df.to_csv(self.filename, index=False)
+        with file_lock(self.lock_filename):
+            if os.path.exists(self.filename):
+                return
+            df = pd.DataFrame(columns=['username', 'last_score', 'score_total'])
+            with atomic_replace(self.filename) as temp_path:
+                df.to_csv(temp_path, index=False)
 
     def user_exists(self, username: str) -> bool:
 
@@ -39,14 +61,7 @@ class CSVScoreRepository(IScoreRepository):
     def create_user(self, username: str) -> None:
 
         try:
-            df = pd.read_csv(self.filename)
-            new_user = [{
-                'username': username,
-                'last_score': 0,
-                'score_total': 0
-            }]
-            df = pd.concat([df, pd.DataFrame(new_user)], ignore_index=False)
-            df.to_csv(self.filename, index=False)
+            self._writer.submit(('create', username, 0))
         except Exception as e:
             print(f"Error creating user: {e}")
 
@@ -67,22 +82,97 @@ class CSVScoreRepository(IScoreRepository):
     def save_score(self, username: str, score: int) -> None:
 
         try:
-            df = pd.read_csv(self.filename)
+            self._writer.submit(('save', username, score))
+        except Exception as e:
+            print(f"Error saving score: {e}")
 
-            # Create a new entry for this game
-            new_entry = {
-                'username': username,
-                'last_score': score,
-                'score_total': score
+    def add_to_score(self, username: str, delta: int) -> int:
+
+        try:
+            return self._writer.submit(('add', username, delta))
+        except Exception as e:
+            print(f"Error adding to score: {e}")
+            # The total as it can still be read, or 0
+            return self.get_user_score(username)
+
+    def get_user_scores(self, usernames: Iterable[str]) -> Dict[str, int]:
+
+        wanted: List[str] = list(dict.fromkeys(usernames))
+        try:
+            df = pd.read_csv(self.filename)
+            user_entries = df[df['username'].isin(wanted)]
+            totals: Dict[str, int] = {
+                str(username): int(total)
+                for username, total in user_entries.groupby('username', sort=False)['score_total'].last().items()
             }
+        except Exception as e:
+            print(f"Error reading scores: {e}")
+            return {username: 0 for username in wanted}
+        missing: List[str] = [username for username in wanted if username not in totals]
+        if missing:
+            self.ensure_users(missing)
+        return {username: totals.get(username, 0) for username in wanted}
 
-            # Add the new entry to the dataframe
-            df = pd.concat([df, pd.DataFrame([new_entry])], ignore_index=True)
+    def save_scores(self, rows: Iterable[Tuple[str, int]]) -> None:
 
-            # Save back to CSV
-            df.to_csv(self.filename, index=False)
+        try:
+            self._writer.submit_many([('save', username, score) for username, score in rows])
         except Exception as e:
-            print(f"Error saving score: {e}")
+            print(f"Error saving scores: {e}")
+
+    def ensure_users(self, usernames: Iterable[str]) -> None:
+
+        try:
+            self._writer.submit_many([('create', username, 0) for username in usernames])
+        except Exception as e:
+            print(f"Error creating users: {e}")
+
+    def _commit(self, changes: List[Change]) -> List[int]:
+        # Runs under the file lock: one read and one rewrite for the whole batch
+        df = pd.read_csv(self.filename)
+        totals: Dict[str, Optional[int]] = {}
+        new_entries: List[Dict[str, object]] = []
+        results: List[int] = []
+
+        operation: str
+        username: str
+        value: int
+        for operation, username, value in changes:
+            if username not in totals:
+                user_entries = df[df['username'] == username]
+                totals[username] = int(user_entries.iloc[-1]['score_total']) if not user_entries.empty else None
+            total: Optional[int] = totals[username]
+
+            if operation == 'create':
+                if total is not None:
+                    results.append(total)
+                    continue
+                last_score, total = 0, 0
+            elif operation == 'save':
+                last_score, total = value, value
+            else:
+                last_score, total = value, (total or 0) + value
+
+            new_entries.append({
+                'username': username,
+                'last_score': last_score,
+                'score_total': total
+            })
+            totals[username] = total
+            results.append(total)
+
+        if new_entries:
+            df = pd.concat([df, pd.DataFrame(new_entries)], ignore_index=True)
+            with atomic_replace(self.filename) as temp_path:
+                df.to_csv(temp_path, index=False)
+        return results
+
+    def all_scores(self) -> Dict[str, int]:
+
+        df = pd.read_csv(self.filename)
+        # The last row of each user holds the current total
+        totals = df.groupby('username', sort=False)['score_total'].last()
+        return {str(username): int(total) for username, total in totals.items()}
 
     def read_file(self) -> pd.DataFrame:
         return pd.read_csv(self.filename)
\ No newline at end of file
@@ -0,0 +1,124 @@
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Callable, List, Generic, TypeVar, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process locks apply
+    fcntl = None
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@contextmanager
+def file_lock(filename: str, exclusive: bool = True) -> Iterator[None]:
+    """Hold an advisory lock on `filename` (created if missing) for the block.
+
+    The lock lives on a separate lock file so it survives the data file
+    being replaced with os.replace.
+    """
+    fd: int = os.open(filename, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+@contextmanager
+def atomic_replace(filename: str) -> Iterator[str]:
+    """Yield a temp path next to `filename` that replaces it if the block succeeds.
+
+    The new file keeps the permissions of the one it replaces.
+    """
+    directory: str = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield temp_path
+        try:
+            mode: int = stat.S_IMODE(os.stat(filename).st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        # mkstemp creates the file owner-only
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, filename)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+class _Request(Generic[T]):
+    __slots__ = ("item", "done", "result", "error")
+
+    def __init__(self, item: T) -> None:
+        self.item: T = item
+        self.done: bool = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class BatchedFileWriter(Generic[T, R]):
+    """Group commit for writes to a file shared between processes.
+
+    A thread that submits while another one is writing waits, and the next
+    thread to take the lock commits every request queued so far in one
+    call of `commit(items) -> results` under the file lock. Under
+    contention this turns many small writes into one.
+    """
+
+    def __init__(self, lock_filename: str, commit: Callable[[List[T]], List[R]]) -> None:
+        self.lock_filename: str = lock_filename
+        self.batches: int = 0
+        self._commit: Callable[[List[T]], List[R]] = commit
+        self._condition: threading.Condition = threading.Condition()
+        self._queue: List[_Request[T]] = []
+        self._writing: bool = False
+
+    def submit(self, item: T) -> R:
+        return self.submit_many([item])[0]
+
+    def submit_many(self, items: List[T]) -> List[R]:
+        # The items are committed together, in order, possibly with others
+        requests: List[_Request[T]] = [_Request(item) for item in items]
+        if not requests:
+            return []
+        last: _Request[T] = requests[-1]
+        with self._condition:
+            self._queue.extend(requests)
+            while self._writing and not last.done:
+                self._condition.wait()
+            if last.done:
+                return [self._result(request) for request in requests]
+            self._writing = True
+            batch: List[_Request[T]] = self._queue
+            self._queue = []
+
+        try:
+            with file_lock(self.lock_filename):
+                results: List[R] = self._commit([queued.item for queued in batch])
+            for queued, result in zip(batch, results):
+                queued.result = result
+        except BaseException as e:
+            for queued in batch:
+                queued.error = e
+        finally:
+            with self._condition:
+                for queued in batch:
+                    queued.done = True
+                self.batches += 1
+                self._writing = False
+                self._condition.notify_all()
+        return [self._result(request) for request in requests]
+
+    @staticmethod
+    def _result(request: "_Request[T]") -> Any:
+        if request.error is not None:
+            raise request.error
+        return request.result
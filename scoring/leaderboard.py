@@ -0,0 +1,110 @@
+import bisect
+import threading
+from typing import Dict, List, Tuple, Optional, Iterable
+from interfaces.i_score_repository import IScoreRepository
+
+
+class Leaderboard:
+    """Players ordered by total score, updated one user at a time.
+
+    Entries are kept in a list sorted by (-total, username), so the top K
+    is a slice and a rank is one binary search. An update removes and
+    re-inserts a single entry instead of sorting everything again.
+    """
+
+    def __init__(self, scores: Optional[Iterable[Tuple[str, int]]] = None) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._totals: Dict[str, int] = dict(scores or ())
+        self._entries: List[Tuple[int, str]] = sorted(
+            (-total, username) for username, total in self._totals.items()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, username: str, total: int) -> None:
+        with self._lock:
+            previous: Optional[int] = self._totals.get(username)
+            if previous == total:
+                return
+            if previous is not None:
+                index: int = bisect.bisect_left(self._entries, (-previous, username))
+                del self._entries[index]
+            bisect.insort(self._entries, (-total, username))
+            self._totals[username] = total
+
+    def top(self, k: int = 10) -> List[Tuple[str, int]]:
+        with self._lock:
+            return [(username, -total) for total, username in self._entries[:k]]
+
+    def rank(self, username: str) -> Optional[int]:
+        """1-based position of `username`; players with the same total share a rank."""
+        with self._lock:
+            total: Optional[int] = self._totals.get(username)
+            if total is None:
+                return None
+            return bisect.bisect_left(self._entries, (-total,)) + 1
+
+
+class LeaderboardScoreRepository(IScoreRepository):
+    """Keeps a Leaderboard in step with the writes made through a repository."""
+
+    def __init__(self, repository: IScoreRepository) -> None:
+        self.repository: IScoreRepository = repository
+        self.leaderboard: Leaderboard = Leaderboard(repository.all_scores().items())
+
+    def user_exists(self, username: str) -> bool:
+        return self.repository.user_exists(username)
+
+    def create_user(self, username: str) -> None:
+        self.repository.create_user(username)
+        if self.leaderboard.rank(username) is None:
+            self.leaderboard.update(username, 0)
+
+    def get_user_score(self, username: str) -> int:
+        total: int = self.repository.get_user_score(username)
+        # The backend creates unknown users on read
+        if self.leaderboard.rank(username) is None:
+            self.leaderboard.update(username, total)
+        return total
+
+    def save_score(self, username: str, score: int) -> None:
+        self.repository.save_score(username, score)
+        self.leaderboard.update(username, score)
+
+    def add_to_score(self, username: str, delta: int) -> int:
+        total: int = self.repository.add_to_score(username, delta)
+        self.leaderboard.update(username, total)
+        return total
+
+    def all_scores(self) -> Dict[str, int]:
+        return self.repository.all_scores()
+
+    def get_user_scores(self, usernames: Iterable[str]) -> Dict[str, int]:
+        totals: Dict[str, int] = self.repository.get_user_scores(usernames)
+        username: str
+        total: int
+        for username, total in totals.items():
+            if self.leaderboard.rank(username) is None:
+                self.leaderboard.update(username, total)
+        return totals
+
+    def save_scores(self, rows: Iterable[Tuple[str, int]]) -> None:
+        rows = list(rows)
+        self.repository.save_scores(rows)
+        for username, score in rows:
+            self.leaderboard.update(username, score)
+
+    def ensure_users(self, usernames: Iterable[str]) -> None:
+        # Reading the totals creates missing users and ranks them in one call
+        unranked: List[str] = [
+            username for username in usernames if self.leaderboard.rank(username) is None
+        ]
+        if unranked:
+            self.get_user_scores(unranked)
+
+    def top(self, k: int = 10) -> List[Tuple[str, int]]:
+        return self.leaderboard.top(k)
+
+    def rank(self, username: str) -> Optional[int]:
+        return self.leaderboard.rank(username)
@@ -0,0 +1,60 @@
+import threading
+from typing import Dict, Iterable, Tuple
+from interfaces.i_score_repository import IScoreRepository
+
+
+class InMemoryScoreRepository(IScoreRepository):
+    """Scores kept in a dictionary, for tests and throwaway sessions."""
+
+    def __init__(self) -> None:
+
+        self._lock: threading.Lock = threading.Lock()
+        self._totals: Dict[str, int] = {}
+
+    def user_exists(self, username: str) -> bool:
+
+        with self._lock:
+            return username in self._totals
+
+    def create_user(self, username: str) -> None:
+
+        with self._lock:
+            self._totals.setdefault(username, 0)
+
+    def get_user_score(self, username: str) -> int:
+
+        with self._lock:
+            return self._totals.setdefault(username, 0)
+
+    def save_score(self, username: str, score: int) -> None:
+
+        with self._lock:
+            self._totals[username] = score
+
+    def all_scores(self) -> Dict[str, int]:
+
+        with self._lock:
+            return dict(self._totals)
+
+    def add_to_score(self, username: str, delta: int) -> int:
+
+        with self._lock:
+            total: int = self._totals.get(username, 0) + delta
+            self._totals[username] = total
+            return total
+
+    def get_user_scores(self, usernames: Iterable[str]) -> Dict[str, int]:
+
+        with self._lock:
+            return {username: self._totals.setdefault(username, 0) for username in usernames}
+
+    def save_scores(self, rows: Iterable[Tuple[str, int]]) -> None:
+
+        with self._lock:
+            self._totals.update(rows)
+
+    def ensure_users(self, usernames: Iterable[str]) -> None:
+
+        with self._lock:
+            for username in usernames:
+                self._totals.setdefault(username, 0)
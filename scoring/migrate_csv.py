@@ -0,0 +1,75 @@
+import csv
+import os
+import sys
+from typing import List, Optional, Tuple, Set
+
+from scoring.file_lock import file_lock
+from scoring.sqlite_score_repository import SQLiteScoreRepository
+
+
+def read_csv_history(filename: str) -> List[Tuple[str, Optional[int]]]:
+    """Rows of scoring.csv as (username, total) in file order.
+
+    CSVScoreRepository writes a 0/0 row when a user is created and one row
+    per saved score; the creation row becomes (username, None).
+    """
+    entries: List[Tuple[str, Optional[int]]] = []
+    seen: Set[str] = set()
+    with open(filename, "r", encoding="utf-8", newline="") as f:
+        row: dict
+        for row in csv.DictReader(f):
+            username: str = row["username"]
+            total: int = int(float(row["score_total"]))
+            if username not in seen and total == 0 and int(float(row["last_score"])) == 0:
+                entries.append((username, None))
+            else:
+                entries.append((username, total))
+            seen.add(username)
+    return entries
+
+
+def migrate(source: str, destination: str) -> int:
+    repository: SQLiteScoreRepository = SQLiteScoreRepository(destination)
+    try:
+        if not repository.is_empty():
+            raise ValueError(f"'{destination}' already has scores, refusing to import twice")
+        return repository.import_games(read_csv_history(source))
+    finally:
+        repository.close()
+
+
+def migrate_if_needed(source: str, destination: str) -> int:
+    """Import `source` once: only while `destination` has no scores yet.
+
+    Safe to call at every startup, also from several processes at once.
+    """
+    if not os.path.exists(source):
+        return 0
+    with file_lock(f"{destination}.lock"):
+        repository: SQLiteScoreRepository = SQLiteScoreRepository(destination)
+        try:
+            if not repository.is_empty():
+                return 0
+            return repository.import_games(read_csv_history(source))
+        finally:
+            repository.close()
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) != 3:
+        print("Usage: python -m scoring.migrate_csv <scoring.csv> <scoring.db>")
+        print("Example: python -m scoring.migrate_csv scoring.csv scoring.db")
+        return 1
+
+    source, destination = argv[1:]
+    try:
+        count: int = migrate(source, destination)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: unable to migrate '{source}': {e}")
+        return 1
+    print(f"Imported {count} games from '{source}' into '{destination}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,332 @@
+import atexit
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from interfaces.i_score_repository import IScoreRepository
+
+SCHEMA: pa.Schema = pa.schema([
+    ("seq", pa.int64()),
+    ("username", pa.string()),
+    ("delta", pa.int64()),
+    ("score_total", pa.int64()),
+    # Only set on rows written by add_to_score, i.e. finished games, and
+    # null when the outcome can't be told from the score change
+    ("won", pa.bool_()),
+    ("questions", pa.int32()),
+    ("played_at", pa.timestamp("ms", tz="UTC")),
+])
+PARTITIONING: ds.Partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+
+class ParquetScoreRepository(IScoreRepository):
+    """Score history stored as Parquet files partitioned by day.
+
+    Every change is one row (``date=YYYY-MM-DD/part-*.parquet``). Rows are
+    buffered and written as a single row group once `row_group_size` of
+    them are pending, every `flush_interval` seconds by a background thread,
+    on `flush`, and at exit, so a crash loses at most `flush_interval`
+    seconds of games. When a partition holds more than
+    `max_files` files they are merged into one, sorted by username so row
+    group statistics let username filters skip most of the data.
+
+    Current totals are kept in memory, built at startup from the
+    ``username`` / ``seq`` / ``score_total`` columns only. The analytics
+    methods read just the columns they need. A game's number of questions
+    is derived from its score change and `point_per_question`, and so is its
+    outcome: a game that ended with no points won or lost has an unknown
+    outcome and is left out of the analytics.
+    """
+
+    def __init__(
+        self,
+        directory: str = './scoring_parquet',
+        row_group_size: int = 1024,
+        max_files: int = 16,
+        point_per_question: int = 5,
+        flush_interval: float = 5.0,
+    ) -> None:
+
+        self.directory: str = directory
+        self.row_group_size: int = row_group_size
+        self.max_files: int = max_files
+        self.point_per_question: int = point_per_question
+        self.flush_interval: float = flush_interval
+        self._lock: threading.RLock = threading.RLock()
+        self._pending: List[Dict[str, Any]] = []
+        os.makedirs(directory, exist_ok=True)
+        self._finish_merges()
+
+        latest: pa.Table = (
+            self._dataset()
+            .to_table(columns=["seq", "username", "score_total"])
+            .sort_by("seq")
+            .group_by("username", use_threads=False)
+            .aggregate([("score_total", "last"), ("seq", "max")])
+        )
+        self._totals: Dict[str, int] = dict(
+            zip(latest["username"].to_pylist(), latest["score_total_last"].to_pylist())
+        )
+        self._seq: int = (pc.max(latest["seq_max"]).as_py() or 0) + 1 if len(latest) else 0
+
+        self._closed: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, name="parquet-writer", daemon=True
+        )
+        if flush_interval > 0:
+            self._thread.start()
+        atexit.register(self.close)
+
+    def user_exists(self, username: str) -> bool:
+
+        with self._lock:
+            return username in self._totals
+
+    def create_user(self, username: str) -> None:
+
+        with self._lock:
+            if username not in self._totals:
+                self._record(username, 0, 0)
+
+    def get_user_score(self, username: str) -> int:
+
+        with self._lock:
+            if username not in self._totals:
+                self._record(username, 0, 0)
+            return self._totals[username]
+
+    def save_score(self, username: str, score: int) -> None:
+
+        with self._lock:
+            self._record(username, score - self._totals.get(username, 0), score)
+
+    def add_to_score(self, username: str, delta: int) -> int:
+
+        with self._lock:
+            total: int = self._totals.get(username, 0) + delta
+            self._record(
+                username, delta, total,
+                # A change of 0 is a win or a loss before any question
+                won=delta > 0 if delta != 0 else None,
+                questions=abs(delta) // self.point_per_question,
+            )
+            return total
+
+    def all_scores(self) -> Dict[str, int]:
+
+        with self._lock:
+            return dict(self._totals)
+
+    def get_user_scores(self, usernames: Iterable[str]) -> Dict[str, int]:
+
+        with self._lock:
+            return {username: self.get_user_score(username) for username in usernames}
+
+    def save_scores(self, rows: Iterable[Tuple[str, int]]) -> None:
+
+        with self._lock:
+            for username, score in rows:
+                self.save_score(username, score)
+
+    def ensure_users(self, usernames: Iterable[str]) -> None:
+
+        with self._lock:
+            for username in usernames:
+                self.create_user(username)
+
+    def history(self, username: str) -> pa.Table:
+        """Every row of one user, oldest first; the filter is pushed down to the files."""
+        self.flush()
+        return self._dataset().to_table(
+            columns=["seq", "delta", "score_total", "won", "questions", "played_at"],
+            filter=ds.field("username") == username,
+        ).sort_by("seq")
+
+    # Analytics: computed on the needed columns of finished games only
+
+    def games_per_user(self) -> Dict[str, int]:
+        table: pa.Table = self._games(["username"]).group_by("username").aggregate(
+            [([], "count_all")]
+        )
+        return dict(zip(table["username"].to_pylist(), table["count_all"].to_pylist()))
+
+    def win_rate(self, username: Optional[str] = None) -> Optional[float]:
+        won: pa.ChunkedArray = self._games(["won"], username)["won"]
+        if len(won) == 0:
+            return None
+        return pc.mean(pc.cast(won, pa.float64())).as_py()
+
+    def average_questions(self, username: Optional[str] = None) -> Optional[float]:
+        questions: pa.ChunkedArray = self._games(["questions"], username)["questions"]
+        return pc.mean(questions).as_py() if len(questions) else None
+
+    def score_distribution(self, bucket: int = 10) -> Dict[int, int]:
+        """Number of games per score change bucket (lower bound -> count)."""
+        delta: pa.ChunkedArray = self._games(["delta"])["delta"]
+        if len(delta) == 0:
+            return {}
+        lower: pa.Array = pc.multiply(
+            pc.cast(pc.floor(pc.divide(pc.cast(delta, pa.float64()), bucket)), pa.int64()),
+            bucket,
+        )
+        counts: pa.StructArray = pc.value_counts(lower)
+        return dict(sorted(zip(
+            counts.field("values").to_pylist(), counts.field("counts").to_pylist()
+        )))
+
+    def flush(self) -> None:
+        # Write the buffered rows as one row group
+        with self._lock:
+            if not self._pending:
+                return
+            rows: List[Dict[str, Any]] = self._pending
+            self._pending = []
+            by_date: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                by_date.setdefault(row["played_at"].strftime("%Y-%m-%d"), []).append(row)
+            date: str
+            for date, partition_rows in by_date.items():
+                partition: str = self._partition(date)
+                self._write(
+                    pa.Table.from_pylist(partition_rows, schema=SCHEMA),
+                    os.path.join(partition, f"part-{partition_rows[0]['seq']:012d}-{uuid.uuid4().hex[:8]}.parquet"),
+                )
+                if len(self._files(partition)) > self.max_files:
+                    self.merge(date)
+
+    def merge(self, date: Optional[str] = None) -> None:
+        """Merge the files of one day (or of every day) into a single file."""
+        with self._lock:
+            dates: List[str] = [date] if date is not None else [
+                name.split("=", 1)[1]
+                for name in sorted(os.listdir(self.directory)) if name.startswith("date=")
+            ]
+            for date in dates:
+                partition: str = self._partition(date)
+                files: List[str] = self._files(partition)
+                if len(files) < 2:
+                    continue
+                table: pa.Table = pa.concat_tables(
+                    [pq.ParquetFile(path).read() for path in files]
+                ).sort_by(
+                    [("username", "ascending"), ("seq", "ascending")]
+                )
+                first_seq: int = pc.min(table["seq"]).as_py()
+                last_seq: int = pc.max(table["seq"]).as_py()
+                # The seq range in the name lets _finish_merges recognize the
+                # sources if the process stops before they are removed
+                merged: str = os.path.join(
+                    partition, f"part-{first_seq:012d}-{last_seq:012d}-merged.parquet"
+                )
+                self._write(table, merged)
+                # The merged file is in place before the old ones go away
+                for path in files:
+                    if path != merged:
+                        os.remove(path)
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        atexit.unregister(self.close)
+        self.flush()
+
+    def _record(
+        self,
+        username: str,
+        delta: int,
+        total: int,
+        won: Optional[bool] = None,
+        questions: Optional[int] = None,
+    ) -> None:
+        self._pending.append({
+            "seq": self._seq,
+            "username": username,
+            "delta": delta,
+            "score_total": total,
+            "won": won,
+            "questions": questions,
+            "played_at": datetime.now(timezone.utc),
+        })
+        self._seq += 1
+        self._totals[username] = total
+        if len(self._pending) >= self.row_group_size:
+            self.flush()
+
+    def _games(self, columns: List[str], username: Optional[str] = None) -> pa.Table:
+        self.flush()
+        condition: ds.Expression = ds.field("won").is_valid()
+        if username is not None:
+            condition = condition & (ds.field("username") == username)
+        return self._dataset().to_table(columns=columns, filter=condition)
+
+    def _finish_merges(self) -> None:
+        # Remove the sources of a merge interrupted after the merged file was
+        # written, so their rows are not read twice
+        name: str
+        for name in sorted(os.listdir(self.directory)):
+            if not name.startswith("date="):
+                continue
+            files: List[str] = self._files(os.path.join(self.directory, name))
+            merged: Dict[str, Tuple[int, int]] = {
+                path: seq_range for path, seq_range in zip(files, map(_merged_range, files))
+                if seq_range is not None
+            }
+            path: str
+            for path in files:
+                seq_range: Optional[Tuple[int, int]] = merged.get(path)
+                if seq_range is None and merged:
+                    seq: pa.ChunkedArray = pq.read_table(path, columns=["seq"])["seq"]
+                    if len(seq) == 0:
+                        continue
+                    seq_range = (pc.min(seq).as_py(), pc.max(seq).as_py())
+                if seq_range is not None and any(
+                    other != path and first <= seq_range[0] and seq_range[1] <= last
+                    for other, (first, last) in merged.items()
+                ):
+                    os.remove(path)
+
+    def _dataset(self) -> ds.Dataset:
+        return ds.dataset(self.directory, schema=SCHEMA, format="parquet", partitioning=PARTITIONING)
+
+    def _partition(self, date: str) -> str:
+        partition: str = os.path.join(self.directory, f"date={date}")
+        os.makedirs(partition, exist_ok=True)
+        return partition
+
+    def _files(self, partition: str) -> List[str]:
+        return sorted(
+            os.path.join(partition, name)
+            for name in os.listdir(partition) if name.endswith(".parquet")
+        )
+
+    def _write(self, table: pa.Table, path: str) -> None:
+        # Temp file then rename: readers never see a partial Parquet file, and
+        # the dataset scan skips the dot-prefixed temp name
+        temp_path: str = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+        pq.write_table(table, temp_path, row_group_size=self.row_group_size)
+        os.replace(temp_path, path)
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error: background Parquet write failed: {e}")
+
+
+def _merged_range(path: str) -> Optional[Tuple[int, int]]:
+    # (first seq, last seq) of a ``part-<first>-<last>-merged.parquet`` file
+    parts: List[str] = os.path.basename(path).split("-")
+    if len(parts) != 4 or parts[3] != "merged.parquet":
+        return None
+    return int(parts[1]), int(parts[2])
@@ -11,7 +11,7 @@ class Score:
     def __init__(self, username: str, repository: IScoreRepository) -> None:
         self.username = username
         self.repository = repository
-        self.repository.user_exists(self.username)
+        # get_user_score creates unknown users, so one call is enough
         self.user_score = self.get_user_score(self.username)
 
     def add_point(self) -> int:
@@ -19,13 +19,11 @@ class Score:
         return self.actual_score
 
     def victory(self) -> None:
-        self.user_score = self.get_user_score(self.username)
-        self.repository.save_score(self.username, self.user_score + self.actual_score)
+        self.user_score = self.repository.add_to_score(self.username, self.actual_score)
 
     def game_over(self) -> None:
 
-        self.user_score = self.get_user_score(self.username)
-        self.repository.save_score(self.username, self.user_score - self.actual_score)
+        self.user_score = self.repository.add_to_score(self.username, -self.actual_score)
 
     def get_user_score(self, username: str) -> int:
         return self.repository.get_user_score(username)
\ No newline at end of file
@@ -0,0 +1,192 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Tuple, List, Dict, Iterable, Iterator
+from interfaces.i_score_repository import IScoreRepository
+
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    last_score INTEGER NOT NULL DEFAULT 0,
+    score_total INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL REFERENCES users(username),
+    score INTEGER NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_username ON games(username, id);
+"""
+# Bound parameters per statement, below SQLite's historical limit of 999
+MAX_VARIABLES: int = 900
+
+
+class SQLiteScoreRepository(IScoreRepository):
+    """Scores stored in SQLite instead of re-reading a CSV on every call.
+
+    ``users`` holds one row per player with the current total, looked up by
+    primary key. ``games`` keeps the history, one row per saved score. The
+    database runs in WAL mode so readers do not block the writer, and one
+    connection is shared by all threads using the repository.
+    """
+
+    def __init__(self, filename: str = './scoring.db') -> None:
+
+        self.filename: str = filename
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            filename, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def user_exists(self, username: str) -> bool:
+
+        with self._lock:
+            row: Optional[Tuple[int]] = self._connection.execute(
+                "SELECT 1 FROM users WHERE username = ?", (username,)
+            ).fetchone()
+        return row is not None
+
+    def create_user(self, username: str) -> None:
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO users (username) VALUES (?)", (username,)
+            )
+
+    def get_user_score(self, username: str) -> int:
+
+        with self._lock:
+            row: Optional[Tuple[int]] = self._connection.execute(
+                "SELECT score_total FROM users WHERE username = ?", (username,)
+            ).fetchone()
+            if row is None:
+                self._connection.execute(
+                    "INSERT OR IGNORE INTO users (username) VALUES (?)", (username,)
+                )
+                return 0
+        return int(row[0])
+
+    def save_score(self, username: str, score: int) -> None:
+
+        # `score` is the new total, as in CSVScoreRepository
+        with self._lock, self._transaction():
+            self._save(username, score, time.time())
+
+    def add_to_score(self, username: str, delta: int) -> int:
+
+        with self._lock, self._transaction():
+            # The upsert reads and updates the total in one statement
+            row: Tuple[int] = self._connection.execute(
+                "INSERT INTO users (username, last_score, score_total) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET "
+                "last_score = excluded.last_score, score_total = score_total + excluded.score_total "
+                "RETURNING score_total",
+                (username, delta, delta),
+            ).fetchone()
+            total: int = int(row[0])
+            self._connection.execute(
+                "INSERT INTO games (username, score, played_at) VALUES (?, ?, ?)",
+                (username, total, time.time()),
+            )
+        return total
+
+    def all_scores(self) -> Dict[str, int]:
+
+        with self._lock:
+            return dict(self._connection.execute("SELECT username, score_total FROM users"))
+
+    def get_user_scores(self, usernames: Iterable[str]) -> Dict[str, int]:
+
+        wanted: List[str] = list(dict.fromkeys(usernames))
+        totals: Dict[str, int] = {}
+        with self._lock, self._transaction():
+            self._insert_users(wanted)
+            start: int
+            for start in range(0, len(wanted), MAX_VARIABLES):
+                chunk: List[str] = wanted[start:start + MAX_VARIABLES]
+                totals.update(self._connection.execute(
+                    "SELECT username, score_total FROM users "
+                    f"WHERE username IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ))
+        return {username: totals[username] for username in wanted}
+
+    def save_scores(self, rows: Iterable[Tuple[str, int]]) -> None:
+
+        played_at: float = time.time()
+        with self._lock, self._transaction():
+            username: str
+            score: int
+            for username, score in rows:
+                self._save(username, score, played_at)
+
+    def ensure_users(self, usernames: Iterable[str]) -> None:
+
+        with self._lock, self._transaction():
+            self._insert_users(usernames)
+
+    def games(self, username: str) -> List[int]:
+        # Saved totals for `username`, oldest first
+        with self._lock:
+            rows: List[Tuple[int]] = self._connection.execute(
+                "SELECT score FROM games WHERE username = ? ORDER BY id", (username,)
+            ).fetchall()
+        return [score for (score,) in rows]
+
+    def import_games(self, entries: Iterable[Tuple[str, Optional[int]]]) -> int:
+        """Insert (username, total) history in one transaction; None only creates the user."""
+        count: int = 0
+        with self._lock, self._transaction():
+            username: str
+            score: Optional[int]
+            for username, score in entries:
+                if score is None:
+                    self._connection.execute(
+                        "INSERT OR IGNORE INTO users (username) VALUES (?)", (username,)
+                    )
+                else:
+                    self._save(username, score, time.time())
+                    count += 1
+        return count
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _insert_users(self, usernames: Iterable[str]) -> None:
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO users (username) VALUES (?)",
+            ((username,) for username in usernames),
+        )
+
+    def _save(self, username: str, score: int, played_at: float) -> None:
+        self._connection.execute(
+            "INSERT INTO users (username, last_score, score_total) VALUES (?, ?, ?) "
+            "ON CONFLICT(username) DO UPDATE SET "
+            "last_score = excluded.last_score, score_total = excluded.score_total",
+            (username, score, score),
+        )
+        self._connection.execute(
+            "INSERT INTO games (username, score, played_at) VALUES (?, ?, ?)",
+            (username, score, played_at),
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # BEGIN/COMMIT around the block, ROLLBACK if it raises
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
@@ -1,12 +1,16 @@
 import streamlit as st
 from typing import Dict, Any, List
-from game.question_tree import QuestionTree
-from data.parsing import Parsing
+from game.tree_service import TreeService
 from game.question_node import QuestionNode
 from api.animal_info import AnimalInfo
+from api.prefetcher import Prefetcher
+from api.image_cache import ImageCache
 from game.player import Player
 from scoring.score import Score
-from scoring.csv_score_repository import CSVScoreRepository
+from scoring.sqlite_score_repository import SQLiteScoreRepository
+from scoring.cached_score_repository import CachedScoreRepository
+from scoring.leaderboard import LeaderboardScoreRepository
+from scoring.migrate_csv import migrate_if_needed
 import sys
 
 st.set_page_config(
@@ -16,8 +20,37 @@ st.set_page_config(
     menu_items=None
 )
 
+@st.cache_resource
+def get_tree_service(filepath: str) -> TreeService:
+    """Load the tree once per server process and share it between sessions"""
+    return TreeService(filepath)
+
+
+@st.cache_resource
+def get_score_repository(filename: str) -> LeaderboardScoreRepository:
+    """One SQLite connection, score cache and leaderboard shared by every session"""
+    # Scores of older versions, kept in scoring.csv, are imported on first start
+    try:
+        imported: int = migrate_if_needed("scoring.csv", filename)
+        if imported:
+            print(f"Imported {imported} games from 'scoring.csv' into '{filename}'.")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: unable to import 'scoring.csv' into '{filename}': {e}")
+    # Totals are re-read after a few seconds, in case other server
+    # processes write to the same database
+    return LeaderboardScoreRepository(
+        CachedScoreRepository(SQLiteScoreRepository(filename), ttl=5.0)
+    )
+
+
+@st.cache_resource
+def get_image_cache(directory: str) -> ImageCache:
+    """Downscaled images on disk, shared by every session"""
+    return ImageCache(AnimalInfo(), directory)
+
+
 # Initialize session state
-if "tree" not in st.session_state:
+if "tree_service" not in st.session_state:
     # Get username from session or sidebar
     if "username" not in st.session_state:
         st.session_state.username = None
@@ -29,21 +62,22 @@ if "tree" not in st.session_state:
         filepath = "data/animals_tree.json"
 
     try:
-        st.session_state.tree = QuestionTree(filepath)
-        st.session_state.parsing = Parsing(filepath)
+        st.session_state.tree_service = get_tree_service(filepath)
     except Exception as e:
         st.error(
             f"Could not load '{filepath}'. Falling back to 'animals_tree.json'. Error: {e}"
         )
         st.session_state.filepath = "data/animals_tree.json"
-        st.session_state.tree = QuestionTree("data/animals_tree.json")
-        st.session_state.parsing = Parsing("data/animals_tree.json")
-    st.session_state.current_node = st.session_state.tree.root
+        st.session_state.tree_service = get_tree_service("data/animals_tree.json")
+    # Pin the tree version this session plays on; lessons from other
+    # sessions show up at the next game
+    st.session_state.tree_version = st.session_state.tree_service.current_version()
+    st.session_state.current_node = st.session_state.tree_version.root
     st.session_state.game_state = "playing"  # 'playing', 'won', 'learning'
     st.session_state.question_history = []
     st.session_state.animal_info = AnimalInfo()
-    st.session_state.parsing = Parsing("data/animals_tree.json")
-    st.session_state.score_repository = CSVScoreRepository()
+    st.session_state.prefetcher = Prefetcher(st.session_state.animal_info)
+    st.session_state.score_repository = get_score_repository("scoring.db")
 
 
 bg_color = "#f0f2f6"
@@ -90,10 +124,12 @@ st.markdown(
 
 def reset_game() -> None:
     """Reset the game to initial state"""
-    st.session_state.current_node = st.session_state.tree.root
+    st.session_state.tree_version = st.session_state.tree_service.current_version()
+    st.session_state.current_node = st.session_state.tree_version.root
     st.session_state.game_state = "playing"
     st.session_state.question_history = []
     st.session_state.player.score.actual_score = 0
+    st.session_state.prefetcher.cancel()
     # Reset flags to allow score saving in the next game
     if "score_saved" in st.session_state:
         del st.session_state.score_saved
@@ -117,6 +153,9 @@ def handle_answer(answer: bool) -> None:
     else:
         st.session_state.current_node = st.session_state.current_node.no
 
+    # Start fetching the info of the animals still reachable
+    st.session_state.prefetcher.update(st.session_state.current_node)
+
 
 def is_leaf_node(node: QuestionNode) -> bool:
     """Check if node is a leaf (animal guess)"""
@@ -125,32 +164,20 @@ def is_leaf_node(node: QuestionNode) -> bool:
 
 def improve_tree(
     correct_animal: str, distinguishing_question: str, answer_for_correct: bool
-) -> None:
-    """Add new knowledge to the tree"""
+) -> bool:
+    """Add new knowledge to the shared tree"""
     node: QuestionNode = st.session_state.current_node
 
-    # Create new question node
-    new_node: QuestionNode = QuestionNode(distinguishing_question)
-
-    # Create leaf nodes for animals
-    yes_node: QuestionNode = QuestionNode(correct_animal)
-    no_node: QuestionNode = QuestionNode(node.value)
-
-    # Assign yes/no based on answer
-    if answer_for_correct:
-        new_node.yes = yes_node
-        new_node.no = no_node
-    else:
-        new_node.yes = no_node
-        new_node.no = yes_node
-
-    # Replace current node content
-    node.value = new_node.value
-    node.yes = new_node.yes
-    node.no = new_node.no
+    # Path of the current leaf, e.g. "root.yes.no", used as the journal key
+    path: str = "root" + "".join(
+        ".yes" if item["answer"] else ".no"
+        for item in st.session_state.question_history
+    )
 
-    # Save tree
-    st.session_state.parsing.save_json_tree(st.session_state.tree.root)
+    # The service serializes lessons from all sessions and journals them
+    return st.session_state.tree_service.learn(
+        path, node.value, distinguishing_question, correct_animal, answer_for_correct
+    )
 
 
 # Main UI
@@ -187,6 +214,15 @@ with st.sidebar:
 
     st.metric("Total Score", total_score)
 
+    st.markdown("---")
+    st.header("🏆 Leaderboard")
+    repository: LeaderboardScoreRepository = st.session_state.score_repository
+    for position, (name, points) in enumerate(repository.top(5), 1):
+        st.write(f"{position}. **{name}** - {points} pts")
+    rank = repository.rank(st.session_state.username)
+    if rank is not None:
+        st.write(f"Your rank: #{rank} of {len(repository.leaderboard)}")
+
     st.markdown("---")
     st.header("Question History")
     if st.session_state.question_history:
@@ -296,9 +332,6 @@ elif st.session_state.game_state == "won":
     # Show animal info
     with st.spinner("Fetching information from Wikipedia..."):
         try:
-            info: str = st.session_state.animal_info.get_animal_info(
-                st.session_state.current_node
-            )
             st.markdown("### Learn more about this animal:")
 
             infos: Dict[str, Any] = st.session_state.animal_info.search(
@@ -308,34 +341,29 @@ elif st.session_state.game_state == "won":
             if infos["summary"]:
                 st.write(infos["summary"])
 
+            # Images are served from the local downscaled copies
+            image_cache: ImageCache = get_image_cache("data/image_cache")
             if infos["thumbnail"]:
                 st.image(
-                    infos["thumbnail"],
+                    image_cache.thumbnail(infos["thumbnail"]) or infos["thumbnail"],
                     caption=st.session_state.current_node.value,
                     use_container_width=True,
                 )
 
             # Display other images if available
             if infos["images"] and len(infos["images"]) > 0:
-                st.markdown("### More images:")
-                # Filter out non-image files (like .svg, .pdf, etc.)
-                image_extensions: tuple = (".jpg", ".jpeg", ".png", ".gif", ".webp")
-                valid_images: List[str] = [
-                    img
-                    for img in infos["images"]
-                    if any(img.lower().endswith(ext) for ext in image_extensions)
-                ]
+                # Non-image files (like .svg, .pdf, etc.) are skipped
+                valid_images: List[str] = image_cache.thumbnails(infos["images"], limit=9)
 
                 if valid_images:
+                    st.markdown("### More images:")
                     # Display images in a grid (3 columns)
                     cols = st.columns(3)
                     idx: int
-                    img_url: str
-                    for idx, img_url in enumerate(
-                        valid_images[:9]
-                    ):  # Limit to 9 images
+                    img_path: str
+                    for idx, img_path in enumerate(valid_images):
                         with cols[idx % 3]:
-                            st.image(img_url, use_container_width=True)
+                            st.image(img_path, use_container_width=True)
         except Exception as e:
             st.warning(f"Could not fetch animal information: {str(e)}")
 
@@ -400,7 +428,7 @@ elif st.session_state.game_state == "learning":
             if submitted:
                 # Read values from the widget variables (they persist via keys)
                 if correct_animal and distinguishing_question:
-                    improve_tree(
+                    st.session_state.lesson_added = improve_tree(
                         correct_animal, distinguishing_question, answer_for_correct
                     )
                     st.session_state.just_learned = True
@@ -411,10 +439,16 @@ elif st.session_state.game_state == "learning":
                     st.error("Please fill in all fields to help me learn!")
     else:
         # Show success message and play again button
-        st.success("Got it! I'll remember that for next time.")
-        st.info(
-            f"New knowledge added: '{st.session_state.learned_question}' helps distinguish {st.session_state.learned_animal} from {st.session_state.current_node.value}"
-        )
+        if st.session_state.get("lesson_added", True):
+            st.success("Got it! I'll remember that for next time.")
+            st.info(
+                f"New knowledge added: '{st.session_state.learned_question}' helps distinguish {st.session_state.learned_animal} from {st.session_state.current_node.value}"
+            )
+        else:
+            # Another session taught a lesson on this leaf first
+            st.warning(
+                "Another player just taught me about this animal, so your lesson was not added."
+            )
 
         if st.button("Play Again", use_container_width=True, type="primary"):
             st.session_state.just_learned = False
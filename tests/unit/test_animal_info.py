@@ -0,0 +1,239 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List
+from urllib.parse import urlparse, parse_qs, unquote
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from api.animal_info import AnimalInfo
+
+
+class StubWikipedia(BaseHTTPRequestHandler):
+    # Serves /summary/<name> and /commons like the Wikipedia APIs
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        with self.server.lock:
+            self.server.requests.append(self.path)
+        behaviour = self.server.behaviour
+        if url.path.startswith("/summary/"):
+            name = unquote(url.path[len("/summary/"):])
+            delay, status = behaviour.get(("summary", name), (0, 200))
+            payload = {"extract": f"{name} summary", "thumbnail": {"source": f"http://img/{name}.jpg"}}
+        else:
+            name = parse_qs(url.query).get("titles", [""])[0]
+            delay, status = behaviour.get(("images", name), (0, 200))
+            payload = {"query": {"pages": {"1": {"imageinfo": [{"url": f"http://img/{name}-1.jpg"}]}}}}
+
+        if callable(status):
+            status = status()
+        time.sleep(delay)
+        body = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client ran out of budget and closed the connection
+            pass
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubWikipedia)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests: List[str] = []
+        self.behaviour: Dict[Any, Any] = {}
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def client(self, **kwargs: Any) -> AnimalInfo:
+        kwargs.setdefault("cache_file", None)
+        info = AnimalInfo(**kwargs)
+        info.summary_url = f"http://127.0.0.1:{self.server_port}/summary/"
+        info.commons_url = f"http://127.0.0.1:{self.server_port}/commons"
+        return info
+
+
+def _test_search_reuses_connections(server: StubServer):
+    info = server.client()
+    before = server.connections
+    for name in ("Cat", "Dog", "Cow"):
+        result = info.search(name)
+        assert result["summary"] == f"{name} summary"
+        assert result["thumbnail"] == f"http://img/{name}.jpg"
+        assert result["images"] == [f"http://img/{name}-1.jpg"]
+    # Keep-alive: the summary and images requests run side by side, so two
+    # connections serve all six requests
+    assert server.connections - before <= 2, server.connections - before
+    info.close()
+    print("search reuses pooled keep-alive connections")
+
+
+def _test_retries_transient_errors(server: StubServer):
+    statuses = iter([503, 502, 200])
+    server.behaviour[("summary", "Fox")] = (0, lambda: next(statuses))
+    info = server.client(backoff=0.01)
+    assert info.search("Fox")["summary"] == "Fox summary"
+    assert sum(path.startswith("/summary/Fox") for path in server.requests) == 3
+
+    server.behaviour[("summary", "Owl")] = (0, 503)
+    result = server.client(retries=1, backoff=0.01).search("Owl")
+    assert result["summary"] is None and result["images"] == ["http://img/Owl-1.jpg"]
+    print("Transient errors are retried with backoff")
+
+
+def _test_latency_budget(server: StubServer):
+    server.behaviour[("summary", "Sloth")] = (2, 200)
+    server.behaviour[("images", "Sloth")] = (2, 200)
+    info = server.client(read_timeout=0.3, budget=0.5, backoff=0.05)
+    start = time.monotonic()
+    result = info.search("Sloth")
+    elapsed = time.monotonic() - start
+    assert result["summary"] is None and result["images"] == []
+    assert elapsed < 1.0, elapsed
+    print(f"A slow endpoint gives up after {elapsed:.2f}s")
+
+
+def _test_lookups_run_concurrently(server: StubServer):
+    server.behaviour[("summary", "Bear")] = (0.4, 200)
+    server.behaviour[("images", "Bear")] = (0.4, 200)
+    info = server.client()
+    start = time.monotonic()
+    result = info.search("Bear")
+    elapsed = time.monotonic() - start
+    assert result["summary"] == "Bear summary" and result["images"] == ["http://img/Bear-1.jpg"]
+    assert elapsed < 0.7, elapsed
+    print(f"Summary and images are fetched together ({elapsed:.2f}s for two 0.4s calls)")
+
+
+def _test_responses_are_cached(server: StubServer):
+    directory = tempfile.mkdtemp()
+    try:
+        server.behaviour[("summary", "Unicorn")] = (0, 404)
+        info = server.client(cache_file=os.path.join(directory, 'wiki.db'))
+        first = info.search("Horse")
+        info.search("Unicorn")
+        count = len(server.requests)
+
+        # A new instance has no session memo, only the shared cache
+        info = server.client(cache_file=os.path.join(directory, 'wiki.db'))
+        assert info.search("Horse") == first
+        result = info.search("Unicorn")
+        assert result["summary"] is None and result["images"] == ["http://img/Unicorn-1.jpg"]
+        # Both found pages and the 404 are served locally
+        assert len(server.requests) == count
+    finally:
+        shutil.rmtree(directory)
+    print("Repeat searches and missing pages are served from the cache")
+
+
+def _test_unusable_cache_is_skipped(server: StubServer):
+    directory = tempfile.mkdtemp()
+    try:
+        # The cache directory would have to be created inside a file
+        blocker = os.path.join(directory, 'not-a-directory')
+        with open(blocker, 'w') as f:
+            f.write('')
+        info = server.client(cache_file=os.path.join(blocker, 'wiki.db'))
+        assert info.cache is None
+        assert info.search("Moose")["summary"] == "Moose summary"
+
+        # The default file does not depend on the working directory
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            assert os.path.isabs(AnimalInfo().cache.filename)
+        finally:
+            os.chdir(cwd)
+    finally:
+        shutil.rmtree(directory)
+    print("Lookups work without a cache when its file cannot be opened")
+
+
+def _test_concurrent_lookups_share_one_fetch(server: StubServer):
+    server.behaviour[("summary", "Lion")] = (0.3, 200)
+    server.behaviour[("images", "Lion")] = (0.3, 200)
+    results: List[Dict[str, Any]] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(server.client().search("Lion")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 5 and all(result == results[0] for result in results)
+    assert sum(path.startswith("/summary/Lion") for path in server.requests) == 1
+    assert sum("titles=Lion" in path for path in server.requests) == 1
+    print("Five players winning on the same animal share one fetch")
+
+
+def _test_shared_fetch_keeps_each_budget(server: StubServer):
+    server.behaviour[("summary", "Moose")] = (0.5, 200)
+    server.behaviour[("images", "Moose")] = (0.5, 200)
+    results: List[Dict[str, Any]] = []
+    leader = threading.Thread(target=lambda: results.append(server.client(budget=3).search("Moose")))
+    leader.start()
+    time.sleep(0.05)
+    # A lookup joining the slow fetch still gives up after its own budget
+    start = time.monotonic()
+    result = server.client(budget=0.15).search("Moose")
+    elapsed = time.monotonic() - start
+    assert result["summary"] is None and result["images"] == []
+    assert elapsed < 0.35, elapsed
+    leader.join()
+    assert results[0]["summary"] == "Moose summary"
+    print(f"A lookup waiting on another one gives up after its budget ({elapsed:.2f}s)")
+
+
+def _test_session_memo(server: StubServer):
+    info = server.client()
+    first = info.search("Zebra")
+    first["images"].append("changed by the caller")
+    count = len(server.requests)
+    assert info.search("Zebra")["images"] == ["http://img/Zebra-1.jpg"]
+    assert len(server.requests) == count
+
+    # A failed lookup is not remembered
+    server.behaviour[("summary", "Yak")] = (0, 503)
+    info = server.client(retries=0)
+    assert info.search("Yak")["summary"] is None
+    server.behaviour[("summary", "Yak")] = (0, 200)
+    assert info.search("Yak")["summary"] == "Yak summary"
+    print("Repeated searches in a session are answered from its memo")
+
+
+if __name__ == "__main__":
+    server = StubServer()
+    try:
+        _test_search_reuses_connections(server)
+        _test_retries_transient_errors(server)
+        _test_latency_budget(server)
+        _test_lookups_run_concurrently(server)
+        _test_responses_are_cached(server)
+        _test_unusable_cache_is_skipped(server)
+        _test_concurrent_lookups_share_one_fetch(server)
+        _test_shared_fetch_keeps_each_budget(server)
+        _test_session_memo(server)
+    finally:
+        server.shutdown()
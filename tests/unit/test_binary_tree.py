@@ -0,0 +1,80 @@
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from data.binary_tree import write_binary_tree, is_binary_tree, LazyNode, _UNLOADED
+from data.parsing import Parsing
+from game.question_node import QuestionNode
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+
+
+def _animals():
+    return Parsing(os.path.join(base, 'data', 'animals_tree.json')).load_json_tree(verbose=False)
+
+
+def _test_round_trip():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "tree.bin")
+    root = _animals()
+    write_binary_tree(root, path)
+
+    assert is_binary_tree(path)
+    loaded = Parsing(path).load_tree(verbose=False)
+    assert isinstance(loaded, LazyNode)
+    assert loaded.to_dict() == root.to_dict()
+    shutil.rmtree(directory)
+    print("Binary tree round-trips animals_tree.json")
+
+
+def _test_nodes_are_lazy():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "tree.bin")
+    write_binary_tree(_animals(), path)
+    root = Parsing(path).load_tree(verbose=False)
+
+    assert root._yes is _UNLOADED and root._no is _UNLOADED
+    assert root.yes.yes.value == "Is it a household companion?"
+    assert root._no is _UNLOADED
+    assert root.yes._no is _UNLOADED
+    shutil.rmtree(directory)
+    print("Binary tree nodes are only materialized when reached")
+
+
+def _test_save_keeps_binary_format():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "tree.bin")
+    write_binary_tree(QuestionNode("Dog"), path)
+    parsing = Parsing(path)
+    root = parsing.load_tree(verbose=False)
+
+    root.value = "Does it miaow?"
+    root.yes = QuestionNode("Cat")
+    root.no = QuestionNode("Dog")
+    parsing.save_json_tree(root)
+
+    assert is_binary_tree(path)
+    assert Parsing(path).load_tree(verbose=False).to_dict() == root.to_dict()
+    shutil.rmtree(directory)
+    print("Saving a binary tree keeps the binary format")
+
+
+def _test_corrupt_file_returns_default():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "tree.bin")
+    write_binary_tree(_animals(), path)
+    with open(path, "r+b") as f:
+        f.truncate(40)
+
+    assert Parsing(path).load_tree(default="DEFAULT", verbose=False) == "DEFAULT"
+    shutil.rmtree(directory)
+    print("Truncated binary tree returns default")
+
+
+if __name__ == "__main__":
+    _test_round_trip()
+    _test_nodes_are_lazy()
+    _test_save_keeps_binary_format()
+    _test_corrupt_file_returns_default()
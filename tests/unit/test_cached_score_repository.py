@@ -0,0 +1,152 @@
+import sys
+import os
+import time
+from typing import Dict, List, Tuple
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from interfaces.i_score_repository import IScoreRepository
+from scoring.cached_score_repository import CachedScoreRepository
+
+
+class CountingRepository(IScoreRepository):
+    # Dictionary-backed repository that counts calls
+
+    def __init__(self) -> None:
+        self.totals: Dict[str, int] = {}
+        self.saves: List[Tuple[str, int]] = []
+        self.reads: int = 0
+
+    def user_exists(self, username: str) -> bool:
+        self.reads += 1
+        return username in self.totals
+
+    def create_user(self, username: str) -> None:
+        self.totals.setdefault(username, 0)
+
+    def get_user_score(self, username: str) -> int:
+        self.reads += 1
+        return self.totals.setdefault(username, 0)
+
+    def save_score(self, username: str, score: int) -> None:
+        self.saves.append((username, score))
+        self.totals[username] = score
+
+    def add_to_score(self, username: str, delta: int) -> int:
+        self.saves.append((username, delta))
+        self.totals[username] = self.totals.get(username, 0) + delta
+        return self.totals[username]
+
+    def all_scores(self) -> Dict[str, int]:
+        self.reads += 1
+        return dict(self.totals)
+
+
+def _test_reads_are_cached():
+    backend = CountingRepository()
+    backend.totals["alice"] = 30
+    cache = CachedScoreRepository(backend, flush_interval=0)
+    for _ in range(10):
+        assert cache.get_user_score("alice") == 30
+    assert backend.reads == 1
+    assert (cache.hits, cache.misses) == (9, 1)
+    assert cache.user_exists("alice") and backend.reads == 1
+    print("Repeated reads are served from memory")
+
+
+def _test_write_back():
+    backend = CountingRepository()
+    cache = CachedScoreRepository(backend, flush_interval=60)
+    cache.save_score("alice", 10)
+    cache.save_score("alice", 25)
+    assert cache.get_user_score("alice") == 25
+    assert backend.saves == []
+    cache.flush()
+    assert backend.saves == [("alice", 10), ("alice", 25)]
+    cache.save_score("bob", 5)
+    cache.close()
+    assert backend.saves[-1] == ("bob", 5)
+    print("Saved scores are written back in order on flush and close")
+
+
+def _test_increments_are_written_as_deltas():
+    backend = CountingRepository()
+    backend.totals["alice"] = 100
+    cache = CachedScoreRepository(backend, flush_interval=60)
+    assert cache.add_to_score("alice", 15) == 115
+    assert cache.add_to_score("alice", -5) == 110
+    # Another writer changes the backend before the flush
+    backend.totals["alice"] += 1
+    cache.close()
+    assert backend.saves == [("alice", 15), ("alice", -5)]
+    assert backend.totals["alice"] == 111
+    print("Increments are flushed as increments, not totals")
+
+
+def _test_background_flush():
+    backend = CountingRepository()
+    cache = CachedScoreRepository(backend, flush_interval=0.05)
+    cache.save_score("alice", 10)
+    deadline = time.monotonic() + 5
+    while not backend.saves and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert backend.saves == [("alice", 10)]
+    cache.close()
+    print("The background thread flushes pending scores")
+
+
+def _test_lru_eviction_keeps_dirty_users():
+    backend = CountingRepository()
+    cache = CachedScoreRepository(backend, capacity=2, flush_interval=60)
+    cache.save_score("alice", 1)
+    cache.get_user_score("bob")
+    cache.get_user_score("carol")
+    # alice is least recently used but not written yet, so bob goes
+    assert cache.get_user_score("alice") == 1
+    misses = cache.misses
+    cache.get_user_score("bob")
+    assert cache.misses == misses + 1
+    cache.close()
+    assert backend.totals["alice"] == 1
+    print("LRU eviction skips users with unwritten scores")
+
+
+def _test_create_user_keeps_existing_total():
+    backend = CountingRepository()
+    backend.totals["alice"] = 50
+    cache = CachedScoreRepository(backend, flush_interval=60)
+    cache.create_user("alice")
+    assert cache.get_user_score("alice") == 50
+    assert cache.add_to_score("alice", 5) == 55
+    cache.close()
+    assert backend.totals["alice"] == 55
+    print("create_user does not hide an existing total")
+
+
+def _test_ttl_rereads_totals():
+    backend = CountingRepository()
+    backend.totals["alice"] = 10
+    cache = CachedScoreRepository(backend, flush_interval=60, ttl=0.05)
+    assert cache.get_user_score("alice") == 10
+    # Another process writes to the backend
+    backend.totals["alice"] = 40
+    assert cache.get_user_score("alice") == 10
+    time.sleep(0.1)
+    assert cache.get_user_score("alice") == 40
+
+    # A total with unwritten changes is not re-read
+    cache.add_to_score("alice", 5)
+    time.sleep(0.1)
+    assert cache.get_user_score("alice") == 45
+    cache.close()
+    assert backend.totals["alice"] == 45
+    print("Totals older than ttl are read again")
+
+
+if __name__ == "__main__":
+    _test_reads_are_cached()
+    _test_write_back()
+    _test_increments_are_written_as_deltas()
+    _test_background_flush()
+    _test_lru_eviction_keeps_dirty_users()
+    _test_create_user_keeps_existing_total()
+    _test_ttl_rereads_totals()
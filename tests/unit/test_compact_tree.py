@@ -0,0 +1,113 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from game.compact_tree import CompactTree, CompactNode
+from game.question_node import QuestionNode
+from data.parsing import Parsing
+from data.binary_tree import write_binary_tree
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+
+
+def _load_animals():
+    with open(os.path.join(base, 'data', 'animals_tree.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _test_round_trip():
+    data = _load_animals()
+    tree = CompactTree.from_dict(data)
+
+    assert tree.to_dict() == data
+    assert tree.root.to_dict() == data
+    print("CompactTree round-trips animals_tree.json")
+
+
+def _test_navigation_matches_question_node():
+    data = _load_animals()
+    compact = CompactTree.from_dict(data).root
+    linked = QuestionNode("").from_dict(data)
+
+    for answers in ([True, True, True, True], [False, False, False, False], [True, False, True]):
+        a, b = compact, linked
+        for answer in answers:
+            a, b = (a.yes, b.yes) if answer else (a.no, b.no)
+            assert a.value == b.value
+        assert (a.yes is None) == (b.yes is None)
+    print("CompactNode navigation matches QuestionNode")
+
+
+def _test_learning_in_place():
+    tree = CompactTree.from_dict({"value": "Dog", "yes": None, "no": None})
+    node = tree.root
+
+    new_node = QuestionNode("Does it miaow?", QuestionNode("Cat"), QuestionNode(node.value))
+    node.value = new_node.value
+    node.yes = new_node.yes
+    node.no = new_node.no
+
+    assert tree.root.to_dict() == {
+        "value": "Does it miaow?",
+        "yes": {"value": "Cat", "yes": None, "no": None},
+        "no": {"value": "Dog", "yes": None, "no": None},
+    }
+    print("CompactNode supports the learning mutation")
+
+
+def _test_deep_chain():
+    root = QuestionNode("leaf")
+    for i in range(50_000):
+        root = QuestionNode(f"q{i}", root, None)
+    tree = CompactTree.from_node(root)
+
+    assert len(tree) == 50_001
+    assert tree.nbytes() == 50_001 * 3 * tree.values.itemsize
+    print("CompactTree builds deep chains without recursion")
+
+
+def _test_load_compact_tree():
+    data = _load_animals()
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'tree.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        parsing = Parsing(path)
+        root = parsing.load_compact_tree()
+        assert isinstance(root, CompactNode) and root.to_dict() == data
+        # Second load comes from the sidecar cache
+        assert Parsing(path).load_compact_tree().to_dict() == data
+
+        binary = os.path.join(directory, 'tree.bin')
+        write_binary_tree(QuestionNode("").from_dict(data), binary)
+        root = Parsing(binary).load_compact_tree()
+        assert isinstance(root, CompactNode) and root.to_dict() == data
+
+        invalid = os.path.join(directory, 'invalid.json')
+        with open(invalid, 'w', encoding='utf-8') as f:
+            json.dump({"value": "q", "yes": {"value": 1, "yes": None, "no": None}, "no": None}, f)
+        assert Parsing(invalid).load_compact_tree(default="fallback", verbose=False) == "fallback"
+
+        # Deeper than json.load can decode: the streaming parser takes over
+        deep = os.path.join(directory, 'deep.json')
+        with open(deep, 'w', encoding='utf-8') as f:
+            f.write('{"value": "q", "yes": ' * 100_000)
+            f.write('{"value": "leaf", "yes": null, "no": null}')
+            f.write(', "no": null}' * 100_000)
+        tree = Parsing(deep).load_compact_tree().tree
+        assert len(tree) == 100_001 and tree.root.value == "q"
+    finally:
+        shutil.rmtree(directory)
+    print("load_compact_tree reads JSON, cached and binary trees into arrays")
+
+
+if __name__ == "__main__":
+    _test_round_trip()
+    _test_navigation_matches_question_node()
+    _test_learning_in_place()
+    _test_deep_chain()
+    _test_load_compact_tree()
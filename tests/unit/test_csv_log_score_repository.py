@@ -0,0 +1,77 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scoring.csv_log_score_repository import CSVLogScoreRepository
+
+
+def _test_reads_existing_history(directory: str):
+    path = os.path.join(directory, 'history.csv')
+    with open(path, 'w') as f:
+        f.write("username,last_score,score_total\nvalentin,0,0\nvalentin,20,20\nana,0,0\nvalentin,40,40\n")
+
+    repository = CSVLogScoreRepository(path)
+    assert repository.get_user_score("valentin") == 40
+    assert repository.user_exists("ana") and not repository.user_exists("zoe")
+    assert repository.get_user_score("zoe") == 0 and repository.user_exists("zoe")
+    assert repository.add_to_score("valentin", -15) == 25
+    repository.save_score("ana", 7)
+
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines[-3:] == ["zoe,0,0", "valentin,-15,25", "ana,7,7"]
+    print("Existing scoring.csv history is indexed and appended to")
+
+
+def _test_instances_see_each_other(directory: str):
+    path = os.path.join(directory, 'shared.csv')
+    first = CSVLogScoreRepository(path)
+    second = CSVLogScoreRepository(path)
+    first.add_to_score("alice", 10)
+    assert second.add_to_score("alice", 5) == 15
+    assert first.get_user_score("alice") == 15
+
+    def play(repository):
+        for _ in range(50):
+            repository.add_to_score("bob", 1)
+
+    threads = [threading.Thread(target=play, args=(repository,)) for repository in (first, second) * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert first.get_user_score("bob") == 200
+    assert CSVLogScoreRepository(path).get_user_score("bob") == 200
+    print("Appends from other writers are picked up incrementally")
+
+
+def _test_compact(directory: str):
+    path = os.path.join(directory, 'compact.csv')
+    repository = CSVLogScoreRepository(path)
+    other = CSVLogScoreRepository(path)
+    for total in (5, 10, 15):
+        repository.save_score("alice", total)
+    repository.add_to_score("bob", 3)
+    repository.add_to_score("bob", 4)
+
+    assert repository.compact() == 3
+    with open(path) as f:
+        assert f.read() == "username,last_score,score_total\nalice,15,15\nbob,4,7\n"
+    # A second instance notices the rewrite and rebuilds its index
+    assert other.get_user_score("alice") == 15
+    assert other.add_to_score("bob", 1) == 8
+    assert repository.get_user_score("bob") == 8
+    print("Compaction keeps one row per user and totals unchanged")
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    try:
+        _test_reads_existing_history(directory)
+        _test_instances_see_each_other(directory)
+        _test_compact(directory)
+    finally:
+        shutil.rmtree(directory)
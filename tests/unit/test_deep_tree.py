@@ -0,0 +1,107 @@
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from game.question_node import QuestionNode
+from data.parsing import Parsing
+
+DEPTH = 100_000
+
+
+def _build_chain(depth):
+    # Degenerate tree: every question only has a "yes" branch
+    root = QuestionNode("leaf")
+    for i in range(depth):
+        root = QuestionNode(f"q{i}", root, None)
+    return root
+
+
+def _chain_depth(node):
+    depth = 0
+    while node.yes is not None:
+        node = node.yes
+        depth += 1
+    return depth
+
+
+def _test_to_dict_deep_chain():
+    data = _build_chain(DEPTH).to_dict()
+
+    depth = 0
+    while data["yes"] is not None:
+        data = data["yes"]
+        depth += 1
+    assert depth == DEPTH and data["value"] == "leaf"
+    print("to_dict handles a 100k-deep chain")
+
+
+def _test_from_dict_deep_chain():
+    data = _build_chain(DEPTH).to_dict()
+    root = QuestionNode("").from_dict(data)
+
+    assert root.value == f"q{DEPTH - 1}"
+    assert _chain_depth(root) == DEPTH
+    print("from_dict handles a 100k-deep chain")
+
+
+def _test_validate_deep_chain():
+    parsing = Parsing("unused.json")
+    data = _build_chain(DEPTH).to_dict()
+    assert parsing._validate_node_dict(data) == (True, None)
+
+    # Break the deepest node and check the error path points at it
+    leaf = data
+    while leaf["yes"] is not None:
+        leaf = leaf["yes"]
+    leaf["value"] = 42
+    ok, reason = parsing._validate_node_dict(data)
+    assert not ok
+    assert reason == f"'value' must be a string at root{'.yes' * DEPTH}, got int"
+    print("_validate_node_dict handles a 100k-deep chain")
+
+
+def _test_save_deep_chain():
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        Parsing(path).save_json_tree(_build_chain(DEPTH))
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        assert text.startswith('{\n  "value": "q99999",\n  "yes": {')
+        assert text.count('"value"') == DEPTH + 1
+    finally:
+        os.remove(path)
+    print("save_json_tree handles a 100k-deep chain")
+
+
+def _test_load_deep_chain():
+    fd, path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        Parsing(path).save_json_tree(_build_chain(DEPTH))
+        # Too deep for json.load: load_json_tree falls back to the streaming parser
+        root = Parsing(path).load_json_tree(default=None, verbose=False)
+        assert root is not None and root.value == f"q{DEPTH - 1}"
+        assert _chain_depth(root) == DEPTH
+    finally:
+        os.remove(path)
+    print("load_json_tree handles a 100k-deep chain")
+
+
+def _test_save_matches_json_dump():
+    node = QuestionNode("Q", QuestionNode("Aé\""), QuestionNode("B", None, QuestionNode("C")))
+    parsing = Parsing("unused.json")
+
+    assert "".join(parsing._iter_json_tree(node)) == json.dumps(node.to_dict(), indent=2)
+    print("save_json_tree output matches json.dump(indent=2)")
+
+
+if __name__ == "__main__":
+    _test_to_dict_deep_chain()
+    _test_from_dict_deep_chain()
+    _test_validate_deep_chain()
+    _test_save_deep_chain()
+    _test_load_deep_chain()
+    _test_save_matches_json_dump()
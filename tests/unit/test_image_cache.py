@@ -0,0 +1,138 @@
+import sys
+import os
+import io
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Pillow is not installed, skipping image cache tests")
+    sys.exit(0)
+
+from api.animal_info import AnimalInfo
+from api.image_cache import ImageCache
+
+
+def _encode(image: "Image.Image", format: str) -> bytes:
+    output = io.BytesIO()
+    image.save(output, format=format)
+    return output.getvalue()
+
+
+class StubImages(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            self.server.requests.append(self.path)
+        status, body = self.server.files.get(self.path, (404, b""))
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubImages)
+        self.lock = threading.Lock()
+        self.requests: List[str] = []
+        photo = _encode(Image.new("RGB", (2000, 1500), (200, 120, 40)), "JPEG")
+        self.files: Dict[str, Any] = {
+            "/photo.jpg": (200, photo),
+            "/same-photo.jpg": (200, photo),
+            "/logo.png": (200, _encode(Image.new("RGBA", (300, 900), (0, 0, 255, 128)), "PNG")),
+            "/palette.gif": (200, _encode(Image.new("P", (64, 64)), "GIF")),
+            "/broken.png": (200, b"not an image"),
+            "/diagram.svg": (200, b"<svg/>"),
+            "/down.jpg": (503, b""),
+        }
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+
+def _client() -> AnimalInfo:
+    return AnimalInfo(cache_file=None, retries=0)
+
+
+def _test_images_are_downscaled_once(server: StubServer, directory: str):
+    cache = ImageCache(_client(), os.path.join(directory, "once"), size=400)
+    path = cache.thumbnail(server.url("/photo.jpg"))
+    assert path is not None and path.endswith(".webp")
+    with Image.open(path) as image:
+        assert image.format == "WEBP"
+        assert image.size == (400, 300), image.size
+    assert os.path.getsize(path) < len(server.files["/photo.jpg"][1])
+
+    before = len(server.requests)
+    assert ImageCache(_client(), os.path.join(directory, "once")).thumbnail(server.url("/photo.jpg")) == path
+    assert len(server.requests) == before
+
+    # Same content behind another URL: downloaded, but stored once
+    assert cache.thumbnail(server.url("/same-photo.jpg")) == path
+    assert len(os.listdir(os.path.join(directory, "once", "blobs"))) == 1
+    print("Images are downscaled once and stored by content")
+
+
+def _test_modes_are_kept_or_converted(server: StubServer, directory: str):
+    cache = ImageCache(_client(), os.path.join(directory, "modes"), size=300)
+    with Image.open(cache.thumbnail(server.url("/logo.png"))) as image:
+        assert image.mode == "RGBA" and image.size == (100, 300), (image.mode, image.size)
+    with Image.open(cache.thumbnail(server.url("/palette.gif"))) as image:
+        assert image.mode == "RGB" and image.size == (64, 64)
+    print("Transparency is kept and small images are not enlarged")
+
+
+def _test_unusable_urls(server: StubServer, directory: str):
+    cache = ImageCache(_client(), os.path.join(directory, "unusable"))
+    assert cache.thumbnail(server.url("/diagram.svg")) is None
+    assert "/diagram.svg" not in server.requests
+
+    # Unreadable and missing images are remembered, failures are retried
+    for path in ("/broken.png", "/missing.jpg", "/down.jpg"):
+        assert cache.thumbnail(server.url(path)) is None
+        assert cache.thumbnail(server.url(path)) is None
+    assert server.requests.count("/broken.png") == 1
+    assert server.requests.count("/missing.jpg") == 1
+    assert server.requests.count("/down.jpg") == 2
+    print("Non-images are skipped, failed downloads are retried later")
+
+
+def _test_thumbnails_stop_at_limit(server: StubServer, directory: str):
+    cache = ImageCache(_client(), os.path.join(directory, "limit"))
+    urls = [server.url(path) for path in (
+        "/diagram.svg", "/broken.png", "/logo.png", "/photo.jpg", "/palette.gif", "/same-photo.jpg"
+    )]
+    before = len(server.requests)
+    paths = cache.thumbnails(urls, limit=2)
+    assert len(paths) == 2
+    assert paths == [cache.thumbnail(urls[2]), cache.thumbnail(urls[3])]
+    # The first wave of 2 had one failure, so one more download ran
+    assert len(server.requests) - before == 3, server.requests[before:]
+    print("thumbnails downloads only what the limit needs")
+
+
+if __name__ == "__main__":
+    server = StubServer()
+    directory = tempfile.mkdtemp()
+    try:
+        _test_images_are_downscaled_once(server, directory)
+        _test_modes_are_kept_or_converted(server, directory)
+        _test_unusable_urls(server, directory)
+        _test_thumbnails_stop_at_limit(server, directory)
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory)
@@ -0,0 +1,67 @@
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scoring.leaderboard import Leaderboard, LeaderboardScoreRepository
+from scoring.memory_score_repository import InMemoryScoreRepository
+from scoring.score import Score
+
+
+def _test_top_and_rank():
+    board = Leaderboard([("alice", 30), ("bob", 50), ("carol", 30), ("dave", 10)])
+    assert board.top(3) == [("bob", 50), ("alice", 30), ("carol", 30)]
+    assert board.rank("bob") == 1
+    # Equal totals share a rank
+    assert board.rank("alice") == board.rank("carol") == 2
+    assert board.rank("dave") == 4
+    assert board.rank("nobody") is None
+
+    board.update("dave", 60)
+    board.update("bob", 5)
+    assert board.top(2) == [("dave", 60), ("alice", 30)]
+    assert board.rank("bob") == 4
+    assert len(board) == 4
+    print("Top-K and ranks follow score updates")
+
+
+def _test_repository_keeps_board_in_sync():
+    backend = InMemoryScoreRepository()
+    backend.save_score("alice", 40)
+    repository = LeaderboardScoreRepository(backend)
+    assert repository.top() == [("alice", 40)]
+
+    score = Score("bob", repository)
+    assert repository.rank("bob") == 2
+    score.actual_score = 50
+    score.victory()
+    assert repository.top() == [("bob", 50), ("alice", 40)]
+    repository.save_score("alice", 70)
+    assert repository.rank("alice") == 1
+    print("Writes through the repository update the leaderboard")
+
+
+def _test_million_users():
+    rng = random.Random(1)
+    board = Leaderboard((f"user{i}", rng.randrange(100000)) for i in range(1_000_000))
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        board.top(10)
+        board.rank(f"user{rng.randrange(1_000_000)}")
+    query = (time.perf_counter() - start) / 1000
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        board.update(f"user{rng.randrange(1_000_000)}", rng.randrange(100000))
+    update = (time.perf_counter() - start) / 1000
+
+    assert query < 0.001, query
+    print(f"1M users: top-10 + rank {query * 1e6:.1f} us, update {update * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    _test_top_and_rank()
+    _test_repository_keeps_board_in_sync()
+    _test_million_users()
@@ -0,0 +1,108 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from data.parsing import Parsing
+from data.learning_journal import LearningJournal
+
+TREE = {
+    "value": "Does it have fur?",
+    "yes": {"value": "Dog", "yes": None, "no": None},
+    "no": {"value": "Bird", "yes": None, "no": None},
+}
+
+
+def _new_tree_file():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "tree.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(TREE, f)
+    return path
+
+
+def _teach_cat(parsing, root):
+    # Same mutation as EndGame._improve_game, then journal it
+    node = root.yes
+    guess = node.value
+    node.value = "Does it miaow?"
+    node.yes = type(root)("Cat")
+    node.no = type(root)(guess)
+    parsing.save_lesson(root, "root.yes", guess, "Does it miaow?", "Cat", True)
+
+
+def _test_lesson_is_replayed_on_load():
+    path = _new_tree_file()
+    parsing = Parsing(path)
+    root = parsing.load_json_tree(verbose=False)
+    _teach_cat(parsing, root)
+
+    # Snapshot untouched, lesson only in the journal
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f) == TREE
+    assert parsing.journal.size() > 0
+
+    reloaded = Parsing(path).load_json_tree(verbose=False)
+    assert reloaded.to_dict() == root.to_dict()
+    shutil.rmtree(os.path.dirname(path))
+    print("Lessons are replayed on top of the snapshot")
+
+
+def _test_replay_is_idempotent():
+    path = _new_tree_file()
+    parsing = Parsing(path)
+    root = parsing.load_json_tree(verbose=False)
+    _teach_cat(parsing, root)
+
+    # Snapshot already containing the lesson: replay must not apply it twice
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(root.to_dict(), f)
+    reloaded = Parsing(path).load_json_tree(verbose=False)
+    assert reloaded.to_dict() == root.to_dict()
+    shutil.rmtree(os.path.dirname(path))
+    print("Replaying a lesson already in the snapshot is a no-op")
+
+
+def _test_compaction_folds_journal():
+    path = _new_tree_file()
+    parsing = Parsing(path, compact_threshold=1)
+    root = parsing.load_json_tree(verbose=False)
+    _teach_cat(parsing, root)
+
+    # Wait for the background compaction started by save_lesson
+    parsing.compact(root, background=False)
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f) == root.to_dict()
+    assert parsing.journal.size() == 0
+    shutil.rmtree(os.path.dirname(path))
+    print("Compaction writes a new snapshot and empties the journal")
+
+
+def _test_truncate_keeps_later_lessons():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "tree.json.journal")
+    journal = LearningJournal(path)
+    offset = journal.append("root.yes", "Dog", "Does it meow?", "Cat", True)
+    journal.append("root.no", "Bird", "Can it fly?", "Penguin", False)
+    os.chmod(path, 0o664)
+    before = os.stat(path).st_ino
+
+    journal.truncate(offset)
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    assert [json.loads(line)["animal"] for line in lines] == ["Penguin"]
+    # A new file was renamed over the journal, with the same permissions
+    assert os.stat(path).st_ino != before
+    assert os.stat(path).st_mode & 0o777 == 0o664
+    assert [name for name in os.listdir(directory) if name.endswith(".tmp")] == []
+    shutil.rmtree(directory)
+    print("Truncating the journal replaces it with the lessons after the offset")
+
+
+if __name__ == "__main__":
+    _test_lesson_is_replayed_on_load()
+    _test_replay_is_idempotent()
+    _test_compaction_folds_journal()
+    _test_truncate_keeps_later_lessons()
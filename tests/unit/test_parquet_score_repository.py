@@ -0,0 +1,133 @@
+import sys
+import os
+import importlib.util
+import shutil
+import subprocess
+import tempfile
+import textwrap
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+if importlib.util.find_spec("pyarrow") is None:
+    print("pyarrow is not installed, skipping Parquet repository tests")
+    sys.exit(0)
+
+from scoring.parquet_score_repository import ParquetScoreRepository
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def _test_totals_survive_reopen(directory: str):
+    path = os.path.join(directory, 'totals')
+    repository = ParquetScoreRepository(path, row_group_size=4)
+    assert repository.get_user_score("alice") == 0
+    assert repository.add_to_score("alice", 20) == 20
+    assert repository.add_to_score("alice", -5) == 15
+    repository.save_score("bob", 40)
+    repository.close()
+
+    repository = ParquetScoreRepository(path)
+    assert repository.get_user_score("alice") == 15
+    assert repository.get_user_score("bob") == 40
+    assert repository.all_scores() == {"alice": 15, "bob": 40}
+    assert repository.history("alice")["score_total"].to_pylist() == [0, 20, 15]
+    print("Totals are rebuilt from the Parquet history")
+
+
+def _test_batching_and_merge(directory: str):
+    path = os.path.join(directory, 'merge')
+    repository = ParquetScoreRepository(path, row_group_size=2, max_files=3)
+    for i in range(20):
+        repository.add_to_score(f"user{i % 4}", 5)
+    repository.flush()
+    partitions = [name for name in os.listdir(path) if name.startswith("date=")]
+    files = [name for partition in partitions for name in os.listdir(os.path.join(path, partition))]
+    assert len(files) <= 3 + len(partitions), files
+    assert repository.games_per_user() == {f"user{i}": 5 for i in range(4)}
+    repository.merge()
+    assert ParquetScoreRepository(path).all_scores() == {f"user{i}": 25 for i in range(4)}
+    print("Rows are written in row groups and small files are merged")
+
+
+def _test_interrupted_merge(directory: str):
+    path = os.path.join(directory, 'interrupted')
+    repository = ParquetScoreRepository(path, row_group_size=2, max_files=100)
+    for i in range(6):
+        repository.add_to_score(f"user{i % 2}", 5)
+    repository.flush()
+    # Stop between writing the merged file and removing its sources
+    partition = os.path.join(path, os.listdir(path)[0])
+    sources = {}
+    for name in os.listdir(partition):
+        with open(os.path.join(partition, name), "rb") as f:
+            sources[name] = f.read()
+    repository.merge()
+    for name, data in sources.items():
+        with open(os.path.join(partition, name), "wb") as f:
+            f.write(data)
+    repository.close()
+
+    repository = ParquetScoreRepository(path)
+    assert len(os.listdir(partition)) == 1, os.listdir(partition)
+    assert repository.games_per_user() == {"user0": 3, "user1": 3}
+    assert repository.history("user0")["score_total"].to_pylist() == [5, 10, 15]
+    print("Sources left by an interrupted merge are removed on start")
+
+
+def _run_and_exit(path: str, code: str) -> None:
+    # Run `code` with `repository` opened on `path` in a new process
+    script = "\n".join([
+        "import os, sys, time",
+        f"sys.path.insert(0, {ROOT!r})",
+        "from scoring.parquet_score_repository import ParquetScoreRepository",
+        f"repository = ParquetScoreRepository({path!r}, flush_interval=0.1)",
+        textwrap.dedent(code),
+    ])
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def _test_buffered_rows_survive_restart(directory: str):
+    path = os.path.join(directory, 'restart')
+    # Normal exit without close: the rows are written at exit
+    _run_and_exit(path, """
+        assert repository.add_to_score("bob", 30) == 30
+    """)
+    assert ParquetScoreRepository(path).get_user_score("bob") == 30
+
+    # Killed after the flush interval: the background thread wrote the rows
+    _run_and_exit(path, """
+        repository.add_to_score("bob", 10)
+        time.sleep(0.5)
+        os._exit(0)
+    """)
+    assert ParquetScoreRepository(path).get_user_score("bob") == 40
+    print("Buffered rows are written at exit and every flush_interval")
+
+
+def _test_analytics(directory: str):
+    repository = ParquetScoreRepository(os.path.join(directory, 'analytics'))
+    repository.create_user("carol")
+    repository.add_to_score("alice", 25)   # won after 5 questions
+    repository.add_to_score("alice", -10)  # lost after 2 questions
+    repository.add_to_score("bob", 15)     # won after 3 questions
+    repository.save_score("carol", 100)    # not a game
+    repository.add_to_score("carol", 0)    # won or lost before any question
+
+    assert repository.games_per_user() == {"alice": 2, "bob": 1}
+    assert abs(repository.win_rate() - 2 / 3) < 1e-9
+    assert repository.win_rate("alice") == 0.5
+    assert repository.win_rate("carol") is None
+    assert abs(repository.average_questions() - 10 / 3) < 1e-9
+    assert repository.score_distribution(bucket=10) == {-10: 1, 10: 1, 20: 1}
+    print("Analytics are computed over finished games")
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    try:
+        _test_totals_survive_reopen(directory)
+        _test_batching_and_merge(directory)
+        _test_interrupted_merge(directory)
+        _test_buffered_rows_survive_restart(directory)
+        _test_analytics(directory)
+    finally:
+        shutil.rmtree(directory)
@@ -1,7 +1,7 @@
 import sys
 import os
 import json
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from data.parsing import Parsing
 
 base = os.path.dirname(__file__)
@@ -49,8 +49,19 @@ root = p_good.load_json_tree(default=None, verbose=False)
 assert root is not None and getattr(root, 'value', None) == 'Root', f"Expected root with value 'Root', got {root!r}"
 print('Test 5 passed: good file returns root node with value Root')
 
+# 6) Malformed nested node -> default, error reports its path
+nested_path = os.path.join(base, 'nested.json')
+_write_file(nested_path, json.dumps({"value": "Root", "yes": {"value": "Dog", "yes": None, "no": [1]}, "no": None}))
+p_nested = Parsing(nested_path)
+res = p_nested.load_json_tree(default='DEFAULT', verbose=False)
+assert res == 'DEFAULT', f"Expected DEFAULT for malformed nested node, got {res!r}"
+with open(nested_path, 'r', encoding='utf-8') as f:
+    _, reason = p_nested._load_nodes(f)
+assert reason == "expected dict or None at root.yes.no, got list", f"Unexpected reason {reason!r}"
+print('Test 6 passed: malformed nested node returns default with its path')
+
 # cleanup
-for f in (invalid_path, weird_path, good_path):
+for f in (invalid_path, weird_path, good_path, nested_path):
     try:
         os.remove(f)
     except Exception:
@@ -0,0 +1,134 @@
+import sys
+import os
+import io
+import subprocess
+import threading
+import time
+from contextlib import redirect_stdout
+from typing import Dict, Any, List
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from api.animal_info import AnimalInfo
+from api.prefetcher import Prefetcher, subtree_leaves
+from game.question_node import QuestionNode
+
+
+class SlowInfo:
+    # Stands in for AnimalInfo: records searches and blocks until released
+    def __init__(self) -> None:
+        self.searched: List[str] = []
+        self.quiet: List[bool] = []
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def search(self, animal_name: str, quiet: bool = False) -> Dict[str, Any]:
+        with self.lock:
+            self.searched.append(animal_name)
+            self.quiet.append(quiet)
+        self.release.wait(5)
+        return {"name": animal_name}
+
+
+def _tree() -> QuestionNode:
+    # 16 leaves: a balanced tree of depth 4
+    def build(depth: int, prefix: str) -> QuestionNode:
+        if depth == 0:
+            return QuestionNode(f"animal{prefix}")
+        node = QuestionNode(f"question{prefix}")
+        node.yes = build(depth - 1, prefix + "1")
+        node.no = build(depth - 1, prefix + "0")
+        return node
+    return build(4, "")
+
+
+def _test_subtree_leaves():
+    root = _tree()
+    assert subtree_leaves(root, 8) is None
+    assert len(subtree_leaves(root, 16)) == 16
+    assert subtree_leaves(root.yes.yes, 8) == ["animal1111", "animal1110", "animal1101", "animal1100"]
+    assert subtree_leaves(root.yes.yes.yes.yes, 8) == ["animal1111"]
+    print("Leaves are listed only for small subtrees")
+
+
+def _test_prefetch_starts_below_threshold():
+    root = _tree()
+    info = SlowInfo()
+    prefetcher = Prefetcher(info, threshold=4)
+    prefetcher.update(root)
+    prefetcher.update(root.yes)
+    time.sleep(0.1)
+    assert info.searched == []
+
+    prefetcher.update(root.yes.yes)
+    time.sleep(0.1)
+    assert sorted(info.searched) == ["animal1100", "animal1101", "animal1110", "animal1111"]
+    info.release.set()
+    prefetcher.cancel()
+    print("Prefetching starts once few enough animals remain")
+
+
+def _test_abandoned_branches_are_cancelled():
+    root = _tree()
+    info = SlowInfo()
+    prefetcher = Prefetcher(info, threshold=8)
+    # 8 leaves but only 4 workers: half of the fetches wait in the queue
+    prefetcher.update(root.yes)
+    time.sleep(0.1)
+    assert len(info.searched) == 4
+    started = list(info.searched)
+
+    prefetcher.update(root.yes.no)
+    info.release.set()
+    time.sleep(0.2)
+    # Queued fetches outside root.yes.no never ran
+    ran_late = [name for name in info.searched if name not in started]
+    assert all(name.startswith("animal10") for name in ran_late), ran_late
+    prefetcher.cancel()
+    print("Fetches for an abandoned branch are cancelled")
+
+
+def _test_prefetches_are_quiet():
+    info = SlowInfo()
+    info.release.set()
+    prefetcher = Prefetcher(info, threshold=4)
+    prefetcher.update(_tree().yes.yes)
+    time.sleep(0.1)
+    assert info.quiet == [True] * 4
+
+    # Nothing listens on port 9: every lookup fails without a message
+    unreachable = AnimalInfo(cache_file=None, retries=0)
+    unreachable.summary_url = "http://127.0.0.1:9/summary/"
+    unreachable.commons_url = "http://127.0.0.1:9/commons"
+    output = io.StringIO()
+    with redirect_stdout(output):
+        result = unreachable.search("Cat", quiet=True)
+    assert result["summary"] is None and output.getvalue() == ""
+    print("Prefetch lookups print nothing")
+
+
+def _test_exit_is_not_delayed():
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    script = "\n".join([
+        "import sys, time",
+        f"sys.path.insert(0, {root!r})",
+        "from api.prefetcher import Prefetcher",
+        "from game.question_node import QuestionNode",
+        "class Stuck:",
+        "    def search(self, animal_name, quiet=False):",
+        "        time.sleep(30)",
+        "Prefetcher(Stuck()).update(QuestionNode('Cat'))",
+        "time.sleep(0.1)",
+    ])
+    start = time.monotonic()
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=20)
+    elapsed = time.monotonic() - start
+    assert elapsed < 5, elapsed
+    print(f"A running prefetch does not delay exit ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    _test_subtree_leaves()
+    _test_prefetch_starts_below_threshold()
+    _test_abandoned_branches_are_cancelled()
+    _test_prefetches_are_quiet()
+    _test_exit_is_not_delayed()
@@ -0,0 +1,72 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from api.response_cache import ResponseCache, MISS
+
+
+def _test_hits_persist(directory: str):
+    path = os.path.join(directory, 'persist.db')
+    cache = ResponseCache(path)
+    assert cache.get("en", "Cat", "summary") is MISS
+    cache.put("en", "Cat", "summary", {"summary": "A cat", "thumbnail": None})
+    cache.put("en", "Cat", "images", ["a.jpg", "b.jpg"])
+    assert cache.get("en", "Cat", "images") == ["a.jpg", "b.jpg"]
+    assert cache.get("fr", "Cat", "images") is MISS
+    cache.close()
+
+    cache = ResponseCache(path)
+    assert cache.get("en", "Cat", "summary") == {"summary": "A cat", "thumbnail": None}
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        cache.get("en", "Cat", "summary")
+    per_hit = (time.perf_counter() - start) / 10000
+    assert per_hit < 0.0001, per_hit
+    cache.close()
+    print(f"Entries persist; repeat hits take {per_hit * 1e6:.1f} us")
+
+
+def _test_ttl_and_negative_entries(directory: str):
+    cache = ResponseCache(os.path.join(directory, 'ttl.db'), ttl=0.2, negative_ttl=0.1)
+    cache.put("en", "Cat", "summary", {"summary": "A cat"})
+    cache.put("en", "Nothing", "summary", None)
+    # A cached 404 is a hit whose payload is None
+    assert cache.get("en", "Nothing", "summary") is None
+    time.sleep(0.15)
+    assert cache.get("en", "Nothing", "summary") is MISS
+    assert cache.get("en", "Cat", "summary") == {"summary": "A cat"}
+    time.sleep(0.1)
+    assert cache.get("en", "Cat", "summary") is MISS
+    cache.close()
+    print("Entries expire after their TTL, missing pages sooner")
+
+
+def _test_lru_eviction(directory: str):
+    cache = ResponseCache(os.path.join(directory, 'lru.db'), max_entries=3, memory_entries=1)
+    for name in ("A", "B", "C"):
+        cache.put("en", name, "summary", name)
+        time.sleep(0.01)
+    # Reading A makes B the least recently used
+    assert cache.get("en", "A", "summary") == "A"
+    time.sleep(0.01)
+    cache.put("en", "D", "summary", "D")
+    assert len(cache) == 3
+    assert cache.get("en", "B", "summary") is MISS
+    assert [cache.get("en", name, "summary") for name in ("A", "C", "D")] == ["A", "C", "D"]
+    cache.close()
+    print("The least recently used entries are evicted past the size cap")
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    try:
+        _test_hits_persist(directory)
+        _test_ttl_and_negative_entries(directory)
+        _test_lru_eviction(directory)
+    finally:
+        shutil.rmtree(directory)
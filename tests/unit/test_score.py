@@ -0,0 +1,63 @@
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scoring.score import Score
+from scoring.memory_score_repository import InMemoryScoreRepository
+from scoring.csv_score_repository import CSVScoreRepository
+
+
+def _test_victory_and_game_over():
+    repository = InMemoryScoreRepository()
+    score = Score("alice", repository)
+    assert score.user_score == 0
+
+    score.add_point()
+    score.add_point()
+    score.victory()
+    assert score.user_score == 10 and repository.get_user_score("alice") == 10
+
+    score.actual_score = 0
+    score.add_point()
+    score.game_over()
+    assert score.user_score == 5 and repository.get_user_score("alice") == 5
+    print("Victory and game over update the stored total")
+
+
+def _test_two_tabs_do_not_lose_updates():
+    repository = InMemoryScoreRepository()
+    repository.save_score("bob", 100)
+    first = Score("bob", repository)
+    second = Score("bob", repository)
+    first.actual_score = 20
+    second.actual_score = 30
+    # Both games started from 100; each result is added to the stored total
+    first.victory()
+    second.game_over()
+    assert repository.get_user_score("bob") == 90
+    assert second.user_score == 90
+    print("Games finished in two tabs both count")
+
+
+def _test_unreadable_csv_does_not_end_the_game():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'scoring.csv')
+        with open(path, 'w') as f:
+            f.write("not,a\nscore,file\n")
+        score = Score("carol", CSVScoreRepository(path))
+        score.add_point()
+        # The error is logged and the game ends normally
+        score.victory()
+        assert score.user_score == 0
+    finally:
+        shutil.rmtree(directory)
+    print("A malformed score file is reported, not raised, at the end of a game")
+
+
+if __name__ == "__main__":
+    _test_victory_and_game_over()
+    _test_two_tabs_do_not_lose_updates()
+    _test_unreadable_csv_does_not_end_the_game()
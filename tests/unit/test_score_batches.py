@@ -0,0 +1,116 @@
+import sys
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterable, List
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scoring.memory_score_repository import InMemoryScoreRepository
+from scoring.sqlite_score_repository import SQLiteScoreRepository
+from scoring.csv_score_repository import CSVScoreRepository
+from scoring.csv_log_score_repository import CSVLogScoreRepository
+from scoring.cached_score_repository import CachedScoreRepository
+from scoring.leaderboard import LeaderboardScoreRepository
+from scoring.score import Score
+
+
+class RecordingRepository(InMemoryScoreRepository):
+    # Records which repository methods are called
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: List[str] = []
+
+    def user_exists(self, username: str) -> bool:
+        self.calls.append("user_exists")
+        return super().user_exists(username)
+
+    def get_user_score(self, username: str) -> int:
+        self.calls.append("get_user_score")
+        return super().get_user_score(username)
+
+    def get_user_scores(self, usernames: Iterable[str]) -> Dict[str, int]:
+        self.calls.append("get_user_scores")
+        return super().get_user_scores(usernames)
+
+
+def _repositories(directory: str):
+    yield "memory", InMemoryScoreRepository()
+    yield "sqlite", SQLiteScoreRepository(os.path.join(directory, 'batch.db'))
+    yield "csv", CSVScoreRepository(os.path.join(directory, 'batch.csv'))
+    yield "csv_log", CSVLogScoreRepository(os.path.join(directory, 'batch_log.csv'))
+    yield "cached", CachedScoreRepository(InMemoryScoreRepository(), flush_interval=60)
+    yield "leaderboard", LeaderboardScoreRepository(InMemoryScoreRepository())
+    try:
+        from scoring.parquet_score_repository import ParquetScoreRepository
+    except ImportError:
+        return
+    yield "parquet", ParquetScoreRepository(os.path.join(directory, 'batch_parquet'))
+
+
+def _test_batch_methods_on_every_backend(directory: str):
+    for name, repository in _repositories(directory):
+        repository.save_scores([("alice", 10), ("bob", 20), ("alice", 15)])
+        repository.ensure_users(["bob", "carol"])
+        assert repository.user_exists("carol"), name
+        assert repository.get_user_scores(["alice", "bob", "carol", "dave", "alice"]) == {
+            "alice": 15, "bob": 20, "carol": 0, "dave": 0
+        }, name
+        assert repository.user_exists("dave"), name
+        assert repository.get_user_scores([]) == {}, name
+        assert repository.get_user_score("bob") == 20, name
+    print("Batch methods agree on every backend")
+
+
+def _test_sqlite_many_users(directory: str):
+    repository = SQLiteScoreRepository(os.path.join(directory, 'many.db'))
+    rows = [(f"user{i}", i) for i in range(2500)]
+    repository.save_scores(rows)
+    assert repository.get_user_scores(name for name, _ in rows) == dict(rows)
+    repository.close()
+    print("SQLite batches span more users than one statement can bind")
+
+
+def _test_cache_fetches_misses_in_one_call():
+    backend = RecordingRepository()
+    backend.save_scores([("alice", 1), ("bob", 2), ("carol", 3)])
+    cache = CachedScoreRepository(backend, flush_interval=0)
+    cache.get_user_score("alice")
+    backend.calls.clear()
+    assert cache.get_user_scores(["alice", "bob", "carol"]) == {"alice": 1, "bob": 2, "carol": 3}
+    assert backend.calls == ["get_user_scores"]
+    print("The cache fetches every miss in one batch call")
+
+
+def _test_score_init_is_one_call():
+    backend = RecordingRepository()
+    Score("alice", backend)
+    assert backend.calls == ["get_user_score"]
+    assert backend.user_exists("alice")
+    print("Creating a Score makes one repository call")
+
+
+def _test_csv_batch_errors_are_logged(directory: str):
+    path = os.path.join(directory, "malformed.csv")
+    repository = CSVScoreRepository(path)
+    with open(path, "w") as f:
+        f.write("not,a\nscore,file\n")
+    # Each batch method reports the error instead of raising it
+    assert repository.get_user_scores(["alice", "bob", "alice"]) == {"alice": 0, "bob": 0}
+    repository.save_scores([("alice", 3)])
+    repository.ensure_users(["carol"])
+    with open(path) as f:
+        assert f.read() == "not,a\nscore,file\n"
+    print("CSV batch methods log errors and fall back to 0")
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    try:
+        _test_batch_methods_on_every_backend(directory)
+        _test_sqlite_many_users(directory)
+        _test_cache_fetches_misses_in_one_call()
+        _test_score_init_is_one_call()
+        _test_csv_batch_errors_are_logged(directory)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,95 @@
+import sys
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import multiprocessing
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scoring.csv_score_repository import CSVScoreRepository
+from scoring.csv_log_score_repository import CSVLogScoreRepository
+
+PROCESSES = 8
+GAMES = 25
+REPOSITORIES = {"csv": CSVScoreRepository, "csv_log": CSVLogScoreRepository}
+
+
+def _play(kind: str, path: str, player: int) -> None:
+    # One server process: several sessions record games at the same time
+    repository = REPOSITORIES[kind](path)
+
+    def session(name: str) -> None:
+        for _ in range(GAMES):
+            repository.add_to_score("shared", 5)
+            repository.save_score(name, 1)
+
+    threads = [threading.Thread(target=session, args=(f"p{player}t{i}",)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _test_processes_lose_no_rows(directory: str):
+    context = multiprocessing.get_context("spawn")
+    for kind, repository_class in REPOSITORIES.items():
+        path = os.path.join(directory, f"{kind}.csv")
+        repository_class(path)
+        processes = [context.Process(target=_play, args=(kind, path, i)) for i in range(PROCESSES)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+        repository = repository_class(path)
+        assert repository.get_user_score("shared") == PROCESSES * 2 * GAMES * 5
+        with open(path) as f:
+            rows = f.read().splitlines()
+        # Header, then one row per add_to_score and per save_score
+        assert len(rows) == 1 + PROCESSES * 2 * GAMES * 2, (kind, len(rows))
+        assert len(repository.all_scores()) == 1 + PROCESSES * 2
+        print(f"{kind}: {PROCESSES} processes recorded every game")
+
+
+def _test_contended_writes_are_batched(directory: str):
+    path = os.path.join(directory, 'batched.csv')
+    repository = CSVScoreRepository(path)
+
+    def session() -> None:
+        for _ in range(10):
+            repository.add_to_score("alice", 1)
+
+    threads = [threading.Thread(target=session) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert repository.get_user_score("alice") == 80
+    assert repository._writer.batches < 80
+    print(f"80 contended writes went out in {repository._writer.batches} rewrites")
+
+
+def _test_file_mode_is_kept(directory: str):
+    for kind, repository_class in REPOSITORIES.items():
+        path = os.path.join(directory, f"mode-{kind}.csv")
+        repository = repository_class(path)
+        for mode in (0o644, 0o664):
+            os.chmod(path, mode)
+            repository.save_score("alice", 10)
+            repository.add_to_score("alice", 5)
+            if kind == "csv_log":
+                repository.compact()
+            assert stat.S_IMODE(os.stat(path).st_mode) == mode, (kind, oct(os.stat(path).st_mode))
+    print("Rewriting a score file keeps its permissions")
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    try:
+        _test_processes_lose_no_rows(directory)
+        _test_contended_writes_are_batched(directory)
+        _test_file_mode_is_kept(directory)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,124 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from scoring.sqlite_score_repository import SQLiteScoreRepository
+from scoring.migrate_csv import migrate, migrate_if_needed, read_csv_history
+
+
+def _test_scores_round_trip(directory: str):
+    repository = SQLiteScoreRepository(os.path.join(directory, 'scores.db'))
+    assert not repository.user_exists("alice")
+    assert repository.get_user_score("alice") == 0
+    assert repository.user_exists("alice")
+
+    repository.save_score("alice", 20)
+    repository.save_score("alice", 35)
+    repository.save_score("bob", 5)
+    assert repository.get_user_score("alice") == 35
+    assert repository.get_user_score("bob") == 5
+    assert repository.games("alice") == [20, 35]
+    repository.close()
+
+    # Data survives reopening the database
+    repository = SQLiteScoreRepository(os.path.join(directory, 'scores.db'))
+    assert repository.get_user_score("alice") == 35
+    repository.close()
+    print("SQLite scores persist and keep the game history")
+
+
+def _test_shared_connection_across_threads(directory: str):
+    repository = SQLiteScoreRepository(os.path.join(directory, 'threads.db'))
+
+    def play(name: str):
+        for total in range(1, 51):
+            repository.save_score(name, total)
+
+    threads = [threading.Thread(target=play, args=(f"user{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for i in range(8):
+        assert repository.get_user_score(f"user{i}") == 50
+        assert len(repository.games(f"user{i}")) == 50
+    repository.close()
+    print("One connection is shared safely between threads")
+
+
+def _test_add_to_score_is_atomic(directory: str):
+    repository = SQLiteScoreRepository(os.path.join(directory, 'increments.db'))
+    assert repository.add_to_score("carol", 10) == 10
+
+    def play():
+        for _ in range(100):
+            repository.add_to_score("carol", 5)
+            repository.add_to_score("carol", -2)
+
+    threads = [threading.Thread(target=play) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert repository.get_user_score("carol") == 10 + 8 * 100 * 3
+    assert len(repository.games("carol")) == 1 + 8 * 200
+    repository.close()
+    print("add_to_score loses no concurrent update")
+
+
+def _test_migrate_csv(directory: str):
+    source = os.path.join(directory, 'scoring.csv')
+    with open(source, 'w') as f:
+        f.write("username,last_score,score_total\nvalentin,0,0\nvalentin,20,20\nana,0,0\nvalentin,40,40\n")
+
+    assert read_csv_history(source) == [("valentin", None), ("valentin", 20), ("ana", None), ("valentin", 40)]
+    destination = os.path.join(directory, 'migrated.db')
+    assert migrate(source, destination) == 2
+
+    repository = SQLiteScoreRepository(destination)
+    assert repository.get_user_score("valentin") == 40
+    assert repository.games("valentin") == [20, 40]
+    assert repository.user_exists("ana") and repository.games("ana") == []
+    repository.close()
+
+    try:
+        migrate(source, destination)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a second import should be refused")
+    print("CSV history migrates once into SQLite")
+
+
+def _test_migrate_on_first_start(directory: str):
+    source = os.path.join(directory, 'first-start.csv')
+    destination = os.path.join(directory, 'first-start.db')
+    assert migrate_if_needed(os.path.join(directory, 'absent.csv'), destination) == 0
+    with open(source, 'w') as f:
+        f.write("username,last_score,score_total\nvalentin,0,0\nvalentin,35,35\n")
+
+    assert migrate_if_needed(source, destination) == 1
+    # Later starts keep the database as it is
+    repository = SQLiteScoreRepository(destination)
+    repository.add_to_score("valentin", 5)
+    repository.close()
+    assert migrate_if_needed(source, destination) == 0
+    repository = SQLiteScoreRepository(destination)
+    assert repository.get_user_score("valentin") == 40
+    repository.close()
+    print("Existing CSV scores are imported on the first start only")
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    try:
+        _test_scores_round_trip(directory)
+        _test_shared_connection_across_threads(directory)
+        _test_add_to_score_is_atomic(directory)
+        _test_migrate_csv(directory)
+        _test_migrate_on_first_start(directory)
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,71 @@
+import sys
+import os
+import io
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from data.stream_parser import StreamingTreeParser, parse_stream, TreeParseError
+from data.parsing import Parsing
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+animals_path = os.path.join(base, 'data', 'animals_tree.json')
+
+
+def _test_matches_json_load_for_any_chunk_size():
+    with open(animals_path, 'rb') as f:
+        raw = f.read()
+    expected = json.loads(raw)
+
+    for size in (1, 2, 7, 4096):
+        parser = StreamingTreeParser()
+        for start in range(0, len(raw), size):
+            parser.feed(raw[start:start + size])
+        assert parser.close().to_dict() == expected
+    print("Streaming parser matches json.load for any chunk size")
+
+
+def _test_multibyte_characters_split_across_chunks():
+    raw = json.dumps({"value": "Écureuil 🐿", "yes": None, "no": None}, ensure_ascii=False).encode('utf-8')
+    chunks = [raw[i:i + 1] for i in range(len(raw))]
+    assert parse_stream(chunks).value == "Écureuil 🐿"
+    print("UTF-8 characters split across chunks are decoded")
+
+
+def _test_extra_keys_are_ignored():
+    doc = '{"value": "Root", "yes": null, "no": null, "meta": {"tags": [1, 2.5e3, true, {"a": null}]}}'
+    root = parse_stream(io.StringIO(doc), chunk_size=3)
+    assert root.to_dict() == {"value": "Root", "yes": None, "no": None}
+    print("Keys outside the tree are parsed and dropped")
+
+
+def _test_errors():
+    cases = {
+        '{"value": "Root", "yes": null, "no": [1]}': "expected dict or None at root.no, got list",
+        '{"value": "Root", "yes": {"value": 1, "yes": null, "no": null}, "no": null}': "'value' must be a string at root.yes, got int",
+        '{"value": "Root", "yes": null,}': "unexpected '}'",
+        '{"value": "Root", "yes": null, "no": nul}': "unexpected character 'n' at offset 37",
+        '{"value": "Root", "yes": null, "no": null': "unexpected end of document",
+    }
+    for doc, message in cases.items():
+        try:
+            parse_stream(io.StringIO(doc), chunk_size=4)
+        except TreeParseError as e:
+            assert str(e) == message, f"{doc!r}: {e}"
+        else:
+            raise AssertionError(f"{doc!r} should not parse")
+    print("Malformed documents raise TreeParseError with a location")
+
+
+def _test_stream_option_falls_back_to_default():
+    assert Parsing(animals_path).load_json_tree(verbose=False, stream=True).to_dict() == json.load(open(animals_path))
+    missing = os.path.join(base, 'missing.json')
+    assert Parsing(missing).load_json_tree(default='DEFAULT', verbose=False, stream=True) == 'DEFAULT'
+    print("load_json_tree(stream=True) loads the tree or returns default")
+
+
+if __name__ == "__main__":
+    _test_matches_json_load_for_any_chunk_size()
+    _test_multibyte_characters_split_across_chunks()
+    _test_extra_keys_are_ignored()
+    _test_errors()
+    _test_stream_option_falls_back_to_default()
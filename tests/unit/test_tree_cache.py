@@ -0,0 +1,67 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from data.parsing import Parsing
+from game.question_tree import QuestionTree
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+
+
+def _copy_animals(directory):
+    path = os.path.join(directory, "tree.json")
+    shutil.copy(os.path.join(base, 'data', 'animals_tree.json'), path)
+    return path
+
+
+def _test_cache_is_built_and_used():
+    directory = tempfile.mkdtemp()
+    path = _copy_animals(directory)
+
+    first = QuestionTree(path)
+    assert os.path.exists(path + ".cache")
+
+    parsing = Parsing(path)
+    assert parsing.cache.load() is not None
+    assert parsing.load_tree(verbose=False).to_dict() == first.root.to_dict()
+    shutil.rmtree(directory)
+    print("QuestionTree builds and then uses the sidecar cache")
+
+
+def _test_cache_is_invalidated_by_edits():
+    directory = tempfile.mkdtemp()
+    path = _copy_animals(directory)
+    QuestionTree(path)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"value": "Edited", "yes": None, "no": None}, f)
+    assert Parsing(path).cache.load() is None
+    assert QuestionTree(path).root.value == "Edited"
+
+    # Same content with a new mtime is still a hit thanks to the hash
+    os.utime(path, ns=(0, 0))
+    assert Parsing(path).cache.load() is not None
+    shutil.rmtree(directory)
+    print("Edits to the JSON invalidate the cache, touching it does not")
+
+
+def _test_cache_is_rebuilt_after_save():
+    directory = tempfile.mkdtemp()
+    path = _copy_animals(directory)
+    tree = QuestionTree(path)
+
+    tree.root.value = "Renamed root?"
+    tree.parsing.save_json_tree(tree.root)
+    cached = Parsing(path).cache.load()
+    assert cached is not None and cached.root.value == "Renamed root?"
+    shutil.rmtree(directory)
+    print("save_json_tree rebuilds the cache")
+
+
+if __name__ == "__main__":
+    _test_cache_is_built_and_used()
+    _test_cache_is_invalidated_by_edits()
+    _test_cache_is_rebuilt_after_save()
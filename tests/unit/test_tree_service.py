@@ -0,0 +1,90 @@
+import sys
+import os
+import shutil
+import tempfile
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from game.tree_service import TreeService
+from data.parsing import Parsing
+
+base = os.path.join(os.path.dirname(__file__), '..', '..')
+
+
+def _copy_animals(directory):
+    path = os.path.join(directory, "tree.json")
+    shutil.copy(os.path.join(base, 'data', 'animals_tree.json'), path)
+    return path
+
+
+def _test_concurrent_lessons_on_one_leaf():
+    directory = tempfile.mkdtemp()
+    service = TreeService(_copy_animals(directory))
+    results = []
+
+    def teach(i):
+        results.append(service.learn("root.yes.yes.yes.yes", "Dog", f"Question {i}?", f"Animal {i}", True))
+
+    threads = [threading.Thread(target=teach, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count(True) == 1
+    assert service.root.yes.yes.yes.yes.no.value == "Dog"
+    assert service.versions.current.number == 1
+    shutil.rmtree(directory)
+    print("Only one of several concurrent lessons on a leaf is applied")
+
+
+def _test_pinned_version_is_untouched():
+    directory = tempfile.mkdtemp()
+    path = _copy_animals(directory)
+    service = TreeService(path)
+    pinned = service.current_version()
+    leaf = pinned.root.yes.yes.yes.no
+
+    assert service.learn("root.yes.yes.yes.no", "Cat", "Does it roar?", "Lion", True)
+    assert leaf.value == "Cat" and leaf.yes is None
+    assert pinned.root.yes.yes.yes.no is leaf
+    assert service.root.yes.yes.yes.no.yes.value == "Lion"
+    # Only the path was copied, the other branches are shared
+    assert service.root.no is pinned.root.no
+    assert service.root.yes.no is pinned.root.yes.no
+    shutil.rmtree(directory)
+    print("A pinned version does not change when another session learns")
+
+
+def _test_old_versions_are_collected():
+    directory = tempfile.mkdtemp()
+    service = TreeService(_copy_animals(directory))
+    pinned = service.current_version()
+
+    assert service.learn("root.yes.yes.yes.no", "Cat", "Does it roar?", "Lion", True)
+    assert service.learn("root.yes.yes.yes.yes", "Dog", "Is it a wolf?", "Wolf", True)
+    assert service.versions.live_versions() == [0, 2]
+    del pinned
+    assert service.versions.live_versions() == [2]
+    shutil.rmtree(directory)
+    print("Versions no session references are garbage-collected")
+
+
+def _test_lessons_are_persisted():
+    directory = tempfile.mkdtemp()
+    path = _copy_animals(directory)
+    service = TreeService(path)
+
+    assert service.learn("root.yes.yes.yes.no", "Cat", "Does it roar?", "Lion", True)
+
+    reloaded = Parsing(path).load_tree(verbose=False)
+    assert reloaded.to_dict() == service.root.to_dict()
+    shutil.rmtree(directory)
+    print("Lessons are journaled")
+
+
+if __name__ == "__main__":
+    _test_concurrent_lessons_on_one_leaf()
+    _test_pinned_version_is_untouched()
+    _test_old_versions_are_collected()
+    _test_lessons_are_persisted()
@@ -0,0 +1,66 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from data.tree_writer import TreeWriter
+from data.parsing import Parsing
+from game.question_node import QuestionNode
+
+
+def _test_saves_are_coalesced():
+    written = []
+    release = threading.Event()
+
+    def write(root, position):
+        release.wait()
+        written.append(root.value)
+
+    writer = TreeWriter(write, interval=60)
+    for i in range(5):
+        writer.submit(QuestionNode(f"v{i}"), i)
+    assert writer.queue_depth == 5
+
+    release.set()
+    writer.flush()
+    assert written == ["v4"]
+    assert writer.queue_depth == 0 and writer.writes == 1
+    assert writer.last_flush_latency is not None
+    writer.close()
+    print("Pending saves are merged into one write")
+
+
+def _test_close_flushes_pending_save():
+    written = []
+    writer = TreeWriter(lambda root, position: written.append(position), interval=60)
+    writer.submit(QuestionNode("x"), 7)
+    writer.close()
+    assert written == [7]
+    print("Closing the writer flushes the pending save")
+
+
+def _test_background_save_json_tree():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "tree.json")
+    parsing = Parsing(path, background_writes=True, write_interval=60)
+
+    root = QuestionNode("Does it bark?", QuestionNode("Dog"), QuestionNode("Cat"))
+    parsing.save_json_tree(root)
+    assert not os.path.exists(path)
+
+    parsing.writer.flush()
+    with open(path, "r", encoding="utf-8") as f:
+        assert json.load(f) == root.to_dict()
+    assert [name for name in os.listdir(directory) if name.endswith(".tmp")] == []
+    parsing.writer.close()
+    shutil.rmtree(directory)
+    print("save_json_tree writes atomically in the background")
+
+
+if __name__ == "__main__":
+    _test_saves_are_coalesced()
+    _test_close_flushes_pending_save()
+    _test_background_save_json_tree()
@@ -0,0 +1,224 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Set
+from urllib.parse import urlparse, parse_qs, unquote
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from api.animal_info import AnimalInfo
+from api.response_cache import MISS
+from api.warm_cache import CacheWarmer, TokenBucket, main
+
+
+class StubActionApi(BaseHTTPRequestHandler):
+    # Serves multi-title action=query requests like the MediaWiki APIs:
+    # /w/api.php for extracts and /commons for images and imageinfo, plus
+    # the single-animal requests of AnimalInfo.search
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        titles = params.get("titles", "").split("|")
+        with self.server.lock:
+            self.server.requests.append(params)
+
+        if any(title in self.server.failing for title in titles):
+            status, payload = 503, {}
+        elif url.path.startswith("/summary/"):
+            status, payload = 200, self._summary(unquote(url.path[len("/summary/"):]))
+        elif url.path == "/w/api.php":
+            status, payload = 200, self._extracts(titles)
+        elif params.get("generator") == "images":
+            status, payload = 200, self._generated_images(titles[0])
+        elif params.get("prop") == "images":
+            status, payload = 200, self._images(titles, params)
+        else:
+            status, payload = 200, {"query": {"pages": [
+                {"title": title, "imageinfo": [{"url": f"http://img/{title[5:]}"}]}
+                for title in titles
+            ]}}
+
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _extracts(self, titles: List[str]) -> Dict[str, Any]:
+        # Lowercase titles are normalized, "Unknown*" pages do not exist
+        normalized = [
+            {"from": title, "to": title[0].upper() + title[1:]}
+            for title in titles if title[:1].islower()
+        ]
+        pages = []
+        for title in titles:
+            final = title[0].upper() + title[1:]
+            if final.startswith("Unknown"):
+                pages.append({"title": final, "missing": True})
+            else:
+                pages.append({
+                    "title": final,
+                    # exintro returns every paragraph of the intro
+                    "extract": f"{final} summary\n{final} details",
+                    "thumbnail": {"source": f"http://img/{final}.jpg"},
+                })
+        return {"query": {"normalized": normalized, "pages": pages}}
+
+    def _summary(self, name: str) -> Dict[str, Any]:
+        # The REST page summary, with only the first paragraph
+        return {"extract": f"{name} summary", "thumbnail": {"source": f"http://img/{name}.jpg"}}
+
+    def _images(self, titles: List[str], params: Dict[str, str]) -> Dict[str, Any]:
+        # Two files per page, the second one sent on a continued request
+        second = "imcontinue" in params
+        pages = [
+            {"title": title, "images": [{"title": f"File:{title}-{2 if second else 1}.jpg"}]}
+            for title in titles if not title.startswith("Unknown")
+        ]
+        payload: Dict[str, Any] = {"query": {"pages": pages}}
+        if not second:
+            payload["continue"] = {"imcontinue": "next", "continue": "||"}
+        return payload
+
+    def _generated_images(self, title: str) -> Dict[str, Any]:
+        # The single-title query of AnimalInfo.search, pages keyed by id
+        return {"query": {"pages": {
+            str(i): {"title": f"File:{title}-{i}.jpg", "imageinfo": [{"url": f"http://img/{title}-{i}.jpg"}]}
+            for i in (1, 2)
+        }}}
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubActionApi)
+        self.lock = threading.Lock()
+        self.requests: List[Dict[str, str]] = []
+        self.failing: Set[str] = set()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def client(self, cache_file: str) -> AnimalInfo:
+        info = AnimalInfo(cache_file=cache_file, retries=0)
+        base = f"http://127.0.0.1:{self.server_port}"
+        info.api_url = f"{base}/w/api.php"
+        info.summary_url = f"{base}/summary/"
+        info.commons_url = f"{base}/commons"
+        return info
+
+
+def _test_batches_fill_the_cache(server: StubServer, directory: str):
+    info = server.client(os.path.join(directory, "batches.db"))
+    animals = [f"Animal{i}" for i in range(45)] + ["Unknown bird"]
+    warmer = CacheWarmer(info, workers=3, rate=1000)
+    report = warmer.warm(animals + ["Animal0"])
+
+    assert report.total == 46
+    assert report.fetched == 46 and report.already_cached == 0
+    assert report.missing == ["Unknown bird"]
+    assert report.failed == [] and report.coverage == 1.0
+    # 3 extract batches, 1 images batch (+ continue) and 2 imageinfo
+    # batches for the 90 files, instead of 2 requests per animal
+    assert warmer.requests == 7, warmer.requests
+
+    # Entries have the form search stores, so search needs no request
+    before = len(server.requests)
+    result = info.search("Animal7")
+    assert result["summary"] == "Animal7 summary"
+    assert result["thumbnail"] == "http://img/Animal7.jpg"
+    assert result["images"] == ["http://img/Animal7-1.jpg", "http://img/Animal7-2.jpg"]
+    missing = info.search("Unknown bird")
+    assert missing["summary"] is None and missing["images"] == []
+    assert len(server.requests) == before
+
+    # A second run only counts what is already there
+    warmer = CacheWarmer(info, rate=1000)
+    again = warmer.warm(animals)
+    assert again.already_cached == 46 and again.fetched == 0
+    assert warmer.requests == 0
+    print("Batched queries fill the cache for every animal")
+
+
+def _test_normalized_titles(server: StubServer, directory: str):
+    info = server.client(os.path.join(directory, "normalized.db"))
+    report = CacheWarmer(info, rate=1000).warm(["red fox"])
+    assert report.missing == []
+    assert info.cache.get(info.language, "red fox", "summary") == {
+        "summary": "Red fox summary", "thumbnail": "http://img/Red fox.jpg"
+    }
+    print("Normalized titles are stored under the requested name")
+
+
+def _test_warmed_entries_match_lazy_ones(server: StubServer, directory: str):
+    warmed = server.client(os.path.join(directory, "warmed.db"))
+    CacheWarmer(warmed, rate=1000).warm(["Otter"])
+    lazy = server.client(os.path.join(directory, "lazy.db"))
+    lazy.search("Otter")
+    for endpoint in ("summary", "images"):
+        assert warmed.cache.get(warmed.language, "Otter", endpoint) == \
+            lazy.cache.get(lazy.language, "Otter", endpoint), endpoint
+    print("Warmed entries are the ones search would have stored")
+
+
+def _test_failed_batches_are_reported(server: StubServer, directory: str):
+    info = server.client(os.path.join(directory, "failed.db"))
+    server.failing = {"Broken"}
+    try:
+        report = CacheWarmer(info, rate=1000).warm(["Broken", "Cat"])
+    finally:
+        server.failing = set()
+    # Both animals share the failing batches; nothing is cached for them
+    assert report.failed == ["Broken", "Cat"]
+    assert report.fetched == 0 and report.coverage == 0.0
+    assert info.cache.get(info.language, "Cat", "summary") is MISS
+
+    retry = CacheWarmer(info, rate=1000).warm(["Broken", "Cat"])
+    assert retry.failed == [] and retry.fetched == 2
+    print("Failed batches are reported and retried on the next run")
+
+
+def _test_token_bucket():
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    # A burst of 5, then 10 more at 50 per second
+    assert 0.15 <= elapsed < 1.0, elapsed
+    print(f"Token bucket limits the rate ({elapsed:.2f}s for 15 requests)")
+
+
+def _test_main_usage():
+    try:
+        main(["warm_cache"])
+    except SystemExit as e:
+        assert e.code == 2
+    else:
+        raise AssertionError("a tree file is required")
+    print("The command requires a tree file")
+
+
+if __name__ == "__main__":
+    server = StubServer()
+    directory = tempfile.mkdtemp()
+    try:
+        _test_batches_fill_the_cache(server, directory)
+        _test_normalized_titles(server, directory)
+        _test_warmed_entries_match_lazy_ones(server, directory)
+        _test_failed_batches_are_reported(server, directory)
+        _test_token_bucket()
+        _test_main_usage()
+    finally:
+        server.shutdown()
+        shutil.rmtree(directory)